@@ -0,0 +1,78 @@
+"""
+Safety margins around obstacles and the fence. Instead of inflating radii by
+hand in the mission json, the planner is run against an inflated copy of the
+mission: every obstacle radius grows by the margin and the fence shrinks by it.
+The inflated geometry is built once per mission and margin and cached, so
+repeated plans of the same mission reuse it. Only the most recently used
+missions are kept.
+"""
+
+from collections import OrderedDict
+
+from shapely.geometry import Point
+
+from avoidance import rrt
+
+
+SAFETY_MARGIN = 0.0  # meters kept between the route and obstacles or the fence by default
+
+INFLATED_CACHE_SIZE = 8  # missions kept inflated, a flight plans one mission with one margin
+
+inflated_cache = OrderedDict()  # inflated (fence, obstacles) by mission geometry and margin, oldest first
+
+
+def inflate_obstacles(obstacles, margin):
+    """
+    Grows every obstacle ring by the margin, analytically from its center and radius
+    Args:
+        obstacles (list): obstacle rings as built by helpers.circles_to_shape
+        margin (float): meters added to every radius
+    Returns:
+        list: the inflated obstacle rings
+    """
+    centers, radii = rrt.obstacle_circles(obstacles)
+    return [Point(center).buffer(radius + margin).boundary for center, radius in zip(centers, radii)]
+
+
+def shrink_fence(boundary, margin):
+    """
+    Shrinks the fence by the margin with a negative buffer
+    Args:
+        boundary (Polygon): fly zone
+        margin (float): meters kept to the fence
+    Returns:
+        Polygon: the shrunk fly zone, a MultiPolygon if narrow parts of the fence close up
+    Raises:
+        ValueError: if nothing of the fly zone is left
+    """
+    shrunk = boundary.buffer(-margin)
+    if shrunk.is_empty:
+        raise ValueError(f"a safety margin of {margin}m leaves no room inside the fence")
+    return shrunk
+
+
+def inflated_mission(boundary, obstacles, margin=SAFETY_MARGIN):
+    """
+    Fence and obstacles with the safety margin applied, cached by mission
+    geometry and margin for the last INFLATED_CACHE_SIZE missions
+    Args:
+        boundary (Polygon): fly zone
+        obstacles (list): obstacle rings as built by helpers.circles_to_shape
+        margin (float): safety margin in meters
+    Returns:
+        Tuple[Polygon, list]: the shrunk fence and the inflated obstacle rings
+    """
+    if margin <= 0:
+        return boundary, obstacles
+
+    centers, radii = rrt.obstacle_circles(obstacles)
+    key = (boundary.wkb, centers.tobytes(), radii.tobytes(), margin)
+    try:
+        inflated_cache.move_to_end(key)
+        return inflated_cache[key]
+    except KeyError:
+        inflated = shrink_fence(boundary, margin), inflate_obstacles(obstacles, margin)
+        inflated_cache[key] = inflated
+        if len(inflated_cache) > INFLATED_CACHE_SIZE:
+            inflated_cache.popitem(last=False)
+        return inflated
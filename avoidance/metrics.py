@@ -0,0 +1,137 @@
+"""
+Quality metrics of a planned path. Everything is computed in one vectorized
+pass over the path as an (K, 2) array in utm meters, so the metrics are cheap
+enough to log for every leg.
+"""
+
+import numpy as np
+from shapely.geometry import MultiPolygon
+
+from avoidance import rrt
+
+
+CRUISE_SPEED = 5.0  # m/s, PX4 default horizontal cruise speed of goto_location
+TURN_BINS = (0, 15, 30, 45, 90, 135, 180)  # degrees, edges of the turn angle histogram
+
+
+def path_array(path):
+    """
+    Args:
+        path (List[Point]): path as shapely points
+    Returns:
+        np.ndarray: (K, 2) array of the path coordinates
+    """
+    return np.array([(p.x, p.y) for p in path], dtype=float).reshape(-1, 2)
+
+
+def fence_edges(boundary):
+    """
+    Args:
+        boundary (Polygon): fly zone, or a MultiPolygon
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (E, 2) start and end points of every fence edge
+    """
+    polygons = boundary.geoms if isinstance(boundary, MultiPolygon) else [boundary]
+    rings = [np.asarray(ring.coords) for polygon in polygons for ring in (polygon.exterior, *polygon.interiors)]
+    starts = np.concatenate([ring[:-1] for ring in rings])
+    ends = np.concatenate([ring[1:] for ring in rings])
+    return starts, ends
+
+
+def point_segment_distances(points, starts, ends):
+    """
+    Args:
+        points (np.ndarray): (P, 2) points
+        starts (np.ndarray): (S, 2) segment start points
+        ends (np.ndarray): (S, 2) segment end points
+    Returns:
+        np.ndarray: (P, S) distance of every point to every segment
+    """
+    dirn = ends - starts
+    length_sq = np.einsum("ij,ij->i", dirn, dirn)
+    length_sq[length_sq == 0] = 1.0
+    to_point = points[:, None, :] - starts[None, :, :]
+    t = np.clip(np.einsum("psj,sj->ps", to_point, dirn) / length_sq, 0.0, 1.0)
+    closest = starts[None, :, :] + t[..., None] * dirn[None, :, :]
+    return np.linalg.norm(points[:, None, :] - closest, axis=2)
+
+
+def path_metrics(path, centers, radii, boundary=None, speed=CRUISE_SPEED, stop_time=0.0):
+    """
+    Measures a path
+    Args:
+        path (np.ndarray): (K, 2) path in utm meters, see path_array
+        centers (np.ndarray): (N, 2) obstacle centers, see rrt.obstacle_circles
+        radii (np.ndarray): (N,) obstacle radii
+        boundary (Polygon): optional fly zone to measure the fence clearance against
+        speed (float): cruise speed in m/s used for the flight time estimate
+        stop_time (float): seconds lost at every intermediate waypoint the vehicle
+            stops at
+    Returns:
+        dict: length (m), waypoints, obstacle and fence clearance (minimum and
+        length weighted mean in m, negative when the path enters an obstacle), turn
+        angles (mean, max and a histogram over TURN_BINS in degrees) and the
+        estimated flight time (s)
+    """
+    starts, ends = path[:-1], path[1:]
+    segments = ends - starts
+    lengths = np.linalg.norm(segments, axis=1)
+    length = float(lengths.sum())
+    metrics = {"length": length, "waypoints": len(path)}
+
+    def clearance_stats(clearance):
+        if len(clearance) == 0 or length == 0:
+            return None, None
+        return float(clearance.min()), float(np.average(clearance, weights=lengths))
+
+    # closest approach of every segment to every obstacle
+    obstacle_clearance = np.empty(0)
+    if len(radii) and len(segments):
+        obstacle_clearance = (point_segment_distances(centers, starts, ends) - radii[:, None]).min(axis=0)
+    metrics["min_obstacle_clearance"], metrics["mean_obstacle_clearance"] = clearance_stats(obstacle_clearance)
+
+    # two segments that do not cross are closest at one of their end points
+    fence_clearance = np.empty(0)
+    if boundary is not None and len(segments):
+        edge_starts, edge_ends = fence_edges(boundary)
+        fence_clearance = np.minimum(
+            np.minimum(
+                point_segment_distances(starts, edge_starts, edge_ends).min(axis=1),
+                point_segment_distances(ends, edge_starts, edge_ends).min(axis=1),
+            ),
+            point_segment_distances(edge_starts, starts, ends).min(axis=0),
+        )
+    metrics["min_fence_clearance"], metrics["mean_fence_clearance"] = clearance_stats(fence_clearance)
+
+    # heading change at every intermediate waypoint
+    moving = segments[lengths > 0]
+    headings = np.arctan2(moving[:, 1], moving[:, 0])
+    turns = np.degrees(np.abs((np.diff(headings) + np.pi) % (2 * np.pi) - np.pi))
+    metrics["mean_turn"] = float(turns.mean()) if len(turns) else 0.0
+    metrics["max_turn"] = float(turns.max()) if len(turns) else 0.0
+    metrics["turn_histogram"] = np.histogram(turns, bins=TURN_BINS)[0].tolist()
+
+    metrics["flight_time"] = length / speed + stop_time * max(len(path) - 2, 0)
+    return metrics
+
+
+def leg_metrics(path, obstacles, boundary=None, speed=CRUISE_SPEED, stop_time=0.0):
+    """
+    path_metrics of a planner path given as shapely points against the shapely
+    obstacle rings of the mission
+    """
+    centers, radii = rrt.obstacle_circles(obstacles)
+    return path_metrics(path_array(path), centers, radii, boundary, speed, stop_time)
+
+
+def format_metrics(metrics):
+    def meters(value):
+        return "-" if value is None else f"{value:.1f}m"
+
+    return (
+        f"length {metrics['length']:.0f}m, {metrics['waypoints']} waypoints, "
+        f"obstacle clearance min {meters(metrics['min_obstacle_clearance'])} "
+        f"mean {meters(metrics['mean_obstacle_clearance'])}, "
+        f"fence clearance min {meters(metrics['min_fence_clearance'])}, "
+        f"max turn {metrics['max_turn']:.0f}deg, flight time {metrics['flight_time']:.0f}s"
+    )
@@ -0,0 +1,246 @@
+"""
+Portfolio planning: several independently seeded planners work on the same
+leg in separate processes and the shortest path wins. The best cost found so
+far is kept in shared memory so every planner can skip samples that can no
+longer lead to a shorter path.
+"""
+
+import math
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+from shapely.geometry import Point
+
+from avoidance import rrt
+from avoidance import samplers
+
+
+TIME_BUDGET = 5.0  # seconds spent on each leg
+PLANNERS = ("rrt_star", "rrt_connect")
+# workers start from a fresh interpreter instead of a fork of a process that may hold
+# threads or locks, so scripts using a portfolio keep their entry point under __main__
+CONTEXT = multiprocessing.get_context("spawn")
+
+shared_cost = None  # SharedCost of the current worker process
+
+
+class SharedCost:
+    """
+    Best path cost of the current leg shared between processes. The cost is
+    tagged with the leg it belongs to, a planner still running on an earlier
+    leg can not lower the bound of the next one.
+    Args:
+        state (multiprocessing.Array): shared doubles holding the leg index and the cost
+        leg (int): leg the offers of this handle belong to, None accepts every offer
+    """
+
+    def __init__(self, state, leg=None):
+        self.state = state
+        self.leg = leg
+
+    def for_leg(self, leg):
+        return SharedCost(self.state, leg)
+
+    def current(self):
+        return self.leg is None or self.state[0] == self.leg
+
+    def get(self):
+        with self.state.get_lock():
+            return self.state[1] if self.current() else math.inf
+
+    def offer(self, cost):
+        with self.state.get_lock():
+            if self.current() and cost < self.state[1]:
+                self.state[1] = cost
+
+    def reset(self, leg=0):
+        with self.state.get_lock():
+            self.state[0] = leg
+            self.state[1] = math.inf
+
+
+def init_worker(state):
+    global shared_cost
+    shared_cost = SharedCost(state)
+
+
+def ready():
+    return os.getpid()
+
+
+def path_length(path):
+    return sum(p.distance(q) for p, q in zip(path, path[1:]))
+
+
+def run_planner(planner, seed, leg, startpos, endpos, boundary, obstacles, deadline, batch_size):
+    """
+    Runs one planner of the portfolio, repeating it with new seeds until the
+    deadline so the whole time budget is used. Costs are offered for leg only.
+    Returns:
+        dict: planner name, seeds used, number of runs, best relaxed path as
+        coordinates (None if no path was found), its cost, why the run that
+        found it stopped and the seconds the worker planned
+    """
+    start_time = time.time()
+    result = {"planner": planner, "seed": seed, "runs": 0, "path": None, "cost": math.inf,
+              "stop_reason": None, "runtime": 0.0}
+
+    best_cost = shared_cost.for_leg(leg)
+    lower_bound = startpos.distance(endpos)
+    while time.time() < deadline and best_cost.get() > lower_bound + 1e-6:
+        random.seed(seed)
+        np.random.seed(seed % 2 ** 32)
+        sampler = samplers.Sampler(seed)
+        if planner == "rrt_connect":
+            G, _, _ = rrt.RRT_connect(startpos, endpos, boundary, obstacles, sampler=sampler, deadline=deadline)
+        else:
+            G, _, _ = rrt.RRT_star(
+                startpos,
+                endpos,
+                boundary,
+                obstacles,
+                batch_size=batch_size,
+                sampler=sampler,
+                deadline=deadline,
+                best_cost=best_cost,
+            )
+        result["runs"] += 1
+        if result["path"] is None:
+            result["stop_reason"] = G.stop_reason
+
+        if G.success:
+            path = rrt.relax_path(rrt.dijkstra(G), obstacles)
+            cost = path_length(path)
+            best_cost.offer(cost)
+            if cost < result["cost"]:
+                result["cost"] = cost
+                result["seed"] = seed
+                result["path"] = [(p.x, p.y) for p in path]
+                result["stop_reason"] = G.stop_reason
+
+        seed += 1000003  # keep the seeds of different workers apart
+
+    result["runtime"] = time.time() - start_time
+    return result
+
+
+def failed_result(planner, seed, error):
+    """
+    Returns:
+        dict: the result of a worker that raised error, in the format of run_planner
+    """
+    return {"planner": planner, "seed": seed, "runs": 0, "path": None, "cost": math.inf,
+            "stop_reason": "error", "runtime": 0.0, "error": repr(error)}
+
+
+class Portfolio:
+    """
+    Pool of planner processes used to plan legs as a portfolio
+    Args:
+        workers (int): number of planners run in parallel, defaults to the cpu count
+        planners (Sequence[str]): planners assigned to the workers in turn,
+            "rrt_star" and/or "rrt_connect"
+        time_budget (float): seconds spent on each leg
+        batch_size (int): samples per iteration of the RRT* planners
+        seed (int): base seed, every worker and leg gets its own seed from it
+    """
+
+    def __init__(self, workers=None, planners=("rrt_star",), time_budget=TIME_BUDGET,
+                 batch_size=rrt.BATCH_SIZE, seed=0):
+        for planner in planners:
+            if planner not in PLANNERS:
+                raise ValueError(f"unknown planner {planner!r}, expected one of {PLANNERS}")
+        self.workers = workers or os.cpu_count() or 1
+        self.planners = planners
+        self.time_budget = time_budget
+        self.batch_size = batch_size
+        self.seed = seed
+        self.legs = 0
+
+        self.cost = SharedCost(CONTEXT.Array("d", (0.0, math.inf)))
+        self.executor = self.start_pool()
+
+    def start_pool(self):
+        """
+        Starts the worker processes and waits until they have imported the
+        planners, so the start up does not eat into the time budget of a leg
+        Returns:
+            ProcessPoolExecutor: the pool
+        """
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=CONTEXT, initializer=init_worker, initargs=(self.cost.state,)
+        )
+        wait([executor.submit(ready) for _ in range(self.workers)])
+        return executor
+
+    def plan(self, startpos, endpos, boundary, obstacles):
+        """
+        Plans a leg with every worker and keeps the shortest path
+        A worker that raises counts as a planner that found no path.
+        Returns:
+            Tuple[Optional[List[Point]], List[dict]]: the best relaxed path, None if
+            no planner found one, and the result of every finished worker
+        """
+        self.cost.reset(self.legs)
+        deadline = time.time() + self.time_budget
+        assigned = [
+            (self.planners[k % len(self.planners)], self.seed + self.legs * self.workers + k)
+            for k in range(self.workers)
+        ]
+        futures = [
+            self.executor.submit(
+                run_planner,
+                planner,
+                seed,
+                self.legs,
+                startpos,
+                endpos,
+                boundary,
+                obstacles,
+                deadline,
+                self.batch_size,
+            )
+            for planner, seed in assigned
+        ]
+        self.legs += 1
+
+        # planners stop at the deadline, leave some time to extract their paths
+        # a worker still running afterwards can only offer costs for this leg, which
+        # the next leg ignores
+        done, _ = wait(futures, timeout=self.time_budget + 1.0)
+        results = []
+        broken = False
+        for future, (planner, seed) in zip(futures, assigned):
+            if future not in done:
+                continue
+            try:
+                results.append(future.result())
+            except Exception as error:
+                print(f"{planner} seed {seed} failed: {error!r}")
+                results.append(failed_result(planner, seed, error))
+                broken = broken or isinstance(error, BrokenProcessPool)
+        for future in futures:
+            future.cancel()
+        if broken:
+            # a worker process died, the pool takes no more work
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = self.start_pool()
+
+        best = min(results, key=lambda result: result["cost"], default=None)
+        if best is None or best["path"] is None:
+            return None, results
+        return [Point(p) for p in best["path"]], results
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
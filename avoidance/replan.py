@@ -0,0 +1,182 @@
+"""
+Incremental replanning for obstacles that appear or move during a mission.
+Instead of rerunning rrt_flight_test from scratch, IncrementalPlanner keeps the
+RRT* graph of the current leg between calls, in the spirit of RRTX:
+
+    planner = IncrementalPlanner(boundary_shape, obstacle_shapes)
+    path = planner.plan(start, goal)
+    ...
+    planner.add_obstacle((x, y), radius)
+    path = planner.replan(vehicle_position)
+
+An obstacle update only invalidates the edges it cuts. They are found by a
+radius query on the vertex coordinate array, which is the graph's spatial
+index, so only edges near the obstacle are collision checked. Replanning
+attaches the vehicle position to the graph and recomputes the costs from it.
+If the goal is still reachable the repaired path comes back without a single
+new sample. Otherwise the graph is grown further for at most REPAIR_TIME
+seconds.
+"""
+
+import time
+
+import numpy as np
+from shapely.geometry import Point
+
+from avoidance import rrt
+
+
+REPAIR_TIME = 1.0  # seconds the graph may be grown when the goal was cut off
+
+
+class IncrementalPlanner:
+    """
+    Planner keeping its search graph between obstacle updates
+    Args:
+        boundary (Polygon): fly zone
+        obstacles (list): obstacle rings as built by helpers.circles_to_shape
+        batch_size (int): samples per iteration of the batched RRT* planner
+        sampler (Sampler): optional point sampler
+        repair_time (float): seconds the graph may be grown during a replan
+    """
+
+    def __init__(self, boundary, obstacles, batch_size=rrt.BATCH_SIZE, sampler=None, repair_time=REPAIR_TIME):
+        self.boundary = boundary
+        self.obstacles = dict(enumerate(obstacles))  # obstacle rings by id
+        self.next_id = len(self.obstacles)
+        self.batch_size = batch_size
+        self.sampler = sampler
+        self.repair_time = repair_time
+        self.G = None
+        self.goal = None
+
+    def obstacle_list(self):
+        return list(self.obstacles.values())
+
+    def plan(self, startpos, endpos, deadline=None):
+        """
+        Plans a leg from scratch and keeps its graph for later repairs
+        Returns:
+            Optional[List[Point]]: the relaxed path, None if no path was found
+        """
+        self.goal = endpos
+        self.G, _, _ = rrt.RRT_star(startpos, endpos, self.boundary, self.obstacle_list(),
+                                    batch_size=self.batch_size, sampler=self.sampler, deadline=deadline)
+        return self.path()
+
+    def path(self):
+        if self.G is None or not self.G.success:
+            return None
+        return rrt.relax_path(rrt.dijkstra(self.G), self.obstacle_list())
+
+    def add_obstacle(self, center, radius):
+        """
+        Adds an obstacle and removes every graph edge crossing it
+        Args:
+            center (Tuple[float, float]): utm coordinates of the obstacle center
+            radius (float): radius in meters
+        Returns:
+            int: id of the new obstacle
+        """
+        obstacle_id = self.next_id
+        self.next_id += 1
+        self.obstacles[obstacle_id] = Point(center).buffer(radius).boundary
+        self.invalidate(np.array(center, dtype=float), radius)
+        return obstacle_id
+
+    def remove_obstacle(self, obstacle_id):
+        """
+        Removes an obstacle. No edge becomes invalid, the freed space is used as
+        the graph keeps growing.
+        """
+        del self.obstacles[obstacle_id]
+        self.update_strategy_circles()
+
+    def move_obstacle(self, obstacle_id, center, radius=None):
+        """
+        Moves an obstacle, optionally changing its radius
+        Returns:
+            int: the obstacle id, which stays the same
+        """
+        if radius is None:
+            _, radii = rrt.obstacle_circles([self.obstacles[obstacle_id]])
+            radius = float(radii[0])
+        self.obstacles[obstacle_id] = Point(center).buffer(radius).boundary
+        self.invalidate(np.array(center, dtype=float), radius)
+        return obstacle_id
+
+    def invalidate(self, center, radius):
+        """
+        Removes the graph edges crossing a new obstacle. An edge is at most
+        NEIGHBORHOOD long, so only edges with an end point within radius +
+        NEIGHBORHOOD of the center can cross it.
+        """
+        self.update_strategy_circles()
+        G = self.G
+        if G is None:
+            return
+
+        vertices = G.vertex_array()
+        near = np.flatnonzero(np.linalg.norm(vertices - center, axis=1) <= radius + rrt.NEIGHBORHOOD)
+        pairs = np.array(
+            [(int(idx), n) for idx in near for n, _ in G.neighbors[int(idx)] if n > idx or n not in near],
+            dtype=int,
+        ).reshape(-1, 2)
+        blocked = rrt.segments_intersect_obstacles(
+            vertices[pairs[:, 0]], vertices[pairs[:, 1]], center[None, :], np.array([radius])
+        )
+        G.remove_edges([tuple(pair) for pair in pairs[blocked]])
+
+    def update_strategy_circles(self):
+        if self.G is not None and self.G.strategy is not None:
+            self.G.obstacle_circles = rrt.obstacle_circles(self.obstacle_list())
+
+    def attach(self, position):
+        """
+        Adds the vehicle position to the graph and connects it to every vertex
+        in reach that it can see
+        Returns:
+            int: index of the vertex at the position
+        """
+        G = self.G
+        idx = G.add_vex(position)
+        centers, radii = rrt.obstacle_circles(self.obstacle_list())
+        vertices = G.vertex_array()
+        pos = np.array((position.x, position.y))
+        dists = np.linalg.norm(vertices - pos, axis=1)
+        nearby = np.flatnonzero((dists <= rrt.NEIGHBORHOOD) & (dists > 0))
+        free = ~rrt.segments_intersect_obstacles(
+            np.broadcast_to(pos, (len(nearby), 2)), vertices[nearby], centers, radii
+        )
+        connected = {n for n, _ in G.neighbors[idx]}
+        for near in nearby[free]:
+            if int(near) not in connected:
+                G.add_edge(idx, int(near), float(dists[near]))
+        return idx
+
+    def replan(self, position, goal=None):
+        """
+        Repairs the path from the current vehicle position after obstacle updates
+        Args:
+            position (Point): current vehicle position in utm coordinates
+            goal (Point): new goal, defaults to the goal of the last plan
+        Returns:
+            Optional[List[Point]]: the relaxed path, None if no path was found
+        """
+        goal = goal if goal is not None else self.goal
+        if self.G is None:
+            return self.plan(position, goal, time.time() + self.repair_time)
+
+        self.goal = goal
+        self.attach(position)
+        self.G.reroot(position, goal)
+        goal_idx = self.G.vex2idx.get((goal.x, goal.y))
+        if goal_idx is not None and self.G.distances.get(goal_idx, float("inf")) < float("inf"):
+            self.G.success = True
+            return self.path()
+
+        # the goal was cut off, grow the graph from the vehicle position
+        self.G, _, _ = rrt.RRT_star(position, goal, self.boundary, self.obstacle_list(),
+                                    batch_size=self.batch_size, sampler=self.sampler, tree=self.G,
+                                    deadline=time.time() + self.repair_time)
+        return self.path()
@@ -1,21 +1,36 @@
 # Inspired by https://gist.github.com/Fnjn/58e5eaa27a3dc004c3526ea82a92de80
 
+import heapq
 import math
 import random
+import sys
 import numpy as np
 import shapely
 from avoidance import helpers
 import time
 from avoidance import plotter
+from avoidance import samplers
 from typing import Tuple
 from shapely.geometry import Point, Polygon, LineString
 from collections import deque
 
+try:
+    from shapely import contains_xy
+except ImportError:  # shapely < 2.0
+    from shapely.vectorized import contains as contains_xy
+
 
 STEP_SIZE = 100  # meters
 NEIGHBORHOOD = 200  # meters
 ITERATIONS = 10000  # max number of iterations before failing to find a path
 ITERATIONS_AFTER = 100  # max number of iterations performed in the smaller area
+BATCH_SIZE = 64  # number of samples drawn per iteration in batched mode
+CONVERGENCE_WINDOW = 30  # iterations over which the improvement of the path cost is measured
+CONVERGENCE_GAIN = 0.005  # relative improvement over the window below which the search has converged
+LOWER_BOUND_EPSILON = 0.001  # relative distance to the straight line cost at which a path is optimal
+PRUNE_FRACTION = 0.75  # pruning shrinks a graph over its vertex cap to this fraction of the cap
+CLEARANCE_RANGE = 50  # meters from an obstacle edge within which the clearance cost applies
+PROGRESS_INTERVAL = 100  # iterations between two calls of a progress callback
 
 flyZones = {
     "altitudeMin": 100.0,
@@ -71,7 +86,10 @@ def intersects_obstacle(shape, obstacles):
     return False
 
 
-def nearest(G, q_rand, obstacles):
+def nearest(G, q_rand, obstacles, stats=None):
+    if stats is not None:
+        stats.collision_checks += len(G.vertices)
+
     q_near = None
     q_near_index = None
     min_dist = float("inf")
@@ -91,8 +109,91 @@ def nearest(G, q_rand, obstacles):
     return q_near, q_near_index
 
 
+def obstacle_circles(obstacles):
+    """
+    Recovers the center and radius of every obstacle ring so collision checks
+    can be run against whole arrays of segments at once
+    Args:
+        obstacles (list): shapely rings as built by helpers.circles_to_shape
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (N, 2) array of centers and (N,) array of radii
+    """
+    centers = np.empty((len(obstacles), 2))
+    radii = np.empty(len(obstacles))
+    for i, obstacle in enumerate(obstacles):
+        minx, miny, maxx, maxy = obstacle.bounds
+        centers[i] = ((minx + maxx) / 2, (miny + maxy) / 2)
+        radii[i] = (maxx - minx) / 2
+    return centers, radii
+
+
+def segments_intersect_obstacles(starts, ends, centers, radii):
+    """
+    Vectorized version of intersects_obstacle for K line segments at once.
+    A segment collides when it crosses an obstacle ring, i.e. it passes within
+    the radius of the center while not lying entirely inside the circle.
+    Args:
+        starts (np.ndarray): (K, 2) segment start points
+        ends (np.ndarray): (K, 2) segment end points
+        centers (np.ndarray): (N, 2) obstacle centers
+        radii (np.ndarray): (N,) obstacle radii
+    Returns:
+        np.ndarray: (K,) boolean mask, True where the segment hits an obstacle
+    """
+    if len(radii) == 0 or len(starts) == 0:
+        return np.zeros(len(starts), dtype=bool)
+
+    dirn = ends - starts
+    to_center = centers[None, :, :] - starts[:, None, :]
+    length_sq = np.einsum("ij,ij->i", dirn, dirn)
+    length_sq[length_sq == 0] = 1.0
+
+    # closest point on each segment to each center
+    t = np.clip(np.einsum("knj,kj->kn", to_center, dirn) / length_sq[:, None], 0.0, 1.0)
+    closest = starts[:, None, :] + t[..., None] * dirn[:, None, :]
+    dist_closest = np.linalg.norm(closest - centers[None, :, :], axis=2)
+
+    dist_start = np.linalg.norm(to_center, axis=2)
+    dist_end = np.linalg.norm(centers[None, :, :] - ends[:, None, :], axis=2)
+
+    crosses = (dist_closest <= radii) & (np.maximum(dist_start, dist_end) >= radii)
+    return crosses.any(axis=1)
+
+
+def clearance_costs(starts, ends, lengths, centers, radii, weight):
+    """
+    Edge costs with a clearance term: the length of every edge is scaled up the
+    closer its midpoint passes to an obstacle edge, by up to 1 + weight right on
+    the edge and not at all beyond CLEARANCE_RANGE. Uses the obstacle circles
+    already needed for the vectorized collision checks, so no shapely geometry
+    is involved.
+    Args:
+        starts (np.ndarray): (K, 2) edge start points
+        ends (np.ndarray): (K, 2) edge end points
+        lengths (np.ndarray): (K,) edge lengths
+        centers (np.ndarray): (N, 2) obstacle centers
+        radii (np.ndarray): (N,) obstacle radii
+        weight (float): weight of the clearance term, 0 for plain lengths
+    Returns:
+        np.ndarray: (K,) edge costs
+    """
+    if not weight or len(radii) == 0 or len(starts) == 0:
+        return lengths
+    middle = (starts + ends) / 2
+    clearance = np.abs(np.linalg.norm(middle[:, None, :] - centers[None, :, :], axis=2) - radii).min(axis=1)
+    return lengths * (1 + weight * np.clip(1 - clearance / CLEARANCE_RANGE, 0.0, 1.0))
+
+
+def clearance_cost(p, q, length, centers, radii, weight):
+    """Cost of a single edge between two points, see clearance_costs"""
+    if not weight:
+        return length
+    return float(clearance_costs(np.array([(p.x, p.y)]), np.array([(q.x, q.y)]), np.array([length]),
+                                 centers, radii, weight)[0])
+
+
 def new_vertex(q_rand, q_near, STEP_SIZE):
-    dirn = np.array(q_rand) - np.array(q_near)
+    dirn = np.array((q_rand.x - q_near.x, q_rand.y - q_near.y))
     length = np.linalg.norm(dirn)
     dirn = (dirn / length) * min(STEP_SIZE, length)
 
@@ -100,6 +201,23 @@ def new_vertex(q_rand, q_near, STEP_SIZE):
     return q_new
 
 
+def steer(q_near, q_rand, STEP_SIZE):
+    """
+    Vectorized version of new_vertex, moves from each q_near towards its q_rand
+    by at most STEP_SIZE
+    Args:
+        q_near (np.ndarray): (K, 2) nearest tree vertices
+        q_rand (np.ndarray): (K, 2) sampled points
+        STEP_SIZE (float): maximum extension distance in meters
+    Returns:
+        np.ndarray: (K, 2) new vertices
+    """
+    dirn = q_rand - q_near
+    length = np.linalg.norm(dirn, axis=1)
+    scale = np.minimum(STEP_SIZE, length) / np.where(length > 0, length, 1.0)
+    return q_near + dirn * scale[:, None]
+
+
 def in_boundary(boundary, vertex):
     if boundary.contains(vertex):
         return True
@@ -114,70 +232,467 @@ def get_random_point_in_polygon(poly):
             return p
 
 
+def get_random_points_in_polygon(poly, n):
+    """
+    Draws n uniformly distributed points inside a polygon in one vectorized pass
+    Args:
+        poly (Polygon): area to sample from
+        n (int): number of points
+    Returns:
+        np.ndarray: (n, 2) array of points
+    """
+    minx, miny, maxx, maxy = poly.bounds
+    accepted = []
+    count = 0
+    while count < n:
+        xs = np.random.uniform(minx, maxx, 2 * n)
+        ys = np.random.uniform(miny, maxy, 2 * n)
+        inside = contains_xy(poly, xs, ys)
+        accepted.append(np.column_stack((xs[inside], ys[inside])))
+        count += int(inside.sum())
+    return np.concatenate(accepted)[:n]
+
+
+class ConvergenceMonitor:
+    """
+    Decides when the path cost has stopped improving. The cost is tracked over
+    a sliding window of iterations and the search is done when the relative
+    gain over the window drops below min_gain, or when the cost is within
+    epsilon of the straight line distance, which no path can beat.
+    Args:
+        lower_bound (float): straight line distance between start and goal
+        window (int): number of iterations the gain is measured over
+        min_gain (float): relative gain below which the search has converged
+        epsilon (float): relative distance to the lower bound considered optimal
+    """
+
+    def __init__(self, lower_bound, window=CONVERGENCE_WINDOW, min_gain=CONVERGENCE_GAIN,
+                 epsilon=LOWER_BOUND_EPSILON):
+        self.lower_bound = lower_bound
+        self.window = window
+        self.min_gain = min_gain
+        self.epsilon = epsilon
+        self.history = deque()  # (iteration, cost)
+
+    def update(self, iteration, cost):
+        """
+        Records the best cost at an iteration
+        Returns:
+            Optional[str]: "lower_bound" or "converged" if the search should stop, else None
+        """
+        if cost <= self.lower_bound * (1 + self.epsilon):
+            return "lower_bound"
+
+        self.history.append((iteration, cost))
+        while len(self.history) > 1 and self.history[1][0] <= iteration - self.window:
+            self.history.popleft()
+
+        oldest_iteration, oldest_cost = self.history[0]
+        if iteration - oldest_iteration >= self.window and (oldest_cost - cost) / oldest_cost < self.min_gain:
+            return "converged"
+        return None
+
+
 class Graph:
-    def __init__(self, startpos, endpos):
+    def __init__(self, startpos, endpos, sampler=None, strategy=None, obstacles=()):
         self.startpos = startpos
         self.endpos = endpos
+        self.sampler = sampler
+        self.strategy = strategy
+        self.sample_counts = {}  # samples drawn per sampling strategy
+        if strategy is not None:
+            self.sampler = sampler if sampler is not None else samplers.Sampler()
+            self.obstacle_circles = obstacle_circles(obstacles)
 
         self.vertices = [startpos]
         self.edges = []
         self.success = False
+        self.stop_reason = None  # why planning stopped, set by the planners
+        self.stats = None  # optional PlannerStats counting added vertices and edges
 
         self.vex2idx = {(startpos.x, startpos.y): 0}
         self.neighbors = {0: []}
         self.distances = {0: 0.0}
 
+        # coordinates of self.vertices kept as an array for vectorized queries
+        self.coords = np.empty((64, 2))
+        self.coords[0] = (startpos.x, startpos.y)
+
     def add_vex(self, pos):
         try:
-            idx = self.vex2idx[pos]
-        except:
+            idx = self.vex2idx[(pos.x, pos.y)]
+        except KeyError:
             idx = len(self.vertices)
             self.vertices.append(pos)
             self.vex2idx[(pos.x, pos.y)] = idx
             self.neighbors[idx] = []
+            if self.stats is not None:
+                self.stats.vertices += 1
+            if idx == len(self.coords):
+                self.coords = np.concatenate((self.coords, np.empty_like(self.coords)))
+            self.coords[idx] = (pos.x, pos.y)
         return idx
 
+    def vertex_array(self):
+        return self.coords[: len(self.vertices)]
+
+    def reroot(self, startpos, endpos):
+        """
+        Reuses the tree for a new leg. The new start must already be a vertex,
+        the cost of every vertex is recomputed from it.
+        """
+        self.startpos = startpos
+        self.endpos = endpos
+        self.success = False
+        self.stop_reason = None
+        self.sample_counts = {}
+
+        dist, _ = shortest_paths(self, self.vex2idx[(startpos.x, startpos.y)])
+        self.distances = {idx: dist.get(idx, float("inf")) for idx in self.neighbors}
+
+    def can_reroot(self, startpos):
+        return (startpos.x, startpos.y) in self.vex2idx
+
+    def memory_usage(self):
+        """
+        Returns:
+            dict: number of vertices and edges and an estimate of the bytes held by
+            the graph on the Python side (shapely's native geometries are not included)
+        """
+        size = sys.getsizeof
+        edge_size = size((0, 0.0))
+        nbytes = (
+            size(self.vertices)
+            + sum(size(p) for p in self.vertices)
+            + size(self.edges)
+            + len(self.edges) * edge_size
+            + size(self.vex2idx)
+            + size(self.distances)
+            + size(self.neighbors)
+            + sum(size(n) + len(n) * edge_size for n in self.neighbors.values())
+            + self.coords.nbytes
+        )
+        return {"vertices": len(self.vertices), "edges": len(self.edges), "bytes": nbytes}
+
+    def compact(self, keep):
+        """
+        Drops every vertex not listed in keep together with its edges and
+        renumbers the remaining vertices in order
+        Args:
+            keep (np.ndarray): sorted indices of the vertices to keep
+        """
+        remap = {int(old): new for new, old in enumerate(keep)}
+        self.vertices = [self.vertices[old] for old in remap]
+        coords = self.coords[np.asarray(keep, dtype=int)]
+        self.coords = np.empty((max(64, 2 * len(coords)), 2))
+        self.coords[: len(coords)] = coords
+        self.vex2idx = {(p.x, p.y): idx for idx, p in enumerate(self.vertices)}
+        self.neighbors = {
+            new: [(remap[idx], cost) for idx, cost in self.neighbors[old] if idx in remap]
+            for old, new in remap.items()
+        }
+        self.edges = [(remap[a], remap[b]) for a, b in self.edges if a in remap and b in remap]
+        self.distances = {remap[old]: cost for old, cost in self.distances.items() if old in remap}
+
+    def prune(self, max_vertices=None):
+        """
+        Branch and bound pruning: once a path is known, vertices whose cost from
+        the start plus straight line distance to the goal exceeds the path cost can
+        not be part of a shorter path and are dropped. If the graph still holds more
+        than PRUNE_FRACTION of max_vertices, only the vertices with the lowest such
+        bound are kept, plus the vertices of the best path. The shortest path tree
+        is closed under this bound, so the remaining graph stays connected.
+        Args:
+            max_vertices (int): optional vertex cap
+        Returns:
+            int: number of vertices removed
+        """
+        count = len(self.vertices)
+        start_idx = self.vex2idx[(self.startpos.x, self.startpos.y)]
+        dist, prev = shortest_paths(self, start_idx)
+        costs = np.fromiter((dist.get(idx, float("inf")) for idx in range(count)), float, count)
+        bound = costs + np.linalg.norm(self.vertex_array() - (self.endpos.x, self.endpos.y), axis=1)
+
+        goal_idx = self.vex2idx.get((self.endpos.x, self.endpos.y))
+        best_cost = costs[goal_idx] if goal_idx is not None else float("inf")
+        keep = np.isfinite(bound) & (bound <= best_cost + 1e-6)
+
+        if max_vertices is not None and keep.sum() > max_vertices * PRUNE_FRACTION:
+            candidates = np.flatnonzero(keep)
+            candidates = candidates[np.argsort(bound[candidates], kind="stable")]
+            keep[:] = False
+            keep[candidates[: int(max_vertices * PRUNE_FRACTION)]] = True
+        keep[start_idx] = True
+        if goal_idx is not None and np.isfinite(best_cost):
+            # the cap must not cut the best known path
+            idx = goal_idx
+            while idx is not None:
+                keep[idx] = True
+                idx = prev.get(idx)
+        self.compact(np.flatnonzero(keep))
+
+        # ties in the bound may cut a vertex off its shortest path
+        while True:
+            dist, _ = shortest_paths(self, self.vex2idx[(self.startpos.x, self.startpos.y)])
+            if len(dist) == len(self.vertices):
+                break
+            self.compact(np.array(sorted(dist)))
+        self.distances = dist
+        self.success = (self.endpos.x, self.endpos.y) in self.vex2idx
+        return count - len(self.vertices)
+
+    def remove_edges(self, pairs):
+        """
+        Removes edges in both directions
+        Args:
+            pairs (Iterable[Tuple[int, int]]): vertex index pairs of the edges
+        """
+        removed = set(pairs)
+        removed |= {(b, a) for a, b in removed}
+        for a, b in removed:
+            self.neighbors[a] = [(idx, cost) for idx, cost in self.neighbors[a] if idx != b]
+        self.edges = [edge for edge in self.edges if edge not in removed]
+
     def add_edge(self, idx1, idx2, cost):
+        if self.stats is not None:
+            self.stats.edges += 1
         self.edges.append((idx1, idx2))
         self.neighbors[idx1].append((idx2, cost))
         self.neighbors[idx2].append((idx1, cost))
 
     def randomPosition(self, boundary):
+        if self.strategy is not None:
+            return Point(self.randomPositions(boundary, 1)[0])
+        if self.sampler is not None:
+            return self.sampler.sample(boundary)
         return get_random_point_in_polygon(boundary)
 
-
-def RRT_star(startpos, endpos, boundary, obstacles, informed_boundary_set=False):
-    G = Graph(startpos, endpos)
+    def randomPositions(self, boundary, n):
+        if self.strategy is not None:
+            centers, radii = self.obstacle_circles
+            return self.strategy.sample_batch(
+                self.sampler, boundary, n, self.endpos, centers, radii, self.sample_counts
+            )
+        if self.sampler is not None:
+            return self.sampler.sample_batch(boundary, n)
+        return get_random_points_in_polygon(boundary, n)
+
+
+def cap_graph(G, max_vertices, stats=None):
+    """Prunes the graph when it grew past its vertex cap"""
+    if max_vertices is None or len(G.vertices) <= max_vertices:
+        return
+    if stats is not None:
+        stats.record_memory(G.memory_usage())
+    removed = G.prune(max_vertices)
+    if stats is not None:
+        stats.pruned += removed
+        stats.lap("prune")
+
+
+def start_graph(startpos, endpos, obstacles, sampler=None, strategy=None, tree=None, stats=None):
+    """
+    Creates the graph a leg is planned on. When the tree of a previous leg is
+    given and contains the new start it is re-rooted and grown further instead
+    of starting from scratch, so the already explored field is kept.
+    Args:
+        startpos (Point): start of the leg
+        endpos (Point): goal of the leg
+        obstacles (list): obstacle rings
+        sampler (Sampler): optional point sampler
+        strategy (SamplingStrategy): optional sampling strategy
+        tree (Graph): optional graph of the previous leg
+        stats (PlannerStats): optional statistics of the leg
+    Returns:
+        Graph: the graph to plan on
+    """
+    if tree is None or not tree.can_reroot(startpos):
+        G = Graph(startpos, endpos, sampler, strategy, obstacles)
+        G.stats = stats
+        return G
+
+    tree.stats = stats
+    tree.reroot(startpos, endpos)
+    tree.sampler = sampler
+    tree.strategy = strategy
+    if strategy is not None:
+        tree.sampler = sampler if sampler is not None else samplers.Sampler()
+        tree.obstacle_circles = obstacle_circles(obstacles)
+
+    # the explored field often already reaches the new goal
+    centers, radii = obstacle_circles(obstacles)
+    goal = np.array((endpos.x, endpos.y))
+    vertices = tree.vertex_array()
+    dists = np.linalg.norm(vertices - goal, axis=1)
+    nearby = np.flatnonzero((dists <= STEP_SIZE) & (dists > 0))
+    blocked = segments_intersect_obstacles(
+        vertices[nearby], np.broadcast_to(goal, (len(nearby), 2)), centers, radii
+    )
+    nearby = nearby[~blocked]
+    if len(nearby) or tree.can_reroot(endpos):
+        endidx = tree.add_vex(endpos)
+        for idx in nearby:
+            tree.add_edge(int(idx), endidx, float(dists[idx]))
+            tree.distances[endidx] = min(
+                tree.distances.get(endidx, float("inf")), tree.distances[int(idx)] + float(dists[idx])
+            )
+        tree.success = tree.distances.get(endidx, float("inf")) < float("inf")
+    return tree
+
+
+def RRT_star(
+    startpos,
+    endpos,
+    boundary,
+    obstacles,
+    informed_boundary_set=False,
+    batch_size=None,
+    sampler=None,
+    strategy=None,
+    tree=None,
+    deadline=None,
+    best_cost=None,
+    early_termination=False,
+    stats=None,
+    max_vertices=None,
+    clearance_weight=0.0,
+    cancel=None,
+    progress=None,
+):
+    """
+    Args:
+        startpos (Point): start of the leg
+        endpos (Point): goal of the leg
+        boundary (Polygon): fly zone
+        obstacles (list): obstacle rings
+        informed_boundary_set (bool): start directly in the informed phase
+        batch_size (int): if set, use RRT_star_batched with this many samples per iteration
+        sampler (Sampler): optional point sampler
+        strategy (SamplingStrategy): optional sampling strategy
+        tree (Graph): optional graph of the previous leg to re-root and reuse
+        deadline (float): optional time.time() value after which planning stops
+        best_cost: optional shared bound on the path cost with get() and offer(cost)
+            methods, samples that can not lead to a shorter path are skipped and
+            every path found is offered to it
+        early_termination (bool): stop the informed phase as soon as the path cost
+            converges or reaches the straight line lower bound, see ConvergenceMonitor
+        stats (PlannerStats): optional statistics object filled with counters and
+            phase timings, instrumentation is skipped when None
+        max_vertices (int): optional cap on the graph size, the graph is pruned with
+            Graph.prune whenever it grows past it
+        clearance_weight (float): weight of the clearance term of the edge costs,
+            see clearance_costs, 0 plans for the shortest path
+        cancel: optional token with an is_set() method, e.g. a multiprocessing.Event,
+            checked every iteration, planning stops as soon as it is set
+        progress (callable): optional callback called every PROGRESS_INTERVAL
+            iterations with the iteration count and the best path cost, None
+            before a path is found
+    Returns:
+        Tuple[Graph, Polygon, Polygon]: the graph, the informed ellipse and the
+        informed boundary. G.stop_reason tells why planning stopped: "lower_bound",
+        "converged", "iterations_after", "deadline", "cancelled" or "max_iterations"
+    """
+    if batch_size:
+        return RRT_star_batched(
+            startpos,
+            endpos,
+            boundary,
+            obstacles,
+            informed_boundary_set=informed_boundary_set,
+            batch_size=batch_size,
+            sampler=sampler,
+            strategy=strategy,
+            tree=tree,
+            deadline=deadline,
+            best_cost=best_cost,
+            early_termination=early_termination,
+            stats=stats,
+            max_vertices=max_vertices,
+            clearance_weight=clearance_weight,
+            cancel=cancel,
+            progress=progress,
+        )
+
+    G = start_graph(startpos, endpos, obstacles, sampler, strategy, tree, stats)
+    centers, radii = obstacle_circles(obstacles) if clearance_weight else (None, None)
 
     ellr = None
     informed_boundary = None
 
+    if G.success and not informed_boundary_set:
+        print("SUCCESS: Found a path in the reused tree")
+        record_first_solution(stats)
+        informed_boundary_set = True
+        ellr, informed_boundary = informed_search_area(G, boundary, stats)
+        boundary = informed_boundary
+
     counter = 0
+    monitor = ConvergenceMonitor(startpos.distance(endpos))
 
     for i in range(ITERATIONS):
         # print(i)
+        if stats is not None:
+            stats.start()
+        cap_graph(G, max_vertices, stats)
+        if early_termination and G.success:
+            G.stop_reason = monitor.update(i, G.distances[G.vex2idx[(endpos.x, endpos.y)]])
+            if G.stop_reason is not None:
+                print(f"Stopped after {i} iterations, path cost {G.stop_reason}")
+                break
+
         if informed_boundary_set:
             # print(f'Counter {counter}')
             counter += 1
 
         if counter >= ITERATIONS_AFTER:
             print(f"Iterated for {counter} additional times in the smaller area")
+            G.stop_reason = "iterations_after"
             break
 
+        if deadline is not None and time.time() >= deadline:
+            G.stop_reason = "deadline"
+            break
+
+        if cancel is not None and cancel.is_set():
+            G.stop_reason = "cancelled"
+            break
+
+        if progress is not None and i % PROGRESS_INTERVAL == 0:
+            report_progress(G, i, progress)
+
         q_rand = G.randomPosition(boundary)
+        if stats is not None:
+            stats.iterations += 1
+            stats.samples += 1
+            stats.collision_checks += 1
+            stats.lap("sample")
         if intersects_obstacle(q_rand, obstacles):
+            if stats is not None:
+                stats.rejected_samples += 1
             continue
 
-        q_near, q_near_index = nearest(G, q_rand, obstacles)
-        if q_near is None:
+        # skip samples that can not be part of a path shorter than the best known one
+        if best_cost is not None and startpos.distance(q_rand) + q_rand.distance(endpos) >= best_cost.get():
+            if stats is not None:
+                stats.rejected_samples += 1
+            continue
+
+        q_near, q_near_index = nearest(G, q_rand, obstacles, stats)
+        if stats is not None:
+            stats.lap("nearest")
+        if q_near is None or q_near.distance(q_rand) == 0:
+            if stats is not None:
+                stats.rejected_samples += 1
             continue
 
         q_new = new_vertex(q_rand, q_near, STEP_SIZE)
 
         q_new_index = G.add_vex(q_new)
-        dist = q_new.distance(q_near)
+        dist = clearance_cost(q_near, q_new, q_new.distance(q_near), centers, radii, clearance_weight)
         G.add_edge(q_new_index, q_near_index, dist)
         G.distances[q_new_index] = G.distances[q_near_index] + dist
+        if stats is not None:
+            stats.lap("extend")
 
         # update nearby vertices distance if q_new can help
         # make a shorter path
@@ -190,16 +705,27 @@ def RRT_star(startpos, endpos, boundary, obstacles, informed_boundary_set=False)
                 continue
 
             line = LineString([vex, q_new])
+            if stats is not None:
+                stats.collision_checks += 1
             if intersects_obstacle(line, obstacles):
                 continue
 
             idx = G.vex2idx[(vex.x, vex.y)]
+            dist = clearance_cost(vex, q_new, dist, centers, radii, clearance_weight)
             if G.distances[q_new_index] + dist < G.distances[idx]:
                 G.add_edge(idx, q_new_index, dist)
                 G.distances[idx] = G.distances[q_new_index] + dist
+                if stats is not None:
+                    stats.rewires += 1
+
+        if stats is not None:
+            stats.lap("rewire")
 
         dist = q_new.distance(G.endpos)
-        if dist <= STEP_SIZE:
+        if stats is not None and dist <= STEP_SIZE:
+            stats.collision_checks += 1
+        if dist <= STEP_SIZE and not intersects_obstacle(LineString([q_new, G.endpos]), obstacles):
+            dist = clearance_cost(q_new, G.endpos, dist, centers, radii, clearance_weight)
             endidx = G.add_vex(G.endpos)
             G.add_edge(q_new_index, endidx, dist)
             try:
@@ -208,27 +734,328 @@ def RRT_star(startpos, endpos, boundary, obstacles, informed_boundary_set=False)
                 G.distances[endidx] = G.distances[q_new_index] + dist
 
             G.success = True
+            if best_cost is not None:
+                best_cost.offer(G.distances[endidx])
             # print('success')
             # break
 
             if not informed_boundary_set:
                 print(f"SUCCESS: Found a path after iterating {i} times")
+                record_first_solution(stats)
 
                 informed_boundary_set = True
 
-                path = dijkstra(G)  # get path
-                ellr = informed_area(startpos, endpos, path)  # find informed area
-
-                informed_boundary = boundary.intersection(ellr)  # intersect with boundary
+                if stats is not None:
+                    stats.lap("goal")
+                ellr, informed_boundary = informed_search_area(G, boundary, stats)
                 boundary = informed_boundary
                 print("Updated search area to the informed boundary")
 
             # print('success')
             # break
 
+        if stats is not None:
+            stats.lap("goal")
+
+    if G.stop_reason is None:
+        G.stop_reason = "max_iterations"
+    record_result(G, stats)
+
+    return G, ellr, informed_boundary
+
+
+def RRT_star_batched(
+    startpos,
+    endpos,
+    boundary,
+    obstacles,
+    informed_boundary_set=False,
+    batch_size=BATCH_SIZE,
+    sampler=None,
+    strategy=None,
+    tree=None,
+    deadline=None,
+    best_cost=None,
+    early_termination=False,
+    stats=None,
+    max_vertices=None,
+    clearance_weight=0.0,
+    cancel=None,
+    progress=None,
+):
+    """
+    Batched variant of RRT_star. Every iteration draws batch_size samples at once,
+    finds their nearest vertices with a single distance query, steers them with
+    array math and drops colliding extensions with one vectorized check. Only the
+    surviving vertices are inserted and rewired one at a time. Iteration limits
+    (ITERATIONS, ITERATIONS_AFTER) are counted in samples, as in RRT_star.
+    """
+    G = start_graph(startpos, endpos, obstacles, sampler, strategy, tree, stats)
+    centers, radii = obstacle_circles(obstacles)
+    start = np.array((startpos.x, startpos.y))
+    goal = np.array((endpos.x, endpos.y))
+
+    ellr = None
+    informed_boundary = None
+
+    if G.success and not informed_boundary_set:
+        print("SUCCESS: Found a path in the reused tree")
+        record_first_solution(stats)
+        informed_boundary_set = True
+        ellr, informed_boundary = informed_search_area(G, boundary, stats)
+        boundary = informed_boundary
+
+    counter = 0
+    monitor = ConvergenceMonitor(startpos.distance(endpos))
+    i = 0
+
+    while i < ITERATIONS:
+        if stats is not None:
+            stats.start()
+        cap_graph(G, max_vertices, stats)
+        if early_termination and G.success:
+            G.stop_reason = monitor.update(i, G.distances[G.vex2idx[(endpos.x, endpos.y)]])
+            if G.stop_reason is not None:
+                print(f"Stopped after {i} iterations, path cost {G.stop_reason}")
+                break
+
+        if informed_boundary_set:
+            counter += batch_size
+
+        if counter >= ITERATIONS_AFTER:
+            print(f"Iterated for {counter} additional times in the smaller area")
+            G.stop_reason = "iterations_after"
+            break
+
+        if deadline is not None and time.time() >= deadline:
+            G.stop_reason = "deadline"
+            break
+
+        if cancel is not None and cancel.is_set():
+            G.stop_reason = "cancelled"
+            break
+
+        if progress is not None and i % PROGRESS_INTERVAL < batch_size:
+            report_progress(G, i, progress)
+
+        q_rand = G.randomPositions(boundary, batch_size)
+        i += batch_size
+
+        # skip samples that can not be part of a path shorter than the best known one
+        if best_cost is not None:
+            heuristic = np.linalg.norm(q_rand - start, axis=1) + np.linalg.norm(q_rand - goal, axis=1)
+            q_rand = q_rand[heuristic < best_cost.get()]
+
+        if stats is not None:
+            stats.iterations += 1
+            stats.samples += batch_size
+            stats.rejected_samples += batch_size - len(q_rand)
+            stats.lap("sample")
+        if len(q_rand) == 0:
+            continue
+
+        # nearest vertex of every sample in one query against the current tree
+        vertices = G.vertex_array()
+        diff = q_rand[:, None, :] - vertices[None, :, :]
+        q_near_index = np.argmin(np.einsum("kvj,kvj->kv", diff, diff), axis=1)
+        q_near = vertices[q_near_index]
+
+        q_new = steer(q_near, q_rand, STEP_SIZE)
+        blocked = segments_intersect_obstacles(q_near, q_new, centers, radii)
+        if stats is not None:
+            stats.collision_checks += len(q_new)
+            stats.rejected_samples += int(blocked.sum())
+            stats.lap("nearest")
+
+        for k in np.flatnonzero(~blocked):
+            near_index = int(q_near_index[k])
+            q_new_index = G.add_vex(Point(q_new[k]))
+            if q_new_index == near_index:
+                if stats is not None:
+                    stats.rejected_samples += 1
+                continue
+            dist = float(np.linalg.norm(q_new[k] - q_near[k]))
+            dist = float(clearance_costs(q_near[k : k + 1], q_new[k : k + 1], np.array([dist]),
+                                         centers, radii, clearance_weight)[0])
+            G.add_edge(q_new_index, near_index, dist)
+            G.distances[q_new_index] = G.distances[near_index] + dist
+            if stats is not None:
+                stats.lap("extend")
+
+            # update nearby vertices distance if q_new can help
+            # make a shorter path
+            vertices = G.vertex_array()
+            dists = np.linalg.norm(vertices - q_new[k], axis=1)
+            nearby = np.flatnonzero(dists <= NEIGHBORHOOD)
+            nearby = nearby[nearby != q_new_index]
+            dists[nearby] = clearance_costs(np.broadcast_to(q_new[k], (len(nearby), 2)), vertices[nearby],
+                                            dists[nearby], centers, radii, clearance_weight)
+            costs = np.fromiter((G.distances[idx] for idx in nearby), float, len(nearby))
+            nearby = nearby[G.distances[q_new_index] + dists[nearby] < costs]
+            free = ~segments_intersect_obstacles(
+                np.broadcast_to(q_new[k], (len(nearby), 2)), vertices[nearby], centers, radii
+            )
+            for idx in nearby[free]:
+                G.add_edge(int(idx), q_new_index, float(dists[idx]))
+                G.distances[int(idx)] = G.distances[q_new_index] + float(dists[idx])
+            if stats is not None:
+                stats.collision_checks += len(nearby)
+                stats.rewires += int(free.sum())
+                stats.lap("rewire")
+
+            dist = float(np.linalg.norm(q_new[k] - goal))
+            reaches_goal = dist <= STEP_SIZE
+            if reaches_goal:
+                if stats is not None:
+                    stats.collision_checks += 1
+                reaches_goal = not segments_intersect_obstacles(q_new[k : k + 1], goal[None, :], centers, radii)[0]
+            if reaches_goal:
+                dist = float(clearance_costs(q_new[k : k + 1], goal[None, :], np.array([dist]),
+                                             centers, radii, clearance_weight)[0])
+                endidx = G.add_vex(G.endpos)
+                G.add_edge(q_new_index, endidx, dist)
+                G.distances[endidx] = min(G.distances.get(endidx, float("inf")), G.distances[q_new_index] + dist)
+
+                G.success = True
+                if best_cost is not None:
+                    best_cost.offer(G.distances[endidx])
+
+                if not informed_boundary_set:
+                    print(f"SUCCESS: Found a path after iterating {i} times")
+                    record_first_solution(stats)
+
+                    informed_boundary_set = True
+
+                    if stats is not None:
+                        stats.lap("goal")
+                    ellr, informed_boundary = informed_search_area(G, boundary, stats)
+                    boundary = informed_boundary
+                    print("Updated search area to the informed boundary")
+
+            if stats is not None:
+                stats.lap("goal")
+
+    if G.stop_reason is None:
+        G.stop_reason = "max_iterations"
+    record_result(G, stats)
+
     return G, ellr, informed_boundary
 
 
+def report_progress(G, iterations, progress):
+    """Calls a progress callback with the iteration count and the best path cost so far"""
+    cost = G.distances[G.vex2idx[(G.endpos.x, G.endpos.y)]] if G.success else None
+    progress(iterations, cost)
+
+
+def record_first_solution(stats):
+    """Notes how many iterations and samples it took to find the first path"""
+    if stats is not None and stats.first_solution_iteration is None:
+        stats.first_solution_iteration = stats.iterations
+        stats.first_solution_samples = stats.samples
+
+
+def record_result(G, stats):
+    """Copies the outcome of a planner run into its statistics"""
+    if stats is None:
+        return
+    stats.success = G.success
+    stats.stop_reason = G.stop_reason
+    stats.record_memory(G.memory_usage())
+    stats.sample_counts = dict(G.sample_counts)
+    stats.strategy = repr(G.strategy) if G.strategy is not None else None
+
+
+def extend(G, q_target, centers, radii):
+    """
+    Grows the tree one step from its nearest vertex towards q_target
+    Args:
+        G (Graph): tree to grow
+        q_target (np.ndarray): (2,) point to grow towards
+        centers (np.ndarray): (N, 2) obstacle centers
+        radii (np.ndarray): (N,) obstacle radii
+    Returns:
+        Optional[int]: index of the new (or reached) vertex, None if the step collides
+    """
+    vertices = G.vertex_array()
+    near_index = int(np.argmin(np.linalg.norm(vertices - q_target, axis=1)))
+    q_near = vertices[near_index]
+    q_new = steer(q_near[None, :], q_target[None, :], STEP_SIZE)
+    if np.array_equal(q_new[0], q_near):
+        return near_index
+    if segments_intersect_obstacles(q_near[None, :], q_new, centers, radii)[0]:
+        return None
+
+    q_new_index = G.add_vex(Point(q_new[0]))
+    dist = float(np.linalg.norm(q_new[0] - q_near))
+    G.add_edge(q_new_index, near_index, dist)
+    G.distances[q_new_index] = G.distances[near_index] + dist
+    return q_new_index
+
+
+def RRT_connect(startpos, endpos, boundary, obstacles, sampler=None, deadline=None):
+    """
+    Bidirectional RRT-Connect. One tree grows from the start and one from the
+    goal, each sample extends one tree and the other one greedily tries to
+    connect to the new vertex, then the trees swap roles. It stops at the first
+    connection, so it finds a path quickly but does not improve it.
+    Returns:
+        Tuple[Graph, None, None]: the merged graph, in the same shape as RRT_star
+    """
+    centers, radii = obstacle_circles(obstacles)
+    start_tree = Graph(startpos, endpos, sampler)
+    goal_tree = Graph(endpos, startpos, sampler)
+    trees = [start_tree, goal_tree]
+
+    G = Graph(startpos, endpos, sampler)
+    for i in range(ITERATIONS):
+        if deadline is not None and time.time() >= deadline:
+            G.stop_reason = "deadline"
+            return G, None, None
+
+        tree, other = trees
+        new_index = extend(tree, tree.randomPositions(boundary, 1)[0], centers, radii)
+        trees.reverse()
+        if new_index is None:
+            continue
+
+        target = tree.coords[new_index]
+        while True:
+            other_index = extend(other, target, centers, radii)
+            if other_index is None:
+                break
+            if np.array_equal(other.coords[other_index], target):
+                print(f"SUCCESS: Connected both trees after iterating {i} times")
+                # the meeting vertex has the same coordinates in both trees so
+                # add_vex merges them into one
+                for half in (start_tree, goal_tree):
+                    for idx1, idx2 in half.edges:
+                        cost = float(np.linalg.norm(half.coords[idx1] - half.coords[idx2]))
+                        G.add_edge(G.add_vex(half.vertices[idx1]), G.add_vex(half.vertices[idx2]), cost)
+                G.add_vex(endpos)
+                G.distances, _ = shortest_paths(G, 0)
+                G.success = True
+                G.stop_reason = "connected"
+                return G, None, None
+
+    G.stop_reason = "max_iterations"
+    return G, None, None
+
+
+def informed_search_area(G, boundary, stats=None):
+    """
+    Shrinks the search area to the informed area around the current best path
+    Returns:
+        Tuple[Polygon, Polygon]: the informed ellipse and its intersection with the boundary
+    """
+    path = dijkstra(G, stats)  # get path
+    ellr = informed_area(G.startpos, G.endpos, path)  # find informed area
+    informed_boundary = boundary.intersection(ellr)  # intersect with boundary
+    if stats is not None:
+        stats.lap("informed")
+    return ellr, informed_boundary
+
+
 def informed_area(q_start, q_goal, path):
     expansion = 0  # initial expansion amount
     expansion_rate = 10  # meters
@@ -277,39 +1104,58 @@ def informed_area(q_start, q_goal, path):
     return ellr
 
 
-def dijkstra(G):
-    srcIdx = G.vex2idx[(G.startpos.x, G.startpos.y)]
-    dstIdx = G.vex2idx[(G.endpos.x, G.endpos.y)]
-
-    # build dijkstra
-    nodes = list(G.neighbors.keys())
-    dist = {node: float("inf") for node in nodes}
-    prev = {node: None for node in nodes}
-    dist[srcIdx] = 0
-
-    while nodes:
-        curNode = min(nodes, key=lambda node: dist[node])
-        nodes.remove(curNode)
-        if dist[curNode] == float("inf"):
-            break
+def shortest_paths(G, srcIdx):
+    """
+    Heap based Dijkstra search over the graph
+    Args:
+        G (Graph): graph to search
+        srcIdx (int): index of the source vertex
+    Returns:
+        Tuple[dict, dict]: cost of every reachable vertex and its predecessor
+    """
+    dist = {srcIdx: 0.0}
+    prev = {srcIdx: None}
+    heap = [(0.0, srcIdx)]
+
+    while heap:
+        curDist, curNode = heapq.heappop(heap)
+        if curDist > dist[curNode]:
+            continue
 
         for neighbor, cost in G.neighbors[curNode]:
-            newCost = dist[curNode] + cost
-            if newCost < dist[neighbor]:
+            newCost = curDist + cost
+            if newCost < dist.get(neighbor, float("inf")):
                 dist[neighbor] = newCost
                 prev[neighbor] = curNode
+                heapq.heappush(heap, (newCost, neighbor))
+
+    return dist, prev
+
+
+def dijkstra(G, stats=None):
+    if stats is not None:
+        stats.start()
+
+    srcIdx = G.vex2idx[(G.startpos.x, G.startpos.y)]
+    dstIdx = G.vex2idx[(G.endpos.x, G.endpos.y)]
+
+    dist, prev = shortest_paths(G, srcIdx)
 
     # retrieve path
     path = deque()
     curNode = dstIdx
-    while prev[curNode] is not None:
+    while prev.get(curNode) is not None:
         path.appendleft(G.vertices[curNode])
         curNode = prev[curNode]
     path.appendleft(G.vertices[curNode])
+    if stats is not None:
+        stats.lap("dijkstra")
     return list(path)
 
 
-def relax_path(path, obstacles):
+def relax_path(path, obstacles, stats=None):
+    if stats is not None:
+        stats.start()
     if len(path) < 3:
         return path
 
@@ -322,12 +1168,16 @@ def relax_path(path, obstacles):
             front_curr = path[i]
             front_next = path[i + 2]
             line = LineString([front_curr, front_next])
+            if stats is not None:
+                stats.collision_checks += 1
             if intersects_obstacle(line, obstacles):
                 i += 1
             else:
                 del path[i + 1]
         path.reverse()
 
+    if stats is not None:
+        stats.lap("relax")
     return path
 
 
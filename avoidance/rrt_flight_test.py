@@ -1,8 +1,16 @@
 from avoidance import rrt
+from avoidance import clearance
 from avoidance import helpers
+from avoidance import metrics
 from avoidance import plotter
+from avoidance import portfolio
+from avoidance import samplers
+from avoidance import simplify
+from avoidance import stats as planner_stats
+from avoidance import validation
+import functools
 import time
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional, Sequence, Union
 
 flyZones = {
     "altitudeMin": 100.0,
@@ -51,9 +59,71 @@ obstacles = [
 ]
 
 
-def rrt_flight_test(obstacles: List[Dict[str, float]], waypoints: List[Dict[str, float]],
-                    boundary: List[Dict[str, float]]):
-    
+def log_leg_metrics(path, centers, radii, fence, leg_stats=None):
+    """Prints the quality metrics of a planned leg, measured against the real obstacles and fence"""
+    leg_metrics = metrics.path_metrics(metrics.path_array(path), centers, radii, fence)
+    print(metrics.format_metrics(leg_metrics))
+    if leg_stats is not None:
+        leg_stats.path_metrics = leg_metrics
+
+
+def rrt_flight_legs(obstacles: List[Dict[str, float]], waypoints: List[Dict[str, float]],
+                    boundary: List[Dict[str, float]], batch_size: Optional[int] = None,
+                    sampler: Optional[samplers.Sampler] = None,
+                    strategy: Union[None, samplers.SamplingStrategy,
+                                    Sequence[Optional[samplers.SamplingStrategy]]] = None,
+                    reuse_tree: bool = False,
+                    planner_portfolio: Optional[portfolio.Portfolio] = None,
+                    early_termination: bool = False,
+                    stats: Optional[planner_stats.MissionStats] = None,
+                    max_vertices: Optional[int] = None,
+                    safety_margin: float = clearance.SAFETY_MARGIN,
+                    clearance_weight: float = 0.0,
+                    simplify_tolerance: Optional[float] = simplify.SIMPLIFY_TOLERANCE,
+                    cancel=None, progress: Optional[Callable[[int, int, Optional[float]], None]] = None):
+    """
+    Plans an obstacle free route through every waypoint of a mission, handing out
+    the route of each leg as soon as it is solved so flying can start before the
+    later legs are planned
+    Args:
+        obstacles (List[Dict[str, float]]): stationary obstacles in lat/lon with radius in feet
+        waypoints (List[Dict[str, float]]): mission waypoints in lat/lon
+        boundary (List[Dict[str, float]]): fly zone boundary points in lat/lon
+        batch_size (Optional[int]): if set, run the batched planner drawing this many
+            samples per iteration instead of one
+        sampler (Optional[samplers.Sampler]): point sampler shared by every leg,
+            defaults to uniform sampling
+        strategy: sampling strategy used for every leg, or a sequence holding the
+            strategy of each leg (None entries use uniform sampling)
+        reuse_tree (bool): keep the tree of each solved leg and re-root it at the
+            start of the next leg instead of planning every leg from scratch, needs
+            batch_size as the single sample planner rewires in a loop over every
+            vertex and slows down with the size of the reused tree
+        planner_portfolio (Optional[portfolio.Portfolio]): if set, plan every leg with
+            this pool of parallel planners and keep the shortest path
+        early_termination (bool): stop improving a leg once its path cost converges
+        stats (Optional[planner_stats.MissionStats]): if set, collects counters and phase
+            timings of every planned leg, see avoidance.stats
+        max_vertices (Optional[int]): caps the planner graph of each leg, it is pruned
+            whenever it grows past this many vertices
+        safety_margin (float): meters kept between the route and every obstacle and
+            the fence, planned against a cached inflated copy of the mission
+        clearance_weight (float): weight of the clearance term of the planner costs,
+            pushing the route away from obstacle edges, see rrt.clearance_costs
+        simplify_tolerance (Optional[float]): meters the route of each leg may deviate
+            from the planned path when merging nearly collinear points, see
+            simplify.simplify_path, None keeps every point
+        cancel: optional token with an is_set() method, e.g. a multiprocessing.Event,
+            once set the current leg stops planning and no further legs are planned
+        progress (Optional[Callable]): called every rrt.PROGRESS_INTERVAL iterations with
+            the leg index, the iteration count and the best path cost of the leg
+    Yields:
+        List[Tuple[float, float]]: the (latitude, longitude) points each solved leg adds
+        to the route, the waypoint shared with the previous leg is not repeated
+    """
+    if reuse_tree and not batch_size:
+        raise ValueError("reuse_tree needs the batched planner, set batch_size")
+
     # Add utm coordinates to all
     boundary = helpers.all_latlon_to_utm(boundary)
     obstacles = helpers.all_latlon_to_utm(obstacles)
@@ -72,36 +142,133 @@ def rrt_flight_test(obstacles: List[Dict[str, float]], waypoints: List[Dict[str,
     boundary_shape = helpers.coords_to_shape(boundary)
     obstacle_shapes = helpers.circles_to_shape(obstacles)
     waypoints_points = helpers.coords_to_points(waypoints)
+    fence_shape, (centers, radii) = boundary_shape, rrt.obstacle_circles(obstacle_shapes)
+    boundary_shape, obstacle_shapes = clearance.inflated_mission(boundary_shape, obstacle_shapes, safety_margin)
     
     # plotter.plot(obstacles, boundary, path=waypoints_points)
 
     final_route = []
+    tree = None
+
+    def add_leg(path):
+        # extend the route and convert only the new points back to lat lon
+        added = len(final_route)
+        simplify.append_leg(final_route, path)
+        start_time = time.time()
+        leg = helpers.path_to_latlon(final_route[added:], zone_num, zone_char)
+        if stats is not None:
+            stats.add_time("conversion", time.time() - start_time)
+        return leg
 
     start_time_final_route = time.time()
 
+    # find legs that can not be solved before spending any iterations on them
+    start_time = time.time()
+    infeasible = validation.validate_mission(waypoints_points, boundary_shape, obstacle_shapes)
+    print(f"mission validation runtime = {(time.time()-start_time):.3f}s")
+    if stats is not None:
+        stats.add_time("validation", time.time() - start_time)
+
     # run rrt on each pair of waypoints
     for i in range(len(waypoints_points) - 1):
+        if cancel is not None and cancel.is_set():
+            print(f"planning cancelled before the path between waypoints {i} and {i+1}")
+            break
+
+        if infeasible[i] is not None:
+            print(f"skipping path between waypoints {i} and {i+1}: {infeasible[i]}")
+            tree = None
+            continue
+
         print(f"finding path between waypoints {i} and {i+1}")
         start = waypoints_points[i]
         goal = waypoints_points[i + 1]
+        leg_strategy = strategy
+        if strategy is not None and not isinstance(strategy, samplers.SamplingStrategy):
+            leg_strategy = strategy[i]
+        leg_stats = stats.new_leg() if stats is not None else None
         start_time = time.time()
-        G, ellr, informed_boundary = rrt.RRT_star(start, goal, boundary_shape, obstacle_shapes)
-        print(f"rrt runtime = {(time.time()-start_time):.3f}s")
+        if planner_portfolio is not None:
+            path, results = planner_portfolio.plan(start, goal, boundary_shape, obstacle_shapes)
+            print(f"portfolio runtime = {(time.time()-start_time):.3f}s")
+            for result in results:
+                print(f"{result['planner']} seed {result['seed']}: {result['runs']} runs, "
+                      f"best cost {result['cost']:.1f}m, stopped: {result['stop_reason']}")
+            if leg_stats is not None:
+                # the leg is credited to the worker whose path was kept
+                winner = min(results, key=lambda result: result["cost"], default=None)
+                leg_stats.success = path is not None
+                if winner is not None:
+                    leg_stats.stop_reason = winner["stop_reason"]
+                    leg_stats.phase_times["portfolio"] = winner["runtime"]
+            if path is not None:
+                if simplify_tolerance is not None:
+                    path = simplify.simplify_path(path, obstacle_shapes, boundary_shape, simplify_tolerance)
+                log_leg_metrics(path, centers, radii, fence_shape, leg_stats)
+                yield add_leg(path)
+            else:
+                print("major error! could not find a path!")
+            continue
+
+        G, ellr, informed_boundary = rrt.RRT_star(start, goal, boundary_shape, obstacle_shapes,
+                                                  batch_size=batch_size, sampler=sampler,
+                                                  strategy=leg_strategy, tree=tree,
+                                                  early_termination=early_termination,
+                                                  stats=leg_stats, max_vertices=max_vertices,
+                                                  clearance_weight=clearance_weight, cancel=cancel,
+                                                  progress=functools.partial(progress, i) if progress else None)
+        print(f"rrt runtime = {(time.time()-start_time):.3f}s, stopped: {G.stop_reason}")
+        if leg_strategy is not None:
+            print(f"sampling with {leg_strategy}: {G.sample_counts}")
+
+        tree = G if reuse_tree and G.success else None
 
         if G.success:
-            path = rrt.dijkstra(G)
-            path = rrt.relax_path(path, obstacle_shapes)
-            for p in path:
-                final_route.append(p)
+            path = rrt.dijkstra(G, leg_stats)
+            path = rrt.relax_path(path, obstacle_shapes, leg_stats)
+            if simplify_tolerance is not None:
+                relaxed = len(path)
+                path = simplify.simplify_path(path, obstacle_shapes, boundary_shape, simplify_tolerance)
+                print(f"simplified path from {relaxed} to {len(path)} points")
+            log_leg_metrics(path, centers, radii, fence_shape, leg_stats)
+            if leg_stats is not None:
+                print(leg_stats.report())
+            yield add_leg(path)
         else:
             print("major error! could not find a path!")
+            if leg_stats is not None:
+                print(leg_stats.report())
     
     print(f"Total solving runtime = {(time.time()-start_time_final_route):.3f}s")
     
     # plotter.plot(obstacles, boundary, path=final_route)
-    
-    # last step converting back to lat lon
-    final_route = helpers.path_to_latlon(final_route, zone_num, zone_char)
+
+
+def rrt_flight_test(obstacles: List[Dict[str, float]], waypoints: List[Dict[str, float]],
+                    boundary: List[Dict[str, float]], batch_size: Optional[int] = None,
+                    sampler: Optional[samplers.Sampler] = None,
+                    strategy: Union[None, samplers.SamplingStrategy,
+                                    Sequence[Optional[samplers.SamplingStrategy]]] = None,
+                    reuse_tree: bool = False,
+                    planner_portfolio: Optional[portfolio.Portfolio] = None,
+                    early_termination: bool = False,
+                    stats: Optional[planner_stats.MissionStats] = None,
+                    max_vertices: Optional[int] = None,
+                    safety_margin: float = clearance.SAFETY_MARGIN,
+                    clearance_weight: float = 0.0,
+                    simplify_tolerance: Optional[float] = simplify.SIMPLIFY_TOLERANCE):
+    """
+    Plans an obstacle free route through every waypoint of a mission, see
+    rrt_flight_legs for the arguments
+    Returns:
+        List[Tuple[float, float]]: the route as (latitude, longitude) pairs
+    """
+
+    final_route = []
+    for leg in rrt_flight_legs(obstacles, waypoints, boundary, batch_size, sampler, strategy, reuse_tree,
+                               planner_portfolio, early_termination, stats, max_vertices,
+                               safety_margin, clearance_weight, simplify_tolerance):
+        final_route.extend(leg)
 
     print(final_route)
     
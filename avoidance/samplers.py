@@ -0,0 +1,338 @@
+"""
+Point samplers used by the RRT planner to draw random positions inside the
+fly zone or the informed area.
+
+Every sampler produces points in the unit square which are scaled to the
+bounds of the region and rejected when they fall outside of it. Low
+discrepancy sequences (Halton, Sobol) cover the region more evenly than
+independent uniform draws, so narrow gaps are reached in fewer iterations.
+"""
+
+import numpy as np
+from shapely.geometry import Point
+
+try:
+    from shapely import contains_xy
+except ImportError:  # shapely < 2.0
+    from shapely.vectorized import contains as contains_xy
+
+
+SOBOL_BITS = 32  # resolution of the Sobol sequence
+
+
+class Sampler:
+    """
+    Base sampler drawing independent uniform points
+    Args:
+        seed (int): seed for the random generator, None for a random seed
+    """
+
+    name = "uniform"
+
+    def __init__(self, seed=None):
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+
+    def unit_points(self, n):
+        """
+        Args:
+            n (int): number of points
+        Returns:
+            np.ndarray: (n, 2) array of points in the unit square
+        """
+        return self.rng.random((n, 2))
+
+    def sample_batch(self, region, n):
+        """
+        Draws n points inside a region
+        Args:
+            region (Polygon): area to sample from
+            n (int): number of points
+        Returns:
+            np.ndarray: (n, 2) array of points
+        """
+        minx, miny, maxx, maxy = region.bounds
+        scale = np.array((maxx - minx, maxy - miny))
+        offset = np.array((minx, miny))
+
+        accepted = []
+        count = 0
+        while count < n:
+            points = offset + self.unit_points(n) * scale
+            inside = contains_xy(region, points[:, 0], points[:, 1])
+            accepted.append(points[inside])
+            count += int(inside.sum())
+        return np.concatenate(accepted)[:n]
+
+    def sample(self, region):
+        """
+        Draws a single point inside a region
+        Args:
+            region (Polygon): area to sample from
+        Returns:
+            Point: the sampled point
+        """
+        minx, miny, maxx, maxy = region.bounds
+        while True:
+            u = self.unit_points(1)[0]
+            p = Point(minx + u[0] * (maxx - minx), miny + u[1] * (maxy - miny))
+            if region.contains(p):
+                return p
+
+
+UniformSampler = Sampler
+
+
+def radical_inverse(indices, base, permutation=None):
+    """
+    Van der Corput radical inverse of every index in the given base
+    Args:
+        indices (np.ndarray): non negative integer indices
+        base (int): prime base of the sequence
+        permutation (np.ndarray): optional digit permutation used for scrambling,
+            must map 0 to 0
+    Returns:
+        np.ndarray: values in [0, 1)
+    """
+    indices = np.array(indices, dtype=np.int64)
+    result = np.zeros(len(indices))
+    factor = 1.0 / base
+    while np.any(indices > 0):
+        digits = indices % base
+        if permutation is not None:
+            digits = permutation[digits]
+        result += digits * factor
+        indices //= base
+        factor /= base
+    return result
+
+
+class HaltonSampler(Sampler):
+    """
+    Two dimensional Halton sequence (bases 2 and 3). When a seed is given the
+    digits are scrambled with a random permutation per base.
+    Args:
+        seed (int): seed for the digit scrambling, None for the plain sequence
+    """
+
+    name = "halton"
+    bases = (2, 3)
+
+    def __init__(self, seed=None):
+        super().__init__(seed)
+        self.index = 1  # skip the origin
+        self.permutations = [None, None]
+        if seed is not None:
+            self.permutations = [
+                np.concatenate(([0], 1 + self.rng.permutation(base - 1))) for base in self.bases
+            ]
+
+    def unit_points(self, n):
+        indices = np.arange(self.index, self.index + n)
+        self.index += n
+        return np.column_stack(
+            [radical_inverse(indices, base, perm) for base, perm in zip(self.bases, self.permutations)]
+        )
+
+
+def sobol_directions(bits=SOBOL_BITS):
+    """
+    Direction numbers for the first two Sobol dimensions
+    Returns:
+        np.ndarray: (2, bits) array of direction numbers
+    """
+    directions = np.zeros((2, bits), dtype=np.uint64)
+
+    # first dimension is the van der Corput sequence in base 2
+    for k in range(bits):
+        directions[0, k] = 1 << (bits - 1 - k)
+
+    # second dimension uses the primitive polynomial x + 1, m_k = 2 m_(k-1) xor m_(k-1)
+    m = 1
+    for k in range(bits):
+        directions[1, k] = m << (bits - 1 - k)
+        m = (2 * m) ^ m
+    return directions
+
+
+class SobolSampler(Sampler):
+    """
+    Two dimensional Sobol sequence. When a seed is given the sequence is
+    scrambled with a random digital shift per dimension.
+    Args:
+        seed (int): seed for the scrambling, None for the plain sequence
+    """
+
+    name = "sobol"
+
+    def __init__(self, seed=None):
+        super().__init__(seed)
+        self.index = 1  # skip the origin
+        self.directions = sobol_directions()
+        self.shift = np.zeros(2, dtype=np.uint64)
+        if seed is not None:
+            self.shift = self.rng.integers(0, 1 << SOBOL_BITS, size=2, dtype=np.uint64)
+
+    def unit_points(self, n):
+        indices = np.arange(self.index, self.index + n, dtype=np.uint64)
+        self.index += n
+
+        values = np.tile(self.shift, (n, 1))
+        for k in range(SOBOL_BITS):
+            bit_set = ((indices >> np.uint64(k)) & np.uint64(1)).astype(bool)
+            values[bit_set] ^= self.directions[:, k]
+        return values / float(1 << SOBOL_BITS)
+
+
+SAMPLERS = {
+    "uniform": Sampler,
+    "halton": HaltonSampler,
+    "sobol": SobolSampler,
+}
+
+
+def get_sampler(name, seed=None):
+    """
+    Creates a sampler by name
+    Args:
+        name (str): one of "uniform", "halton" or "sobol"
+        seed (int): seed forwarded to the sampler
+    Returns:
+        Sampler: the new sampler
+    """
+    try:
+        return SAMPLERS[name](seed)
+    except KeyError:
+        raise ValueError(f"unknown sampler {name!r}, expected one of {sorted(SAMPLERS)}")
+
+
+def in_collision(points, region, centers, radii):
+    """
+    Checks which points lie outside the region or inside an obstacle
+    Args:
+        points (np.ndarray): (n, 2) points to check
+        region (Polygon): free area
+        centers (np.ndarray): (N, 2) obstacle centers
+        radii (np.ndarray): (N,) obstacle radii
+    Returns:
+        np.ndarray: (n,) boolean mask, True for points in collision
+    """
+    blocked = ~contains_xy(region, points[:, 0], points[:, 1])
+    if len(radii):
+        dists = np.linalg.norm(points[:, None, :] - centers[None, :, :], axis=2)
+        blocked |= (dists < radii).any(axis=1)
+    return blocked
+
+
+class SamplingStrategy:
+    """
+    Mixture of sampling strategies used in place of plain uniform sampling.
+    Each sample is drawn with one of the following, picked at random:
+        goal: the goal position itself, so the tree is pulled towards it
+        gaussian: a free point whose Gaussian neighbour is in collision, which
+            concentrates samples along obstacle edges
+        bridge: the free midpoint of two points in collision, which finds
+            narrow gaps between obstacles
+        uniform: a point from the base sampler, with the remaining probability
+    Obstacle aware samples fall back to uniform ones when no valid candidate
+    is found in `attempts` tries.
+    Args:
+        goal_bias (float): probability of sampling the goal
+        gaussian (float): probability of Gaussian obstacle edge sampling
+        bridge (float): probability of bridge test sampling
+        sigma (float): standard deviation in meters of the Gaussian offsets
+        attempts (int): candidate rounds tried for obstacle aware samples
+        seed (int): seed for the strategy choice and offsets
+    """
+
+    def __init__(self, goal_bias=0.0, gaussian=0.0, bridge=0.0, sigma=50.0, attempts=4, seed=None):
+        if goal_bias + gaussian + bridge > 1:
+            raise ValueError("strategy probabilities must sum to at most 1")
+        self.goal_bias = goal_bias
+        self.gaussian = gaussian
+        self.bridge = bridge
+        self.sigma = sigma
+        self.attempts = attempts
+        self.rng = np.random.default_rng(seed)
+
+    def __repr__(self):
+        return (
+            f"SamplingStrategy(goal_bias={self.goal_bias}, gaussian={self.gaussian}, "
+            f"bridge={self.bridge}, sigma={self.sigma})"
+        )
+
+    def sample_batch(self, sampler, region, n, goal, centers, radii, counts=None):
+        """
+        Draws n points inside a region
+        Args:
+            sampler (Sampler): base sampler for uniform and candidate points
+            region (Polygon): area to sample from
+            n (int): number of points
+            goal (Point): goal of the current leg
+            centers (np.ndarray): (N, 2) obstacle centers
+            radii (np.ndarray): (N,) obstacle radii
+            counts (dict): optional dictionary accumulating the number of samples
+                produced by each strategy
+        Returns:
+            np.ndarray: (n, 2) array of points
+        """
+        probabilities = [self.goal_bias, self.gaussian, self.bridge]
+        probabilities.append(1.0 - sum(probabilities))
+        goal_n, gaussian_n, bridge_n, _ = self.rng.multinomial(n, probabilities)
+
+        gaussian_points = self.gaussian_points(sampler, region, gaussian_n, centers, radii)
+        bridge_points = self.bridge_points(sampler, region, bridge_n, centers, radii)
+        goal_points = np.tile((goal.x, goal.y), (goal_n, 1))
+        uniform_n = n - goal_n - len(gaussian_points) - len(bridge_points)
+        uniform_points = sampler.sample_batch(region, uniform_n) if uniform_n else np.empty((0, 2))
+
+        if counts is not None:
+            for name, points in (
+                ("goal", goal_points),
+                ("gaussian", gaussian_points),
+                ("bridge", bridge_points),
+                ("uniform", uniform_points),
+            ):
+                counts[name] = counts.get(name, 0) + len(points)
+
+        points = np.concatenate((goal_points, gaussian_points, bridge_points, uniform_points))
+        return points[self.rng.permutation(n)]
+
+    def gaussian_points(self, sampler, region, n, centers, radii):
+        found = []
+        count = 0
+        for _ in range(self.attempts):
+            if count >= n:
+                break
+            first = sampler.sample_batch(region, n)
+            second = first + self.rng.normal(0.0, self.sigma, first.shape)
+            first_blocked = in_collision(first, region, centers, radii)
+            second_blocked = in_collision(second, region, centers, radii)
+
+            # keep the free point of every pair that straddles an obstacle edge
+            found.append(first[~first_blocked & second_blocked])
+            found.append(second[first_blocked & ~second_blocked])
+            count += len(found[-1]) + len(found[-2])
+        return np.concatenate(found)[:n] if found else np.empty((0, 2))
+
+    def bridge_points(self, sampler, region, n, centers, radii):
+        minx, miny, maxx, maxy = region.bounds
+        found = []
+        count = 0
+        for _ in range(self.attempts):
+            if count >= n or len(radii) == 0:
+                break
+            # the first end of the bridge is drawn over the whole bounding box so
+            # it can land inside obstacles
+            first = np.column_stack(
+                (self.rng.uniform(minx, maxx, 4 * n), self.rng.uniform(miny, maxy, 4 * n))
+            )
+            first = first[in_collision(first, region, centers, radii)]
+            second = first + self.rng.normal(0.0, self.sigma, first.shape)
+            middle = (first + second) / 2
+
+            bridged = in_collision(second, region, centers, radii)
+            bridged[bridged] = ~in_collision(middle[bridged], region, centers, radii)
+            found.append(middle[bridged])
+            count += len(found[-1])
+        return np.concatenate(found)[:n] if found else np.empty((0, 2))
@@ -0,0 +1,81 @@
+"""
+Path simplification before upload. Every point of a route becomes a separate
+command the vehicle stops at, so nearly collinear points are merged with the
+Ramer-Douglas-Peucker algorithm. A point is only dropped when the shortcut
+replacing it is collision free and stays inside the fence, so simplification
+never makes a route less safe than the planned one.
+"""
+
+import numpy as np
+from shapely.geometry import LineString
+
+from avoidance import metrics
+from avoidance import rrt
+
+
+SIMPLIFY_TOLERANCE = 5.0  # meters a simplified route may deviate from the planned one
+
+
+def chord_is_free(start, end, centers, radii, boundary=None):
+    """
+    Args:
+        start (np.ndarray): (2,) start of the shortcut
+        end (np.ndarray): (2,) end of the shortcut
+        centers (np.ndarray): (N, 2) obstacle centers
+        radii (np.ndarray): (N,) obstacle radii
+        boundary (Polygon): optional fly zone the shortcut has to stay in
+    Returns:
+        bool: whether the shortcut is collision free
+    """
+    if rrt.segments_intersect_obstacles(start[None, :], end[None, :], centers, radii)[0]:
+        return False
+    return boundary is None or boundary.contains(LineString([start, end]))
+
+
+def simplify_path(path, obstacles, boundary=None, tolerance=SIMPLIFY_TOLERANCE):
+    """
+    Ramer-Douglas-Peucker simplification with collision checked shortcuts. The
+    first and last point are always kept.
+    Args:
+        path (List[Point]): path to simplify
+        obstacles (list): obstacle rings as built by helpers.circles_to_shape
+        boundary (Polygon): optional fly zone shortcuts have to stay in
+        tolerance (float): largest distance in meters a dropped point may have from
+            the shortcut replacing it
+    Returns:
+        List[Point]: the simplified path
+    """
+    if len(path) < 3:
+        return list(path)
+
+    points = metrics.path_array(path)
+    centers, radii = rrt.obstacle_circles(obstacles)
+    keep = np.zeros(len(points), dtype=bool)
+    keep[[0, -1]] = True
+
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        deviations = metrics.point_segment_distances(
+            points[first + 1 : last], points[first : first + 1], points[last : last + 1]
+        )[:, 0]
+        farthest = first + 1 + int(np.argmax(deviations))
+        if deviations.max() <= tolerance and chord_is_free(points[first], points[last], centers, radii, boundary):
+            continue
+        keep[farthest] = True
+        stack.append((first, farthest))
+        stack.append((farthest, last))
+
+    return [path[i] for i in np.flatnonzero(keep)]
+
+
+def append_leg(route, path):
+    """
+    Appends the path of a leg to a route, without repeating the waypoint shared
+    with the previous leg
+    """
+    if route and path and route[-1].equals(path[0]):
+        path = path[1:]
+    route.extend(path)
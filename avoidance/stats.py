@@ -0,0 +1,137 @@
+"""
+Lightweight instrumentation of the planner. A PlannerStats object collects
+counters and per phase timings of one leg, MissionStats aggregates the legs
+of a mission. Planning functions take an optional stats argument and skip all
+bookkeeping when it is None, so instrumentation costs close to nothing when
+switched off.
+"""
+
+import time
+
+
+COUNTERS = (
+    "iterations",
+    "samples",
+    "rejected_samples",
+    "collision_checks",
+    "vertices",
+    "edges",
+    "rewires",
+    "pruned",
+)
+
+
+class PlannerStats:
+    """
+    Counters and phase timers of one planned leg
+    Attributes:
+        iterations (int): planner iterations run
+        samples (int): samples drawn
+        rejected_samples (int): samples discarded before a vertex was added
+        collision_checks (int): collision queries issued, a batched query counts once per segment
+        vertices (int): vertices added to the graph
+        edges (int): edges added to the graph
+        rewires (int): vertex costs lowered through a new vertex
+        pruned (int): vertices removed to keep the graph under its vertex cap
+        first_solution_iteration (int): iterations run when the first path was found,
+            a batched iteration draws batch_size samples, None without a path
+        first_solution_samples (int): samples drawn when the first path was found
+        memory (dict): peak vertices, edges and bytes held by the graph, see
+            Graph.memory_usage
+        path_metrics (dict): quality of the planned path, see avoidance.metrics
+        phase_times (dict): seconds spent in each phase
+        sample_counts (dict): samples drawn by each sampling strategy
+        strategy (str): description of the sampling strategy
+        stop_reason (str): why planning stopped
+        success (bool): whether a path was found
+    """
+
+    def __init__(self):
+        for counter in COUNTERS:
+            setattr(self, counter, 0)
+        self.first_solution_iteration = None
+        self.first_solution_samples = None
+        self.phase_times = {}
+        self.memory = {}
+        self.path_metrics = None
+        self.sample_counts = {}
+        self.strategy = None
+        self.stop_reason = None
+        self.success = False
+        self.last_lap = time.perf_counter()
+
+    def start(self):
+        """Starts timing a new phase without attributing the elapsed time"""
+        self.last_lap = time.perf_counter()
+
+    def lap(self, phase):
+        """Attributes the time since the last lap to a phase"""
+        now = time.perf_counter()
+        self.phase_times[phase] = self.phase_times.get(phase, 0.0) + now - self.last_lap
+        self.last_lap = now
+
+    def record_memory(self, usage):
+        """Keeps the peak of every value of a Graph.memory_usage result"""
+        for key, value in usage.items():
+            self.memory[key] = max(self.memory.get(key, 0), value)
+
+    def as_dict(self):
+        data = {counter: getattr(self, counter) for counter in COUNTERS}
+        data["first_solution_iteration"] = self.first_solution_iteration
+        data["first_solution_samples"] = self.first_solution_samples
+        data["phase_times"] = dict(self.phase_times)
+        data["memory"] = dict(self.memory)
+        data["path_metrics"] = self.path_metrics
+        data["sample_counts"] = dict(self.sample_counts)
+        data["strategy"] = self.strategy
+        data["stop_reason"] = self.stop_reason
+        data["success"] = self.success
+        return data
+
+    def report(self):
+        counters = ", ".join(f"{counter}={getattr(self, counter)}" for counter in COUNTERS)
+        phases = ", ".join(f"{phase}={seconds:.3f}s" for phase, seconds in sorted(self.phase_times.items()))
+        memory = ", ".join(f"peak {key}={value}" for key, value in self.memory.items())
+        return f"{counters}; {phases}; {memory}; stopped: {self.stop_reason}"
+
+
+class MissionStats:
+    """
+    Planner statistics of every leg of a mission plus mission level phases
+    (validation, conversions)
+    """
+
+    def __init__(self):
+        self.legs = []
+        self.phase_times = {}
+
+    def new_leg(self):
+        leg = PlannerStats()
+        self.legs.append(leg)
+        return leg
+
+    def add_time(self, phase, seconds):
+        self.phase_times[phase] = self.phase_times.get(phase, 0.0) + seconds
+
+    def totals(self):
+        """
+        Returns:
+            dict: every counter and phase time summed over all legs, the peak memory
+            of any leg, the number of legs and how many of them succeeded
+        """
+        totals = {counter: sum(getattr(leg, counter) for leg in self.legs) for counter in COUNTERS}
+        phase_times = dict(self.phase_times)
+        for leg in self.legs:
+            for phase, seconds in leg.phase_times.items():
+                phase_times[phase] = phase_times.get(phase, 0.0) + seconds
+        totals["phase_times"] = phase_times
+        totals["memory"] = {}
+        for leg in self.legs:
+            for key, value in leg.memory.items():
+                totals["memory"][key] = max(totals["memory"].get(key, 0), value)
+        totals["legs"] = len(self.legs)
+        totals["successful_legs"] = sum(leg.success for leg in self.legs)
+        return totals
+
+    def as_dict(self):
+        return {"legs": [leg.as_dict() for leg in self.legs], "totals": self.totals()}
@@ -0,0 +1,177 @@
+"""
+Fast feasibility checks run on a mission before launching the planner, so legs
+that can never be solved are reported right away instead of after every RRT
+iteration has been spent on them.
+"""
+
+from collections import deque
+
+import numpy as np
+
+from avoidance import rrt
+
+try:
+    from shapely import contains_xy
+except ImportError:  # shapely < 2.0
+    from shapely.vectorized import contains as contains_xy
+
+
+RASTER_RESOLUTION = 10  # meters, side of a free space raster cell
+MAX_RASTER_CELLS = 250000  # resolution is coarsened to stay below this many cells
+
+
+def check_waypoints(waypoints, boundary, obstacles):
+    """
+    Checks every waypoint against the fence and all obstacles at once
+    Args:
+        waypoints (list[Point]): mission waypoints in utm coordinates
+        boundary (Polygon): fly zone
+        obstacles (list): obstacle rings as built by helpers.circles_to_shape
+    Returns:
+        list[Optional[str]]: reason each waypoint is unreachable, None if it is valid
+    """
+    points = np.array([(p.x, p.y) for p in waypoints]).reshape(-1, 2)
+    centers, radii = rrt.obstacle_circles(obstacles)
+
+    outside = ~contains_xy(boundary, points[:, 0], points[:, 1])
+    inside_obstacle = np.full(len(points), -1)
+    if len(radii):
+        dists = np.linalg.norm(points[:, None, :] - centers[None, :, :], axis=2)
+        hits = dists < radii
+        inside_obstacle = np.where(hits.any(axis=1), hits.argmax(axis=1), -1)
+
+    reasons = []
+    for i in range(len(points)):
+        if outside[i]:
+            reasons.append(f"waypoint {i} is outside of the fence")
+        elif inside_obstacle[i] >= 0:
+            reasons.append(f"waypoint {i} is inside obstacle {inside_obstacle[i]}")
+        else:
+            reasons.append(None)
+    return reasons
+
+
+def free_space_raster(boundary, obstacles, resolution=RASTER_RESOLUTION):
+    """
+    Rasterizes the free space of the fly zone on a coarse grid. A cell is free
+    when it touches the fence and is not entirely covered by one obstacle, so the
+    raster never disconnects areas that are connected in reality.
+    Args:
+        boundary (Polygon): fly zone
+        obstacles (list): obstacle rings as built by helpers.circles_to_shape
+        resolution (float): requested cell size in meters
+    Returns:
+        Tuple[np.ndarray, Tuple[float, float], float]: boolean (rows, cols) grid of
+        free cells, the (x, y) origin of the grid and the cell size used
+    """
+    minx, miny, maxx, maxy = boundary.bounds
+    area_cells = (maxx - minx) * (maxy - miny) / resolution ** 2
+    if area_cells > MAX_RASTER_CELLS:
+        resolution *= np.sqrt(area_cells / MAX_RASTER_CELLS)
+
+    cols = int(np.ceil((maxx - minx) / resolution)) + 1
+    rows = int(np.ceil((maxy - miny) / resolution)) + 1
+    xs = minx + (np.arange(cols) + 0.5) * resolution
+    ys = miny + (np.arange(rows) + 0.5) * resolution
+    grid_x, grid_y = np.meshgrid(xs, ys)
+
+    # a cell touches the fence if its center or any corner lies inside it
+    free = contains_xy(boundary, grid_x, grid_y)
+    half = resolution / 2
+    for dx, dy in ((-half, -half), (-half, half), (half, -half), (half, half)):
+        free |= contains_xy(boundary, grid_x + dx, grid_y + dy)
+
+    # a cell is blocked if it lies entirely within a single obstacle
+    centers, radii = rrt.obstacle_circles(obstacles)
+    half_diagonal = resolution / np.sqrt(2)
+    for (cx, cy), radius in zip(centers, radii):
+        if radius <= half_diagonal:
+            continue
+        c0, c1 = np.searchsorted(xs, (cx - radius, cx + radius))
+        r0, r1 = np.searchsorted(ys, (cy - radius, cy + radius))
+        window_x = grid_x[r0:r1, c0:c1]
+        window_y = grid_y[r0:r1, c0:c1]
+        covered = np.hypot(window_x - cx, window_y - cy) + half_diagonal < radius
+        free[r0:r1, c0:c1] &= ~covered
+
+    return free, (minx, miny), resolution
+
+
+def label_components(free):
+    """
+    Labels the 4-connected components of the free cells with a flood fill
+    Args:
+        free (np.ndarray): boolean (rows, cols) grid of free cells
+    Returns:
+        np.ndarray: (rows, cols) integer grid, -1 for blocked cells
+    """
+    rows, cols = free.shape
+    flat_free = free.ravel()
+    labels = np.full(rows * cols, -1)
+
+    label = 0
+    for seed in np.flatnonzero(flat_free):
+        if labels[seed] >= 0:
+            continue
+        labels[seed] = label
+        queue = deque([seed])
+        while queue:
+            cell = queue.popleft()
+            row, col = divmod(cell, cols)
+            for neighbor, valid in (
+                (cell - cols, row > 0),
+                (cell + cols, row < rows - 1),
+                (cell - 1, col > 0),
+                (cell + 1, col < cols - 1),
+            ):
+                if valid and flat_free[neighbor] and labels[neighbor] < 0:
+                    labels[neighbor] = label
+                    queue.append(neighbor)
+        label += 1
+
+    return labels.reshape(rows, cols)
+
+
+def validate_mission(waypoints, boundary, obstacles, resolution=RASTER_RESOLUTION):
+    """
+    Finds the legs of a mission that can not be planned
+    Args:
+        waypoints (list[Point]): mission waypoints in utm coordinates
+        boundary (Polygon): fly zone
+        obstacles (list): obstacle rings as built by helpers.circles_to_shape
+        resolution (float): cell size in meters of the connectivity raster
+    Returns:
+        list[Optional[str]]: for every leg between consecutive waypoints the reason
+        it is infeasible, or None if it may be planned
+    """
+    waypoint_reasons = check_waypoints(waypoints, boundary, obstacles)
+    legs = len(waypoints) - 1
+    reasons = [None] * max(legs, 0)
+
+    for i in range(legs):
+        reasons[i] = waypoint_reasons[i] or waypoint_reasons[i + 1]
+
+    if not any(reason is None for reason in reasons):
+        return reasons
+
+    free, (minx, miny), size = free_space_raster(boundary, obstacles, resolution)
+    cells = [
+        (min(int((p.y - miny) // size), free.shape[0] - 1), min(int((p.x - minx) // size), free.shape[1] - 1))
+        for p in waypoints
+    ]
+
+    # valid waypoints are free by definition even if their cell looks blocked
+    for cell, reason in zip(cells, waypoint_reasons):
+        if reason is None:
+            free[cell] = True
+    labels = label_components(free)
+
+    for i in range(legs):
+        if reasons[i] is not None:
+            continue
+        start_label = labels[cells[i]]
+        goal_label = labels[cells[i + 1]]
+        if start_label < 0 or goal_label < 0 or start_label != goal_label:
+            reasons[i] = f"waypoints {i} and {i + 1} are not connected through free space"
+
+    return reasons
@@ -0,0 +1,6 @@
+"""
+Benchmarks of the path planner. Run them from the repository root, e.g.
+
+    python -m benchmarks.planner --output results.json
+    python -m benchmarks.planner --compare results.json
+"""
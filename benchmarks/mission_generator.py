@@ -0,0 +1,237 @@
+"""
+Synthetic missions for scaling and stress tests of the planner. Missions are
+written in the interop json format read by boundary_parsing, waypoint_parsing
+and stationary_obstacle_parsing, and are fully determined by their seed.
+
+Every generated mission is feasible by construction: obstacles never overlap,
+never touch the fence and keep at least `gap` meters to each other and to the
+fence, so the free space inside the fence is connected and every leg of the
+waypoint chain can be flown.
+
+    python -m benchmarks.mission_generator --obstacles 1000 --seed 3 --output mission.json
+"""
+
+import argparse
+import json
+import math
+
+import numpy as np
+import utm
+from shapely.geometry import Point, Polygon
+
+
+ORIGIN = (37.8990, -91.6636)  # lat/lon of the mission center
+FEET_PER_METER = 1 / 0.3048
+
+SIZE = 3000.0  # meters, diameter of the fence
+FENCE_VERTICES = 12
+CONCAVITY = 0.4  # fence vertices are drawn between (1 - concavity) and 1 times the fence radius
+GAP = 20.0  # meters, largest default free space kept between obstacles and to the fence
+COVERAGE = 0.1  # fraction of the fence covered by obstacles when no radius range is given
+RADIUS_DISTRIBUTIONS = ("constant", "uniform", "lognormal")
+PLACEMENT_ATTEMPTS = 30  # candidates tried per obstacle before the field counts as full
+WAYPOINT_ATTEMPTS = 1000
+ALTITUDE = (100.0, 300.0)  # feet
+OBSTACLE_HEIGHT = (100.0, 750.0)  # feet
+
+
+def concave_fence(rng, size=SIZE, vertices=FENCE_VERTICES, concavity=CONCAVITY):
+    """
+    Random star shaped fence around the origin. Every vertex is at a random angle
+    and distance, so the fence is simple but generally concave.
+    Returns:
+        Polygon: the fence in local meters
+    """
+    angles = np.sort(rng.uniform(0, 2 * math.pi, vertices))
+    radii = size / 2 * rng.uniform(1 - concavity, 1, vertices)
+    return Polygon(np.column_stack((radii * np.cos(angles), radii * np.sin(angles))))
+
+
+def obstacle_radii(rng, n, radius, distribution):
+    """
+    Args:
+        radius (Tuple[float, float]): smallest and largest radius in meters
+        distribution (str): "constant" (the mean of the range), "uniform" or
+            "lognormal" (clipped to the range)
+    Returns:
+        np.ndarray: n radii in meters
+    """
+    low, high = radius
+    if distribution == "constant":
+        return np.full(n, (low + high) / 2)
+    if distribution == "uniform":
+        return rng.uniform(low, high, n)
+    if distribution == "lognormal":
+        mean = math.sqrt(low * high)
+        sigma = math.log(high / low) / 4 if high > low else 0.0
+        return np.clip(rng.lognormal(math.log(mean), sigma, n), low, high)
+    raise ValueError(f"unknown radius distribution {distribution!r}, expected one of {RADIUS_DISTRIBUTIONS}")
+
+
+def poisson_disk_obstacles(rng, fence, radii, gap=GAP, attempts=PLACEMENT_ATTEMPTS):
+    """
+    Places obstacles by Poisson disk dart throwing: candidates are drawn inside
+    the fence and rejected when they come closer than `gap` to the fence or to
+    an obstacle placed before. A grid of buckets keeps each check local.
+    Args:
+        fence (Polygon): fence in local meters
+        radii (np.ndarray): radius of every obstacle, placed from largest to smallest
+        gap (float): smallest free distance in meters
+        attempts (int): candidates tried per obstacle
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (N, 2) centers and (N,) radii of the placed
+        obstacles, fewer than requested when the field is full
+    """
+    radii = np.sort(radii)[::-1]
+    minx, miny, maxx, maxy = fence.bounds
+    cell = 2 * (radii.max() if len(radii) else 1.0) + gap
+    buckets = {}
+    centers = []
+    placed = []
+
+    for radius in radii:
+        candidates = np.column_stack(
+            (rng.uniform(minx, maxx, attempts), rng.uniform(miny, maxy, attempts))
+        )
+        for x, y in candidates:
+            col, row = int((x - minx) // cell), int((y - miny) // cell)
+            clear = all(
+                math.hypot(x - centers[k][0], y - centers[k][1]) >= radius + placed[k] + gap
+                for dc in (-1, 0, 1)
+                for dr in (-1, 0, 1)
+                for k in buckets.get((col + dc, row + dr), ())
+            )
+            if not clear:
+                continue
+            p = Point(x, y)
+            if not fence.contains(p) or fence.exterior.distance(p) < radius + gap:
+                continue
+            buckets.setdefault((col, row), []).append(len(centers))
+            centers.append((x, y))
+            placed.append(radius)
+            break
+
+    return np.array(centers).reshape(-1, 2), np.array(placed)
+
+
+def waypoint_chain(rng, fence, centers, radii, n, gap=GAP, attempts=WAYPOINT_ATTEMPTS):
+    """
+    Draws waypoints in free space, at least `gap` away from the fence and every
+    obstacle. Consecutive waypoints are kept a quarter of the fence size apart
+    when possible so every leg has to go around obstacles.
+    Returns:
+        np.ndarray: (n, 2) waypoints in local meters
+    """
+    minx, miny, maxx, maxy = fence.bounds
+    min_leg = max(maxx - minx, maxy - miny) / 4
+    waypoints = []
+    tries = 0
+    while len(waypoints) < n:
+        tries += 1
+        p = rng.uniform((minx, miny), (maxx, maxy))
+        point = Point(p)
+        if not fence.contains(point) or fence.exterior.distance(point) < gap:
+            continue
+        if len(radii) and np.any(np.linalg.norm(centers - p, axis=1) < radii + gap):
+            continue
+        # relax the leg length once it has been tried long enough
+        if waypoints and tries < attempts and np.linalg.norm(p - waypoints[-1]) < min_leg:
+            continue
+        waypoints.append(p)
+        tries = 0
+    return np.array(waypoints).reshape(-1, 2)
+
+
+def generate_mission(seed=0, obstacles=100, waypoints=5, size=SIZE, radius=None,
+                     distribution="uniform", coverage=COVERAGE, density=None, gap=None,
+                     fence_vertices=FENCE_VERTICES, concavity=CONCAVITY, origin=ORIGIN):
+    """
+    Generates a feasible mission
+    Args:
+        seed (int): seed of every random choice
+        obstacles (int): number of obstacles, fewer are placed if they do not fit
+        waypoints (int): number of waypoints
+        size (float): diameter of the fence in meters
+        radius (Tuple[float, float]): range of obstacle radii in meters, by default
+            the range is derived from coverage
+        distribution (str): obstacle radius distribution, see obstacle_radii
+        coverage (float): fraction of the fence covered by obstacles, used when no
+            radius range is given
+        density (float): obstacles per square kilometer, overrides obstacles
+        gap (float): smallest free space in meters between obstacles, the fence
+            and waypoints, defaults to GAP or the smallest radius if that is less so
+            dense fields of small obstacles still fit
+        fence_vertices (int): number of fence vertices
+        concavity (float): how deep the fence vertices may be pulled in, 0 gives a
+            convex polygon inscribed in a circle
+        origin (Tuple[float, float]): lat/lon of the fence center
+    Returns:
+        dict: the mission with boundaryPoints, waypoints and stationaryObstacles in
+        lat/lon, obstacle radii and heights and waypoint altitudes in feet
+    """
+    rng = np.random.default_rng(seed)
+    fence = concave_fence(rng, size, fence_vertices, concavity)
+    if density is not None:
+        obstacles = int(round(density * fence.area / 1e6))
+
+    if radius is None:
+        mean = math.sqrt(coverage * fence.area / (math.pi * max(obstacles, 1)))
+        radius = (mean / 2, 3 * mean / 2)
+    if gap is None:
+        gap = min(GAP, radius[0])
+    radii = obstacle_radii(rng, obstacles, radius, distribution)
+    centers, radii = poisson_disk_obstacles(rng, fence, radii, gap)
+    chain = waypoint_chain(rng, fence, centers, radii, waypoints, gap)
+
+    origin_x, origin_y, zone_num, zone_char = utm.from_latlon(*origin)
+
+    def latlon(x, y):
+        lat, lon = utm.to_latlon(origin_x + x, origin_y + y, zone_num, zone_char)
+        return {"latitude": float(lat), "longitude": float(lon)}
+
+    boundary = [latlon(x, y) for x, y in fence.exterior.coords]
+    return {
+        "boundaryPoints": boundary,
+        "waypoints": [dict(latlon(x, y), altitude=float(rng.uniform(*ALTITUDE))) for x, y in chain],
+        "stationaryObstacles": [
+            dict(latlon(x, y), radius=float(r * FEET_PER_METER), height=float(rng.uniform(*OBSTACLE_HEIGHT)))
+            for (x, y), r in zip(centers, radii)
+        ],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generates a synthetic mission json file")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--obstacles", type=int, default=100)
+    parser.add_argument("--density", type=float, help="obstacles per square kilometer, overrides --obstacles")
+    parser.add_argument("--waypoints", type=int, default=5)
+    parser.add_argument("--size", type=float, default=SIZE, help="fence diameter in meters")
+    parser.add_argument("--radius", type=float, nargs=2, metavar=("MIN", "MAX"),
+                        help="obstacle radius range in meters")
+    parser.add_argument("--distribution", choices=RADIUS_DISTRIBUTIONS, default="uniform")
+    parser.add_argument("--coverage", type=float, default=COVERAGE)
+    parser.add_argument("--gap", type=float, help="free space in meters kept around obstacles")
+    parser.add_argument("--output", help="json file to write, printed when omitted")
+    args = parser.parse_args(argv)
+
+    mission = generate_mission(
+        seed=args.seed,
+        obstacles=args.obstacles,
+        waypoints=args.waypoints,
+        size=args.size,
+        radius=args.radius,
+        distribution=args.distribution,
+        coverage=args.coverage,
+        density=args.density,
+        gap=args.gap,
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(mission, f, indent=2)
+    else:
+        print(json.dumps(mission, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+Mission time benchmark: flies the logic of the flight scripts against the
+simulated vehicle of flight.sim and breaks the total mission time down into
+planning, connection, takeoff, transit, waypoint dwell and return to launch.
+
+Scenarios:
+    rrt_test_data, rrt_golf_data  routes planned by avoidance.rrt_flight_test
+                                  from the mission files (hoffman_obs / golf_obs)
+    mapping                       the golfmap survey grid from mapping.map_functions
+    waypoints                     the test_data waypoints flown directly (hoffmantest_json)
+
+Strategies, every one flown by flight.runner.MissionRunner:
+    legacy    goto_location per point, arrival polled by rounding coordinates
+              with a 1 s sleep per point, as the scripts used to
+    goto      runner.GotoExecutor, distance based arrival on the telemetry hub
+    mission   runner.MissionExecutor, the whole route uploaded as one mission
+    offboard  runner.OffboardExecutor, pure pursuit velocity setpoints along the route
+
+Planning is measured in real seconds, everything else in simulated seconds.
+Dwell is the time the vehicle hovers at waypoints, slower than DWELL_SPEED.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from avoidance import rrt_flight_test
+from flight import runner
+from flight import sim
+from mapping import map_functions
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIOS = ("rrt_test_data", "rrt_golf_data", "mapping", "waypoints")
+STRATEGIES = ("legacy", "goto", "mission", "offboard")
+ALTITUDE = 100  # feet, flight altitude of the planned routes
+MAP_CENTER = (37.9481747, -91.7833502)  # golfmap survey area
+MAP_HEIGHT = 600.0
+MAP_ALTITUDE = 150  # feet
+FOCAL_LENGTH = 9
+LEGACY_TAKEOFF_WAIT = 10  # seconds the scripts sleep after the takeoff command
+LEGACY_TIMEOUT = 120  # simulated seconds a legacy waypoint may take before it is skipped
+DWELL_SPEED = 0.5  # m/s, speed below which the vehicle counts as hovering
+PHASES = ("planning", "connection", "takeoff", "transit", "dwell", "rtl")
+
+
+class RecordingSystem(sim.SimulatedSystem):
+    """
+    Simulated vehicle that records its altitude and speed every step, and
+    when it was armed and landed
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.samples = []
+        self.armed_at = None
+        self.landed = None
+
+    def step(self, dt: float) -> None:
+        was_in_air = self.in_air
+        super().step(dt)
+        self.samples.append((self.time, self.model.position[2], float(np.linalg.norm(self.model.velocity))))
+        if self.armed and self.armed_at is None:
+            self.armed_at = self.time
+        if was_in_air and not self.in_air:
+            self.landed = self.time
+
+
+class LegacyExecutor(runner.Executor):
+    """
+    The flow of the scripts before the runner: a fixed sleep after the takeoff
+    command and legacy_move_to per point
+    """
+
+    def __init__(self) -> None:
+        self.timeouts = 0
+
+    async def takeoff(self, drone, context):
+        await drone.action.takeoff()
+        await drone.sleep(LEGACY_TAKEOFF_WAIT)
+
+    async def fly(self, drone, context, route, altitudes):
+        for (latitude, longitude), altitude in zip(route, altitudes):
+            self.timeouts += not await legacy_move_to(drone, latitude, longitude, altitude)
+
+
+class TimedExecutor(runner.Executor):
+    """
+    Wraps the executor of a strategy and notes the simulated time the route
+    starts and ends
+    """
+
+    def __init__(self, executor, drone) -> None:
+        self.executor = executor
+        self.drone = drone
+        self.marks = {}
+
+    async def takeoff(self, drone, context):
+        await self.executor.takeoff(drone, context)
+
+    async def fly(self, drone, context, route, altitudes):
+        self.marks.setdefault("route", self.drone.time)
+        await self.executor.fly(drone, context, route, altitudes)
+        self.marks["rtl"] = self.drone.time
+
+
+def load_mission(name):
+    filename = {"test_data": os.path.join(ROOT, "test_data.json"),
+                "golf_data": os.path.join(ROOT, "golf_tests", "golf_data.json")}[name]
+    with open(filename) as f:
+        return json.load(f)
+
+
+def scenario_route(scenario):
+    """
+    Returns:
+        Tuple[List[Tuple[float, float]], List[float], float]: the route, the altitude
+        of every point in feet and the real seconds spent planning it
+    """
+    if scenario == "mapping":
+        route = map_functions.map((MAP_CENTER, MAP_HEIGHT), MAP_ALTITUDE, FOCAL_LENGTH)
+        return route, [MAP_ALTITUDE] * len(route), 0.0
+    if scenario == "waypoints":
+        waypoints = load_mission("test_data")["waypoints"]
+        return ([(w["latitude"], w["longitude"]) for w in waypoints], [w["altitude"] for w in waypoints], 0.0)
+
+    mission = load_mission(scenario[len("rrt_"):])
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        route = rrt_flight_test.rrt_flight_test(mission["stationaryObstacles"], mission["waypoints"],
+                                                mission["boundaryPoints"])
+    return route, [ALTITUDE] * len(route), time.perf_counter() - started
+
+
+async def legacy_move_to(drone, latitude, longitude, altitude):
+    # the per-script move_to from before the telemetry hub, with its sleep in simulated time
+    altitude = altitude * .3048
+    async for terrain_info in drone.telemetry.home():
+        absolute_altitude = terrain_info.absolute_altitude_m
+        break
+    await drone.action.goto_location(latitude, longitude, altitude + absolute_altitude, 0)
+    deadline = drone.time + LEGACY_TIMEOUT
+    location_reached = False
+    while not location_reached:
+        async for position in drone.telemetry.position():
+            if ((round(position.latitude_deg, 4) == round(latitude, 4)) and
+                    (round(position.longitude_deg, 4) == round(longitude, 4)) and
+                    (round(position.relative_altitude_m, 1) == round(altitude, 1))):
+                location_reached = True
+                break
+            if drone.time > deadline:
+                return False
+        await drone.sleep(1)
+    return True
+
+
+def strategy_executor(strategy):
+    if strategy == "legacy":
+        return LegacyExecutor()
+    return {"goto": runner.GotoExecutor, "mission": runner.MissionExecutor,
+            "offboard": runner.OffboardExecutor}[strategy]()
+
+
+async def fly(strategy, route, altitudes, time_factor):
+    """
+    Flies a route with one strategy through MissionRunner from connecting until landed
+
+    Returns:
+        dict: simulated seconds of every phase but planning, and the number of
+        legacy waypoints that timed out
+    """
+    drone = RecordingSystem((route[0][0], route[0][1], sim.HOME[2]), time_factor=time_factor)
+    executor = strategy_executor(strategy)
+    timed = TimedExecutor(executor, drone)
+    mission = runner.MissionRunner(runner.WaypointList(route, altitudes), timed, drone=drone,
+                                   now=lambda: drone.time, sleep=drone.sleep)
+    await mission.run(stay_connected=False)
+    marks = dict(timed.marks, armed=drone.armed_at)
+
+    while drone.landed is None or drone.landed < marks["rtl"]:
+        await drone.sleep(0.5)
+    await drone.close()
+
+    # the takeoff ends once the route starts and the vehicle reached the takeoff altitude
+    samples = np.array(drone.samples)
+    airborne = samples[(samples[:, 0] >= marks["armed"]) & (samples[:, 1] >= sim.TAKEOFF_ALTITUDE - 0.1), 0]
+    takeoff_end = max(marks["route"], airborne[0] if len(airborne) else marks["route"])
+    flying = samples[(samples[:, 0] > takeoff_end) & (samples[:, 0] <= marks["rtl"])]
+    dwell = float(np.count_nonzero(flying[:, 2] < DWELL_SPEED)) * drone.dt
+    return {
+        "connection": marks["armed"],
+        "takeoff": takeoff_end - marks["armed"],
+        "transit": marks["rtl"] - takeoff_end - dwell,
+        "dwell": dwell,
+        "rtl": drone.landed - marks["rtl"],
+        "timeouts": getattr(executor, "timeouts", 0),
+    }
+
+
+def run_benchmark(scenario, strategy, route, altitudes, planning, time_factor=None):
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = asyncio.get_event_loop().run_until_complete(fly(strategy, route, altitudes, time_factor))
+    result.update({
+        "scenario": scenario,
+        "strategy": strategy,
+        "waypoints": len(route),
+        "planning": planning,
+        "wall_time": time.perf_counter() - started,
+    })
+    result["total"] = sum(result[phase] for phase in PHASES)
+    result["dwell_per_waypoint"] = result["dwell"] / max(len(route), 1)
+    return result
+
+
+def format_result(result):
+    phases = ", ".join(f"{phase} {result[phase]:.1f}s" for phase in PHASES)
+    timeouts = f", {result['timeouts']} timeouts" if result["timeouts"] else ""
+    return (f"{result['scenario']} {result['strategy']}: total {result['total']:.1f}s "
+            f"({phases}, {result['dwell_per_waypoint']:.2f}s dwell per waypoint{timeouts})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", help="write the results to this json file")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--strategies", nargs="+", choices=STRATEGIES, default=STRATEGIES)
+    parser.add_argument("--time-factor", type=float, default=None,
+                        help="simulated seconds per real second, as fast as possible by default")
+    args = parser.parse_args(argv)
+
+    results = []
+    for scenario in args.scenarios:
+        route, altitudes, planning = scenario_route(scenario)
+        if not route:
+            print(f"{scenario}: no route")
+            continue
+        for strategy in args.strategies:
+            result = run_benchmark(scenario, strategy, route, altitudes, planning, args.time_factor)
+            results.append(result)
+            print(format_result(result))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
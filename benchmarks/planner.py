@@ -0,0 +1,312 @@
+"""
+Planner benchmark: runs the preflight planner (avoidance.rrt_flight_test) on
+the embedded SUAS field, the mission files of the repository and synthetic
+missions from benchmarks.mission_generator, with fixed seeds, and records
+runtime, samples, samples to the first solution, path length, clearance and
+peak memory to JSON. By default the mission files are planned with the single
+sample planner that the flight scripts use and the synthetic fields with the
+batched planner, --batch-size and --synthetic-batch-size change either. A
+batched iteration draws batch_size samples, so samples are compared across
+modes rather than iterations.
+
+The default run takes about ten minutes, most of it the single sample planner
+on the SUAS field. The synthetic field with 10000 obstacles is left out of the
+default sizes as it adds about three minutes per seed, pass --sizes to include
+it.
+
+With --compare the results are checked against a saved baseline and the
+process exits with status 1 when a mission regressed.
+"""
+
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import shapely
+import utm
+from shapely.geometry import Polygon
+
+from avoidance import metrics
+from avoidance import rrt
+from avoidance import rrt_flight_test
+from avoidance import samplers
+from avoidance import stats as planner_stats
+from benchmarks import mission_generator
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MISSION_FILES = {
+    "test_data": os.path.join(ROOT, "test_data.json"),
+    "golf_data": os.path.join(ROOT, "golf_tests", "golf_data.json"),
+}
+SYNTHETIC_SIZES = (10, 100, 1000)  # obstacle counts of the synthetic fields
+SEEDS = (0, 1, 2)
+
+SYNTHETIC_WAYPOINTS = 5
+
+# relative change of the median over the seeds that counts as a regression
+THRESHOLDS = {
+    "runtime": 0.20,
+    "samples": 0.20,
+    "first_solution_samples": 0.20,
+    "path_length": 0.05,
+    "peak_memory": 0.20,
+}
+
+
+def load_mission(filename):
+    """
+    Reads a mission file in the interop json format
+    Returns:
+        dict: boundaryPoints, waypoints and stationaryObstacles of the mission
+    """
+    with open(filename) as f:
+        data_set = json.load(f)
+    return {
+        "boundaryPoints": data_set["boundaryPoints"],
+        "waypoints": data_set["waypoints"],
+        "stationaryObstacles": data_set["stationaryObstacles"],
+    }
+
+
+def suas_mission():
+    return {
+        "boundaryPoints": rrt.flyZones["boundaryPoints"],
+        "waypoints": rrt.waypoints,
+        "stationaryObstacles": rrt.obstacles,
+    }
+
+
+def missions(sizes=SYNTHETIC_SIZES):
+    """
+    Returns:
+        dict: every benchmark mission by name
+    """
+    found = {"suas": suas_mission()}
+    for name, filename in MISSION_FILES.items():
+        if os.path.exists(filename):
+            found[name] = load_mission(filename)
+    for size in sizes:
+        found[f"synthetic_{size}"] = mission_generator.generate_mission(
+            seed=size, obstacles=size, waypoints=SYNTHETIC_WAYPOINTS
+        )
+    return found
+
+
+def route_metrics(route, mission):
+    """
+    Quality of a planned route measured against the obstacles and fence of the
+    mission, see avoidance.metrics.path_metrics
+    Args:
+        route (List[Tuple[float, float]]): route as (latitude, longitude) pairs
+        mission (dict): the planned mission
+    Returns:
+        dict: the path metrics of the whole route
+    """
+    _, _, zone_num, zone_char = utm.from_latlon(*route[0]) if route else (0, 0, None, None)
+
+    def to_utm(coords):
+        return np.array(
+            [utm.from_latlon(c["latitude"], c["longitude"], zone_num, zone_char)[:2] for c in coords]
+        ).reshape(-1, 2)
+
+    points = np.array([utm.from_latlon(lat, lon, zone_num, zone_char)[:2] for lat, lon in route]).reshape(-1, 2)
+    obstacles = mission["stationaryObstacles"]
+    centers = to_utm(obstacles) if route else np.empty((0, 2))
+    radii = np.array([o["radius"] * 0.3048 for o in obstacles]) if route else np.empty(0)
+    fence = Polygon(to_utm(mission["boundaryPoints"])) if route else None
+    return metrics.path_metrics(points, centers, radii, fence)
+
+
+def plan(mission, seed, batch_size, verbose=False):
+    random.seed(seed)
+    np.random.seed(seed)
+    mission = copy.deepcopy(mission)  # the planner converts the dictionaries in place
+    mission_stats = planner_stats.MissionStats()
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    with output:
+        route = rrt_flight_test.rrt_flight_test(
+            mission["stationaryObstacles"],
+            mission["waypoints"],
+            mission["boundaryPoints"],
+            batch_size=batch_size,
+            sampler=samplers.Sampler(seed),
+            stats=mission_stats,
+        )
+    return route, mission_stats
+
+
+def run_benchmark(name, mission, seed, batch_size, memory=True, verbose=False):
+    """
+    Plans a mission once for timing and once more under tracemalloc for its
+    peak memory, so tracing does not slow down the timed run
+    Returns:
+        dict: the measurements of the run
+    """
+    start_time = time.perf_counter()
+    route, mission_stats = plan(mission, seed, batch_size, verbose)
+    runtime = time.perf_counter() - start_time
+
+    peak_memory = None
+    if memory:
+        tracemalloc.start()
+        plan(mission, seed, batch_size)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    totals = mission_stats.totals()
+    first_samples = [leg.first_solution_samples for leg in mission_stats.legs]
+    quality = route_metrics(route, mission)
+    return {
+        "mission": name,
+        "obstacles": len(mission["stationaryObstacles"]),
+        "waypoints": len(mission["waypoints"]),
+        "seed": seed,
+        "runtime": runtime,
+        "iterations": totals["iterations"],
+        "samples": totals["samples"],
+        "first_solution_iterations": [leg.first_solution_iteration for leg in mission_stats.legs],
+        "first_solution_samples": None if None in first_samples else sum(first_samples),
+        "collision_checks": totals["collision_checks"],
+        "legs": totals["legs"],
+        "successful_legs": totals["successful_legs"],
+        "path_length": quality["length"],
+        "clearance": quality["min_obstacle_clearance"],
+        "mean_clearance": quality["mean_obstacle_clearance"],
+        "fence_clearance": quality["min_fence_clearance"],
+        "max_turn": quality["max_turn"],
+        "flight_time": quality["flight_time"],
+        "peak_memory": peak_memory,
+        "phase_times": totals["phase_times"],
+        "leg_metrics": [leg.path_metrics for leg in mission_stats.legs],
+    }
+
+
+def summarize(results):
+    """
+    Returns:
+        dict: per mission median of every compared metric over the seeds, and the
+        smallest number of successful legs
+    """
+    by_mission = {}
+    for result in results:
+        by_mission.setdefault(result["mission"], []).append(result)
+
+    summary = {}
+    for name, runs in by_mission.items():
+        summary[name] = {"successful_legs": min(run["successful_legs"] for run in runs)}
+        for metric in THRESHOLDS:
+            values = [run[metric] for run in runs if run[metric] is not None]
+            summary[name][metric] = statistics.median(values) if values else None
+    return summary
+
+
+def compare(summary, baseline, thresholds=THRESHOLDS):
+    """
+    Compares the summary of a run against the summary of a baseline
+    Returns:
+        List[str]: a description of every regression
+    """
+    regressions = []
+    for name, current in summary.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if current["successful_legs"] < previous["successful_legs"]:
+            regressions.append(
+                f"{name}: {current['successful_legs']} successful legs, "
+                f"baseline {previous['successful_legs']}"
+            )
+        for metric, threshold in thresholds.items():
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if change > threshold:
+                regressions.append(f"{name}: {metric} {new:.4g} vs {old:.4g} ({change:+.1%})")
+    return regressions
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "shapely": shapely.__version__,
+        "platform": platform.platform(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", help="write the results to this json file")
+    parser.add_argument("--compare", metavar="BASELINE", help="json results to check for regressions against")
+    parser.add_argument("--missions", nargs="+", help="only run these missions")
+    parser.add_argument("--sizes", nargs="*", type=int, default=SYNTHETIC_SIZES,
+                        help="obstacle counts of the synthetic fields")
+    parser.add_argument("--seeds", nargs="+", type=int, default=SEEDS)
+    parser.add_argument("--batch-size", type=int, default=0,
+                        help=f"samples per planner iteration, 0 for the single sample planner the "
+                             f"flight scripts use, e.g. {rrt.BATCH_SIZE} for the batched planner")
+    parser.add_argument("--synthetic-batch-size", type=int, default=rrt.BATCH_SIZE,
+                        help="samples per planner iteration on the synthetic fields, 0 for the single sample "
+                             "planner")
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak memory runs")
+    parser.add_argument("--verbose", action="store_true", help="show the planner output")
+    args = parser.parse_args(argv)
+
+    selected = missions(args.sizes)
+    if args.missions:
+        unknown = set(args.missions) - set(selected)
+        if unknown:
+            parser.error(f"unknown missions {sorted(unknown)}, expected some of {sorted(selected)}")
+        selected = {name: selected[name] for name in args.missions}
+
+    results = []
+    for name, mission in selected.items():
+        batch_size = args.synthetic_batch_size if name.startswith("synthetic_") else args.batch_size
+        for seed in args.seeds:
+            result = run_benchmark(name, mission, seed, batch_size or None,
+                                   memory=not args.no_memory, verbose=args.verbose)
+            results.append(result)
+            clearance = "-" if result["clearance"] is None else f"{result['clearance']:.1f}m"
+            first = result["first_solution_samples"]
+            print(f"{name} seed {seed}: {result['runtime']:.3f}s, {result['samples']} samples, "
+                  f"first solution after {'-' if first is None else first} samples, "
+                  f"{result['successful_legs']}/{result['legs']} legs, length {result['path_length']:.0f}m, "
+                  f"clearance {clearance}")
+
+    report = {
+        "config": {"seeds": args.seeds, "batch_size": args.batch_size,
+                   "synthetic_batch_size": args.synthetic_batch_size, "sizes": args.sizes},
+        "environment": environment(),
+        "results": results,
+        "summary": summarize(results),
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report["summary"], baseline["summary"])
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print("no regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,4 @@
+"""
+Shared building blocks of the flight scripts: telemetry, movement and mission
+execution on top of MAVSDK.
+"""
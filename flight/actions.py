@@ -0,0 +1,134 @@
+"""
+Movement commands shared by the flight scripts
+"""
+
+import logging
+import time
+from typing import Callable, Optional, Sequence, Tuple, Union
+
+from mavsdk import System
+
+from flight import arrival
+from flight.context import MissionContext
+from flight.telemetry import TelemetryHub
+
+
+async def goto_point(drone: System, hub: TelemetryHub, latitude: float, longitude: float,
+                     relative_altitude: float, absolute_altitude: float, fast_mode: bool = False,
+                     horizontal_radius: Optional[float] = None,
+                     vertical_radius: Optional[float] = arrival.VERTICAL_RADIUS,
+                     dwell: float = arrival.DWELL_TIME, now: Optional[Callable[[], float]] = None) -> None:
+    """
+    Sends the drone to a waypoint and waits until it is within the acceptance
+    radii of it, checked on every position update of the telemetry hub.
+
+    Parameters
+    ----------
+    drone: System
+        a drone object that has all offboard data needed for computation
+    hub: TelemetryHub
+        the running telemetry hub of the drone
+    latitude: float
+        a float containing the requested latitude to move to
+    longitude: float
+        a float containing the requested longitude to move to
+    relative_altitude: float
+        altitude above home in meters, used for the arrival check
+    absolute_altitude: float
+        the same altitude above mean sea level, as goto_location expects it
+    fast_mode: bool
+        if true, the wider fast mode radius is used and the altitude is ignored
+    horizontal_radius: float
+        horizontal acceptance radius in meters, None picks the default of the mode
+    vertical_radius: float
+        vertical acceptance radius in meters, None ignores the altitude
+    dwell: float
+        seconds the drone has to stay within the radii before moving on
+    now: Callable[[], float]
+        clock the dwell and the logged time are measured on, defaults to time.monotonic
+
+    Returns
+    -------
+    None
+    """
+    if fast_mode:
+        vertical_radius = None
+    if horizontal_radius is None:
+        horizontal_radius = arrival.FAST_HORIZONTAL_RADIUS if fast_mode else arrival.HORIZONTAL_RADIUS
+
+    if now is None:
+        now = time.monotonic
+    await drone.action.goto_location(latitude, longitude, absolute_altitude, 0)
+    logging.info("Going to waypoint")
+    started: float = now()
+
+    arrived = arrival.ArrivalCheck(latitude, longitude, relative_altitude, horizontal_radius, vertical_radius, dwell,
+                                   now)
+    await hub.wait_for("position", arrived)
+    logging.info(f"arrived within {arrived.distance:.2f} m after {now() - started:.1f} s")
+
+
+async def move_to(drone: System, context: MissionContext, latitude: float, longitude: float, altitude: float,
+                  fast_mode: bool = False, horizontal_radius: Optional[float] = None,
+                  vertical_radius: Optional[float] = arrival.VERTICAL_RADIUS,
+                  dwell: float = arrival.DWELL_TIME) -> None:
+    """
+    This function takes in a latitude, longitude and altitude and autonomously
+    moves the drone to that waypoint. This function will also auto convert the altitude
+    from feet to meters, relative to the home position cached in the mission context.
+
+    Parameters
+    ----------
+    drone: System
+        a drone object that has all offboard data needed for computation
+    context: MissionContext
+        the mission context holding the telemetry hub and the captured home position
+    latitude: float
+        a float containing the requested latitude to move to
+    longitude: float
+        a float containing the requested longitude to move to
+    altitude: float
+        a float contatining the requested altitude to go to (in feet)
+    fast_mode, horizontal_radius, vertical_radius, dwell:
+        arrival settings, see goto_point
+
+    Returns
+    -------
+    None
+    """
+    relative, absolute = context.altitudes(altitude, 1)
+    await goto_point(drone, context.hub, latitude, longitude, float(relative[0]), float(absolute[0]),
+                     fast_mode, horizontal_radius, vertical_radius, dwell, context.now)
+
+
+async def fly_route(drone: System, context: MissionContext, route: Sequence[Tuple[float, float]],
+                    altitudes: Union[float, Sequence[float]], fast_mode: bool = False,
+                    horizontal_radius: Optional[float] = None,
+                    vertical_radius: Optional[float] = arrival.VERTICAL_RADIUS,
+                    dwell: float = arrival.DWELL_TIME) -> None:
+    """
+    Moves the drone through every point of a route with goto_location, the
+    altitudes of the whole route are converted once before the first point
+
+    Parameters
+    ----------
+    drone: System
+        a drone object that has all offboard data needed for computation
+    context: MissionContext
+        the mission context holding the telemetry hub and the captured home position
+    route: Sequence[Tuple[float, float]]
+        (latitude, longitude) points to visit in order
+    altitudes: float or Sequence[float]
+        altitude in feet above home, one for the whole route or one per point
+    fast_mode, horizontal_radius, vertical_radius, dwell:
+        arrival settings, see goto_point
+
+    Returns
+    -------
+    None
+    """
+    relative, absolute = context.altitudes(altitudes, len(route))
+    for (latitude, longitude), relative_altitude, absolute_altitude in zip(route, relative.tolist(),
+                                                                           absolute.tolist()):
+        await goto_point(drone, context.hub, latitude, longitude, relative_altitude, absolute_altitude,
+                         fast_mode, horizontal_radius, vertical_radius, dwell, context.now)
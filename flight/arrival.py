@@ -0,0 +1,140 @@
+"""
+Distance based arrival detection. Comparing rounded coordinates has hard
+boundaries, a vehicle hovering a few centimeters from a waypoint is not
+"arrived" while one digit keeps flipping, and 6 decimals plus the altitude
+can take many seconds to line up. Instead the distance to the target is
+measured in meters and compared against a horizontal and a vertical
+acceptance radius, optionally held for a dwell time.
+"""
+
+import time
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+
+EARTH_RADIUS = 6371008.8  # mean earth radius in meters
+HORIZONTAL_RADIUS = 2.0  # horizontal acceptance radius in meters
+VERTICAL_RADIUS = 1.0  # vertical acceptance radius in meters
+FAST_HORIZONTAL_RADIUS = 5.0  # horizontal acceptance radius in fast mode, altitude is ignored
+DWELL_TIME = 0.0  # seconds the vehicle has to stay inside the radii
+
+
+def haversine(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """
+    Great circle distance, works elementwise on scalars or numpy arrays
+
+    Args:
+        lat1, lon1: first position(s) in degrees
+        lat2, lon2: second position(s) in degrees
+
+    Returns:
+        distance(s) in meters
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=float)) for a in (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2 +
+         np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def enu_offsets(lat, lon, alt, ref_lat: float, ref_lon: float, ref_alt: float = 0.0
+                ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    East, north and up offsets from a reference point on a local tangent plane,
+    accurate to centimeters over the few kilometers of a mission
+
+    Args:
+        lat, lon, alt: position(s) in degrees and meters
+        ref_lat, ref_lon, ref_alt: reference point in degrees and meters
+
+    Returns:
+        east, north and up offsets in meters
+    """
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    east = np.radians(lon - ref_lon) * EARTH_RADIUS * np.cos(np.radians(ref_lat))
+    north = np.radians(lat - ref_lat) * EARTH_RADIUS
+    up = np.asarray(alt, dtype=float) - ref_alt
+    return east, north, up
+
+
+def enu_to_latlon(east, north, ref_lat: float, ref_lon: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Inverse of enu_offsets for the horizontal offsets
+
+    Args:
+        east, north: offset(s) in meters
+        ref_lat, ref_lon: reference point in degrees
+
+    Returns:
+        latitude(s) and longitude(s) in degrees
+    """
+    lat = ref_lat + np.degrees(np.asarray(north, dtype=float) / EARTH_RADIUS)
+    lon = ref_lon + np.degrees(np.asarray(east, dtype=float) / (EARTH_RADIUS * np.cos(np.radians(ref_lat))))
+    return lat, lon
+
+
+def within_radius(lat, lon, alt, target_lat, target_lon, target_alt,
+                  horizontal_radius: float = HORIZONTAL_RADIUS,
+                  vertical_radius: Optional[float] = VERTICAL_RADIUS) -> np.ndarray:
+    """
+    Checks position(s) against target(s), either side may be an array
+
+    Args:
+        lat, lon, alt: position(s) in degrees and meters
+        target_lat, target_lon, target_alt: target(s) in degrees and meters
+        horizontal_radius: horizontal acceptance radius in meters
+        vertical_radius: vertical acceptance radius in meters, None ignores the altitude
+
+    Returns:
+        boolean (array), true where the position is inside both radii
+    """
+    inside = haversine(lat, lon, target_lat, target_lon) <= horizontal_radius
+    if vertical_radius is not None:
+        inside &= np.abs(np.asarray(alt, dtype=float) - target_alt) <= vertical_radius
+    return inside
+
+
+class ArrivalCheck:
+    """
+    Predicate on position telemetry that turns true once the vehicle has been
+    inside the acceptance radii of a target for the dwell time
+
+    Args:
+        latitude, longitude: target in degrees
+        altitude: target altitude relative to home in meters
+        horizontal_radius: horizontal acceptance radius in meters
+        vertical_radius: vertical acceptance radius in meters, None ignores the altitude
+        dwell: seconds the vehicle has to stay inside the radii, 0 accepts the first update inside
+        now: clock the dwell is measured on, defaults to time.monotonic, e.g.
+            lambda: drone.time for a SimulatedSystem
+    """
+
+    def __init__(self, latitude: float, longitude: float, altitude: float,
+                 horizontal_radius: float = HORIZONTAL_RADIUS,
+                 vertical_radius: Optional[float] = VERTICAL_RADIUS,
+                 dwell: float = DWELL_TIME, now: Optional[Callable[[], float]] = None) -> None:
+        self.latitude = latitude
+        self.longitude = longitude
+        self.altitude = altitude
+        self.horizontal_radius = horizontal_radius
+        self.vertical_radius = vertical_radius
+        self.dwell = dwell
+        self.now = now if now is not None else time.monotonic
+        self.entered: Optional[float] = None
+        self.distance = float("inf")
+
+    def __call__(self, position) -> bool:
+        self.distance = float(haversine(position.latitude_deg, position.longitude_deg,
+                                        self.latitude, self.longitude))
+        inside = self.distance <= self.horizontal_radius
+        if inside and self.vertical_radius is not None:
+            inside = abs(position.relative_altitude_m - self.altitude) <= self.vertical_radius
+
+        if not inside:
+            self.entered = None
+            return False
+        now = self.now()
+        if self.entered is None:
+            self.entered = now
+        return now - self.entered >= self.dwell
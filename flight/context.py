@@ -0,0 +1,100 @@
+"""
+Per-mission state of a flight. The home position only changes when the
+autopilot sets a new one, which PX4 does on arming, so it is captured once
+after arming and reused by every movement command instead of being read
+from telemetry before each goto. refresh_home re-reads it on request, e.g.
+after the home position was moved.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from mavsdk import System
+
+from flight.telemetry import TelemetryHub
+
+
+FEET_TO_METERS = .3048
+HOME_TIMEOUT = 2.0  # seconds to wait for the home position update that follows arming
+
+
+class MissionContext:
+    """
+    Drone, telemetry and cached home position of a running mission
+
+    Parameters
+    ----------
+    drone: System
+        the connected vehicle
+    hub: TelemetryHub
+        the running telemetry hub of the drone
+    now: Callable[[], float]
+        clock of the mission, None leaves every step on its default clock,
+        e.g. lambda: drone.time for a SimulatedSystem
+    sleep: Callable[[float], Awaitable[None]]
+        sleep matching the clock, e.g. SimulatedSystem.sleep
+
+    Attributes
+    ----------
+    home:
+        home position captured by capture_home, None before
+    """
+
+    def __init__(self, drone: System, hub: TelemetryHub, now: Optional[Callable[[], float]] = None,
+                 sleep: Callable[[float], Awaitable[None]] = asyncio.sleep) -> None:
+        self.drone = drone
+        self.hub = hub
+        self.now = now
+        self.sleep = sleep
+        self.home = None
+
+    @property
+    def home_altitude(self) -> float:
+        if self.home is None:
+            raise RuntimeError("home position not captured yet, call capture_home after arming")
+        return self.home.absolute_altitude_m
+
+    async def capture_home(self, timeout: float = HOME_TIMEOUT) -> "MissionContext":
+        """
+        Caches the home position, call it right after arming. The autopilot
+        resets home on arming, so the update following the current value is
+        waited for, falling back to the current value after the timeout.
+        """
+        current = await self.hub.wait_for("home")
+        try:
+            self.home = await self.hub.wait_for("home", lambda home: home is not current, timeout)
+        except asyncio.TimeoutError:
+            self.home = current
+        logging.info(f"Home at {self.home.latitude_deg:.7f}, {self.home.longitude_deg:.7f}, "
+                     f"{self.home.absolute_altitude_m:.1f} m amsl")
+        return self
+
+    async def refresh_home(self) -> None:
+        """
+        Re-reads the home position on an explicit event, such as a home reset
+        """
+        await self.capture_home()
+
+    def altitudes(self, altitudes: Union[float, Sequence[float]], count: Optional[int] = None
+                  ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Converts altitudes in feet above home for a whole route at once
+
+        Parameters
+        ----------
+        altitudes: float or Sequence[float]
+            altitude in feet above home, one for the whole route or one per point
+        count: int
+            number of route points, needed when a single altitude is given
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            altitudes in meters relative to home and above mean sea level
+        """
+        relative = np.asarray(altitudes, dtype=float) * FEET_TO_METERS
+        if relative.ndim == 0:
+            relative = np.full(count if count is not None else 1, float(relative))
+        return relative, relative + self.home_altitude
@@ -0,0 +1,146 @@
+"""
+Flies a planned route as one autopilot mission. Sending every point with
+goto_location and waiting for arrival from the ground station stops the
+vehicle at each waypoint and adds a telemetry round trip per point. Uploaded
+as a MissionPlan the autopilot flies through the interior points and only
+reports progress back.
+"""
+
+import logging
+from typing import Optional, Sequence, Tuple, Union
+
+from mavsdk import System
+from mavsdk.mission import MissionItem, MissionPlan
+
+from flight import arrival
+from flight.context import FEET_TO_METERS
+
+
+MISSION_SPEED = 10.0  # cruise speed of mission items in m/s
+
+
+def mission_items(route: Sequence[Tuple[float, ...]], altitude: Union[float, Sequence[float]] = 100,
+                  speed: Union[float, Sequence[float]] = MISSION_SPEED,
+                  acceptance_radius: float = arrival.HORIZONTAL_RADIUS,
+                  fly_through: bool = True) -> list:
+    """
+    Converts a route into mission items
+
+    Parameters
+    ----------
+    route: Sequence[Tuple[float, ...]]
+        (latitude, longitude) points as returned by rrt_flight_test or map_functions.map,
+        a third element overrides the altitude of that point
+    altitude: float or Sequence[float]
+        altitude relative to home in feet, one for the route or one per point
+    speed: float or Sequence[float]
+        speed in m/s towards each item, one for the route or one per point
+    acceptance_radius: float
+        radius in meters at which the autopilot counts an item as reached
+    fly_through: bool
+        if true the vehicle does not stop at interior points, the last point is
+        always a stop
+
+    Returns
+    -------
+    List[MissionItem]
+        one item per route point
+    """
+    count = len(route)
+    altitudes = [altitude] * count if isinstance(altitude, (int, float)) else list(altitude)
+    speeds = [speed] * count if isinstance(speed, (int, float)) else list(speed)
+    if len(altitudes) != count or len(speeds) != count:
+        raise ValueError("altitude and speed need one value per route point")
+
+    items = []
+    for i, point in enumerate(route):
+        point_altitude = point[2] if len(point) > 2 else altitudes[i]
+        items.append(MissionItem(point[0],
+                                 point[1],
+                                 point_altitude * FEET_TO_METERS,
+                                 speeds[i],
+                                 fly_through and i < count - 1,
+                                 float('nan'),
+                                 float('nan'),
+                                 MissionItem.CameraAction.NONE,
+                                 float('nan'),
+                                 float('nan'),
+                                 acceptance_radius,
+                                 float('nan')))
+    return items
+
+
+def mission_plan(route: Sequence[Tuple[float, ...]], altitude: Union[float, Sequence[float]] = 100,
+                 speed: Union[float, Sequence[float]] = MISSION_SPEED,
+                 acceptance_radius: float = arrival.HORIZONTAL_RADIUS,
+                 fly_through: bool = True) -> MissionPlan:
+    """
+    Converts a route into a MissionPlan, see mission_items for the parameters
+    """
+    return MissionPlan(mission_items(route, altitude, speed, acceptance_radius, fly_through))
+
+
+async def upload_mission(drone: System, plan: MissionPlan, return_to_launch: bool = True) -> None:
+    """
+    Uploads a mission, replacing the one on the vehicle
+
+    Parameters
+    ----------
+    drone: System
+        the connected vehicle
+    plan: MissionPlan
+        mission to upload
+    return_to_launch: bool
+        if true the vehicle returns home once the last item is reached
+    """
+    await drone.mission.set_return_to_launch_after_mission(return_to_launch)
+    logging.info(f"-- Uploading mission of {len(plan.mission_items)} items")
+    await drone.mission.upload_mission(plan)
+
+
+async def track_mission(drone: System, total: Optional[int] = None) -> None:
+    """
+    Logs the mission progress and returns once the last item is reached. The
+    final progress of the mission flown before a new upload may still be
+    reported, so completion only counts after an unfinished state of the
+    current mission was seen.
+
+    Parameters
+    ----------
+    drone: System
+        the vehicle flying the mission
+    total: int
+        number of items of the mission, progress reports of a mission with a
+        different size are ignored
+    """
+    fresh = False
+    async for progress in drone.mission.mission_progress():
+        logging.info(f"Mission progress: {progress.current}/{progress.total}")
+        if total is not None and progress.total != total:
+            continue
+        if progress.current < progress.total:
+            fresh = True
+        elif fresh and progress.total > 0:
+            break
+
+
+async def fly_mission(drone: System, plan: MissionPlan, return_to_launch: bool = True) -> None:
+    """
+    Uploads a mission, starts it and waits until the last item is reached. The
+    vehicle has to be armed, PX4 takes off on its own when the mission starts
+    on the ground.
+
+    Parameters
+    ----------
+    drone: System
+        the connected vehicle
+    plan: MissionPlan
+        mission to fly
+    return_to_launch: bool
+        if true the vehicle returns home once the last item is reached
+    """
+    await upload_mission(drone, plan, return_to_launch)
+    logging.info("-- Starting mission")
+    await drone.mission.start_mission()
+    await track_mission(drone, len(plan.mission_items))
+    logging.info("Last waypoint reached")
@@ -0,0 +1,324 @@
+"""
+Continuous path following through offboard velocity setpoints. goto_location
+makes the vehicle stop at every vertex of a route; here a pure pursuit
+follower steers towards a point a lookahead distance further along the path
+and slows down only where the path curves, while a fixed rate loop streams
+the resulting velocity to the autopilot. The follower works in local east /
+north meters and is tested offline against the PointMass kinematic model.
+Corners are cut by up to about the lookahead distance, plan routes flown this
+way with a clearance.SAFETY_MARGIN of at least LOOKAHEAD.
+"""
+
+import asyncio
+import logging
+import math
+from typing import Awaitable, Callable, Optional, Sequence, Tuple
+
+import numpy as np
+from mavsdk import System
+from mavsdk.offboard import OffboardError, VelocityNedYaw
+
+from flight import arrival
+from flight.context import FEET_TO_METERS, MissionContext
+from flight.sim import PointMass
+
+
+SETPOINT_RATE = 20.0  # setpoints per second, PX4 leaves offboard mode below 2 Hz
+LOOKAHEAD = 10.0  # meters ahead along the path the follower steers to
+CRUISE_SPEED = 10.0  # m/s on straight parts of the path
+MIN_SPEED = 1.0  # m/s, speed floor so sharp corners are still flown through
+MAX_LATERAL_ACCEL = 2.0  # m/s^2 allowed in turns, sets the corner speeds
+MAX_ACCEL = 2.0  # m/s^2 used to slow down ahead of corners and the end of the path
+VERTICAL_GAIN = 0.5  # 1/s, climb rate per meter of altitude error
+MAX_VERTICAL_SPEED = 2.0  # m/s
+
+
+def path_lengths(points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Args:
+        points (np.ndarray): (N, 2) path vertices
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: the N-1 segment lengths and the arc length of every vertex
+    """
+    lengths = np.linalg.norm(np.diff(points, axis=0), axis=1)
+    return lengths, np.concatenate(([0.0], np.cumsum(lengths)))
+
+
+def corner_curvatures(points: np.ndarray, lookahead: float = LOOKAHEAD) -> np.ndarray:
+    """
+    Curvature of the arc pure pursuit flies around every vertex. A turn by angle
+    theta that is cut within distance d of the vertex has curvature 2 sin(theta / 2) / d,
+    where d is the lookahead unless an adjacent segment is shorter.
+
+    Args:
+        points (np.ndarray): (N, 2) path vertices
+        lookahead (float): lookahead distance of the follower in meters
+
+    Returns:
+        np.ndarray: curvature of every vertex in 1/m, 0 at both ends
+    """
+    curvatures = np.zeros(len(points))
+    if len(points) < 3:
+        return curvatures
+    incoming = points[1:-1] - points[:-2]
+    outgoing = points[2:] - points[1:-1]
+    lengths_in = np.linalg.norm(incoming, axis=1)
+    lengths_out = np.linalg.norm(outgoing, axis=1)
+    valid = (lengths_in > 0) & (lengths_out > 0)
+    cosines = np.einsum("ij,ij->i", incoming, outgoing) / np.where(valid, lengths_in * lengths_out, 1.0)
+    turns = np.arccos(np.clip(cosines, -1.0, 1.0))
+    cut = np.minimum(lookahead, np.minimum(lengths_in, lengths_out))
+    curvatures[1:-1] = np.where(valid, 2 * np.sin(turns / 2) / np.maximum(cut, 1e-9), 0.0)
+    return curvatures
+
+
+def speed_profile(points: np.ndarray, cruise_speed: float = CRUISE_SPEED, lookahead: float = LOOKAHEAD,
+                  max_lateral_accel: float = MAX_LATERAL_ACCEL, max_accel: float = MAX_ACCEL) -> np.ndarray:
+    """
+    Speed at every vertex: limited by the lateral acceleration in the corner and
+    by braking in time for the slower vertices ahead, 0 at the end of the path
+
+    Args:
+        points (np.ndarray): (N, 2) path vertices
+        cruise_speed (float): top speed in m/s
+        lookahead (float): lookahead distance of the follower in meters
+        max_lateral_accel (float): lateral acceleration allowed in turns in m/s^2
+        max_accel (float): braking deceleration in m/s^2
+
+    Returns:
+        np.ndarray: speed of every vertex in m/s
+    """
+    curvatures = corner_curvatures(points, lookahead)
+    with np.errstate(divide="ignore"):
+        speeds = np.minimum(cruise_speed, np.sqrt(max_lateral_accel / curvatures))
+    speeds = np.maximum(speeds, MIN_SPEED)
+    speeds[-1] = 0.0
+
+    # backward pass, the braking distance to each slower vertex
+    lengths, _ = path_lengths(points)
+    for i in range(len(points) - 2, -1, -1):
+        speeds[i] = min(speeds[i], math.sqrt(speeds[i + 1] ** 2 + 2 * max_accel * lengths[i]))
+    return speeds
+
+
+class PurePursuit:
+    """
+    Pure pursuit path follower with curvature based speed scheduling
+
+    Args:
+        points (np.ndarray): (N, 2) path in local meters, the first vertex is where the vehicle starts
+        cruise_speed (float): top speed in m/s
+        lookahead (float): meters ahead along the path the follower steers to
+        goal_radius (float): distance to the last vertex at which the path is done
+        max_lateral_accel (float): lateral acceleration allowed in turns in m/s^2
+        max_accel (float): braking deceleration in m/s^2
+    """
+
+    def __init__(self, points, cruise_speed: float = CRUISE_SPEED, lookahead: float = LOOKAHEAD,
+                 goal_radius: float = arrival.HORIZONTAL_RADIUS,
+                 max_lateral_accel: float = MAX_LATERAL_ACCEL, max_accel: float = MAX_ACCEL) -> None:
+        points = np.asarray(points, dtype=float)
+        # drop repeated vertices, they have no direction
+        keep = np.concatenate(([True], np.linalg.norm(np.diff(points, axis=0), axis=1) > 1e-6))
+        self.points = points[keep]
+        self.lookahead = lookahead
+        self.goal_radius = goal_radius
+        self.cruise_speed = cruise_speed
+        self.max_accel = max_accel
+        self.lengths, self.arc = path_lengths(self.points)
+        self.speeds = speed_profile(self.points, cruise_speed, lookahead, max_lateral_accel, max_accel)
+        self.segment = 0
+        self.progress = 0.0
+
+    def locate(self, position: np.ndarray) -> float:
+        """
+        Projects the position onto the path, only moving forward and never
+        further than the lookahead past the current progress, so the follower
+        can not skip ahead where the path passes close to itself
+
+        Returns:
+            float: arc length of the projection
+        """
+        if len(self.lengths) == 0:
+            return 0.0
+        last = np.searchsorted(self.arc, self.progress + 2 * self.lookahead, side="right")
+        segments = np.arange(self.segment, min(max(last, self.segment + 1), len(self.lengths)))
+        starts = self.points[segments]
+        directions = self.points[segments + 1] - starts
+        lengths = self.lengths[segments]
+        t = np.einsum("ij,ij->i", position - starts, directions) / np.maximum(lengths ** 2, 1e-12)
+        t = np.clip(t, 0.0, 1.0)
+        distances = np.linalg.norm(starts + t[:, None] * directions - position, axis=1)
+        k = int(np.argmin(distances))
+        self.segment = int(segments[k])
+        self.progress = max(self.progress, float(self.arc[self.segment] + t[k] * lengths[k]))
+        return self.progress
+
+    def speed_at(self, s: float) -> float:
+        """
+        Speed at arc length s: cruise speed, unless braking for the next vertex has to start
+        """
+        upcoming = min(int(np.searchsorted(self.arc, s, side="right")), len(self.arc) - 1)
+        braking = math.sqrt(self.speeds[upcoming] ** 2 + 2 * self.max_accel * max(self.arc[upcoming] - s, 0.0))
+        return min(self.cruise_speed, braking)
+
+    def point_at(self, s: float) -> np.ndarray:
+        return np.array((np.interp(s, self.arc, self.points[:, 0]), np.interp(s, self.arc, self.points[:, 1])))
+
+    def done(self, position: np.ndarray) -> bool:
+        # the progress check keeps a route that ends where it starts from being done right away
+        return (self.arc[-1] - self.progress <= self.lookahead and
+                float(np.linalg.norm(self.points[-1] - position)) <= self.goal_radius)
+
+    def command(self, position) -> np.ndarray:
+        """
+        Args:
+            position: current (east, north) of the vehicle in local meters
+
+        Returns:
+            np.ndarray: commanded (east, north) velocity in m/s, zero once the path is done
+        """
+        position = np.asarray(position, dtype=float)[:2]
+        if self.done(position):
+            return np.zeros(2)
+        s = self.locate(position)
+        target = self.point_at(min(s + self.lookahead, self.arc[-1]))
+        offset = target - position
+        distance = float(np.linalg.norm(offset))
+        if distance < 1e-9:
+            return np.zeros(2)
+
+        # never faster than the profile or than what still allows stopping at the end
+        to_go = max(float(self.arc[-1] - s), float(np.linalg.norm(self.points[-1] - position)))
+        speed = min(self.speed_at(s), math.sqrt(2 * self.max_accel * to_go))
+        speed = max(speed, min(MIN_SPEED, to_go))
+        return offset / distance * speed
+
+
+def simulate_follow(follower: PurePursuit, model: PointMass, rate: float = SETPOINT_RATE,
+                    timeout: float = 600.0) -> Tuple[np.ndarray, float]:
+    """
+    Flies a follower against a kinematic model at the setpoint rate
+
+    Returns:
+        Tuple[np.ndarray, float]: the (steps, dimension) trajectory and the time it took,
+        the time is inf if the path was not finished within the timeout
+    """
+    dt = 1.0 / rate
+    trajectory = [model.position.copy()]
+    for step in range(int(timeout * rate)):
+        if follower.done(model.position[:2]):
+            return np.array(trajectory), step * dt
+        trajectory.append(model.step(follower.command(model.position[:2]), dt).copy())
+    return np.array(trajectory), math.inf
+
+
+def route_to_local(route: Sequence[Tuple[float, float]], reference_lat: float,
+                   reference_lon: float) -> np.ndarray:
+    """
+    Converts (latitude, longitude) points to (east, north) meters around a reference
+    """
+    route = np.asarray(route, dtype=float).reshape(-1, 2)
+    east, north, _ = arrival.enu_offsets(route[:, 0], route[:, 1], 0.0, reference_lat, reference_lon)
+    return np.column_stack((east, north))
+
+
+async def follow_path(drone: System, context: MissionContext, route: Sequence[Tuple[float, float]], altitude: float,
+                      rate: float = SETPOINT_RATE, cruise_speed: float = CRUISE_SPEED,
+                      lookahead: float = LOOKAHEAD, goal_radius: float = arrival.HORIZONTAL_RADIUS,
+                      timeout: Optional[float] = None, now: Optional[Callable[[], float]] = None,
+                      sleep: Callable[[float], Awaitable[None]] = asyncio.sleep) -> None:
+    """
+    Flies a route continuously in offboard mode, streaming velocity setpoints
+    at a fixed rate until the last point is reached. The drone has to be armed
+    and in the air, it holds position once the route is done.
+
+    Parameters
+    ----------
+    drone: System
+        a drone object that has all offboard data needed for computation
+    context: MissionContext
+        the mission context holding the telemetry hub and the captured home position
+    route: Sequence[Tuple[float, float]]
+        (latitude, longitude) points as returned by rrt_flight_test
+    altitude: float
+        altitude relative to home to fly at (in feet)
+    rate: float
+        setpoints per second
+    cruise_speed: float
+        top speed in m/s
+    lookahead: float
+        meters ahead along the path the follower steers to
+    goal_radius: float
+        distance to the last point in meters at which the route is done
+    timeout: float
+        seconds after which following is given up, None follows until done
+    now: Callable[[], float]
+        clock the setpoint schedule runs on, defaults to the event loop time
+    sleep: Callable[[float], Awaitable[None]]
+        sleep matching the clock, e.g. SimulatedSystem.sleep together with
+        lambda: drone.time to follow in simulated time
+
+    Returns
+    -------
+    None
+
+    Raises
+    ------
+    OffboardError
+        if the autopilot refuses offboard mode, the drone has not moved then
+    """
+    altitude = altitude * FEET_TO_METERS
+    hub = context.hub
+    position = await hub.wait_for("position")
+    reference = (context.home.latitude_deg, context.home.longitude_deg)
+
+    # join the route from where the drone is
+    start = route_to_local([(position.latitude_deg, position.longitude_deg)], *reference)
+    follower = PurePursuit(np.vstack((start, route_to_local(route, *reference))), cruise_speed, lookahead,
+                           goal_radius)
+
+    await drone.offboard.set_velocity_ned(VelocityNedYaw(0.0, 0.0, 0.0, 0.0))
+    try:
+        await drone.offboard.start()
+    except OffboardError as error:
+        logging.error(f"Starting offboard mode failed: {error._result.result}")
+        raise
+
+    if now is None:
+        now = asyncio.get_event_loop().time
+    period = 1.0 / rate
+    started = now()
+    tick = started
+    overruns = 0
+    yaw = 0.0
+    logging.info(f"Following path of {follower.arc[-1]:.0f} m in offboard mode at {rate:.0f} Hz")
+    try:
+        while timeout is None or now() - started < timeout:
+            position = hub.position
+            east, north, _ = arrival.enu_offsets(position.latitude_deg, position.longitude_deg, 0.0, *reference)
+            local = np.array((float(east), float(north)))
+            if follower.done(local):
+                break
+            velocity = follower.command(local)
+            climb = np.clip(VERTICAL_GAIN * (altitude - position.relative_altitude_m),
+                            -MAX_VERTICAL_SPEED, MAX_VERTICAL_SPEED)
+            if np.linalg.norm(velocity) > 0.1:
+                yaw = math.degrees(math.atan2(velocity[0], velocity[1]))
+            await drone.offboard.set_velocity_ned(
+                VelocityNedYaw(float(velocity[1]), float(velocity[0]), float(-climb), yaw))
+
+            # sleep until the next tick of a fixed schedule so the rate does not drift,
+            # skip ticks that were missed instead of sending a burst of setpoints
+            tick += period
+            delay = tick - now()
+            if delay < 0:
+                overruns += 1
+                tick = now()
+                delay = 0.0
+            await sleep(delay)
+    finally:
+        await drone.offboard.set_velocity_ned(VelocityNedYaw(0.0, 0.0, 0.0, yaw))
+        await drone.offboard.stop()
+        logging.info(f"Path followed in {now() - started:.1f} s, {overruns} late setpoints")
@@ -0,0 +1,104 @@
+"""
+Plan and fly at the same time. Planning a whole mission before connecting
+keeps the drone on the ground for the full solve. LegStream runs the leg by
+leg planner in an executor from the moment it is started, so connecting,
+arming and flying the first leg overlap with planning the rest, and hands
+the solved legs to the flight loop as an async iterator.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from avoidance import rrt_flight_test
+
+
+Leg = List[Tuple[float, float]]
+
+
+class LegStream:
+    """
+    Solved legs of a mission in flight order, planned in the background
+
+    Parameters
+    ----------
+    obstacles: List[Dict[str, float]]
+        stationary obstacles in lat/lon with radius in feet
+    waypoints: List[Dict[str, float]]
+        mission waypoints in lat/lon
+    boundary: List[Dict[str, float]]
+        fly zone boundary points in lat/lon
+    executor: concurrent.futures.Executor
+        where the planner runs, None uses a dedicated thread that is shut down
+        once the last leg has been handed over or the stream is closed
+    **planner_args:
+        further keyword arguments of rrt_flight_test.rrt_flight_legs
+    """
+
+    def __init__(self, obstacles: List[Dict[str, float]], waypoints: List[Dict[str, float]],
+                 boundary: List[Dict[str, float]],
+                 executor: Optional[concurrent.futures.Executor] = None, **planner_args: Any) -> None:
+        self.obstacles = obstacles
+        self.waypoints = waypoints
+        self.boundary = boundary
+        self.executor = executor
+        self.own_executor = executor is None
+        self.planner_args = planner_args
+        self.queue: Optional[asyncio.Queue] = None
+        self.future: Optional[asyncio.Future] = None
+        self.started: Optional[float] = None
+
+    def start(self) -> "LegStream":
+        """
+        Starts planning, call it before connecting to the drone
+        """
+        if self.future is None:
+            loop = asyncio.get_event_loop()
+            self.queue = asyncio.Queue()
+            self.started = time.time()
+            if self.own_executor:
+                self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+            self.future = loop.run_in_executor(self.executor, self.plan, loop)
+        return self
+
+    def plan(self, loop: asyncio.AbstractEventLoop) -> None:
+        # runs in the executor, every solved leg is handed over to the event loop right away
+        try:
+            for leg in rrt_flight_test.rrt_flight_legs(self.obstacles, self.waypoints, self.boundary,
+                                                       **self.planner_args):
+                loop.call_soon_threadsafe(self.queue.put_nowait, leg)
+        finally:
+            loop.call_soon_threadsafe(self.queue.put_nowait, None)
+
+    async def __aiter__(self) -> AsyncIterator[Leg]:
+        self.start()
+        count = 0
+        try:
+            while True:
+                leg = await self.queue.get()
+                if leg is None:
+                    break
+                count += 1
+                logging.info(f"leg {count} ready after {time.time() - self.started:.2f} s")
+                yield leg
+            # re-raises an exception of the planner
+            await self.future
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """
+        Shuts down the planner thread if the stream created it, a leg still being
+        planned is finished in the background. An executor passed in is left running.
+        """
+        if self.own_executor and self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+    def __enter__(self) -> "LegStream":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
@@ -0,0 +1,228 @@
+"""
+Planner calls that do not block the event loop. RRT* holds the interpreter
+for the whole solve, called from a flight script it starves telemetry and
+heartbeats until every iteration is done. plan_leg and plan_mission run the
+planner in a worker process, forward its progress through an asyncio.Queue
+and stop it through a CancelToken checked inside the iteration loop, so a
+plan can be aborted or replaced right away.
+"""
+
+import asyncio
+import multiprocessing
+import queue
+import time
+import traceback
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from shapely.geometry import Point, Polygon
+
+from avoidance import rrt
+from avoidance import rrt_flight_test
+
+
+# a forked child inherits the locks held by the MAVSDK and gRPC threads of the flight
+# script at fork time and can deadlock on them, workers start from a fresh interpreter,
+# which re-imports the main module, so scripts keep their entry point under __main__
+CONTEXT = multiprocessing.get_context("spawn")
+POLL_INTERVAL = 0.5  # seconds between checks that the worker is still alive
+
+class Progress(NamedTuple):
+    """
+    Progress report of a running plan
+
+    Attributes
+    ----------
+    leg: int
+        index of the leg being planned, 0 for plan_leg
+    iterations: int
+        iterations spent on the leg so far
+    cost: Optional[float]
+        cost of the best path of the leg so far, None before one is found
+    elapsed: float
+        seconds since the plan was started
+    """
+    leg: int
+    iterations: int
+    cost: Optional[float]
+    elapsed: float
+
+
+class CancelToken:
+    """
+    Cooperative cancellation of a plan running in a worker process. The planner
+    finishes the iteration it is in and returns the best result found so far.
+    """
+
+    def __init__(self) -> None:
+        self.event = CONTEXT.Event()
+
+    def cancel(self) -> None:
+        self.event.set()
+
+    def is_set(self) -> bool:
+        return self.event.is_set()
+
+
+def solve_leg(start: Tuple[float, float], goal: Tuple[float, float], boundary: Polygon, obstacles: list,
+              planner_args: Dict[str, Any], cancel, messages) -> Optional[List[Tuple[float, float]]]:
+    """
+    Worker side of plan_leg
+
+    Returns
+    -------
+    Optional[List[Tuple[float, float]]]
+        the relaxed path as coordinates, None if no path was found
+    """
+    G, _, _ = rrt.RRT_star(Point(start), Point(goal), boundary, obstacles, cancel=cancel,
+                           progress=lambda iterations, cost: messages.put(("progress", 0, iterations, cost)),
+                           **planner_args)
+    if not G.success:
+        return None
+    path = rrt.relax_path(rrt.dijkstra(G), obstacles)
+    return [(p.x, p.y) for p in path]
+
+
+def solve_mission(obstacles: List[Dict[str, float]], waypoints: List[Dict[str, float]],
+                  boundary: List[Dict[str, float]], planner_args: Dict[str, Any],
+                  cancel, messages) -> List[Tuple[float, float]]:
+    """
+    Worker side of plan_mission
+
+    Returns
+    -------
+    List[Tuple[float, float]]
+        the route as (latitude, longitude) pairs
+    """
+    route = []
+    legs = rrt_flight_test.rrt_flight_legs(
+        obstacles, waypoints, boundary, cancel=cancel,
+        progress=lambda leg, iterations, cost: messages.put(("progress", leg, iterations, cost)),
+        **planner_args)
+    for leg in legs:
+        route.extend(leg)
+    return route
+
+
+def next_message(messages, process) -> tuple:
+    # blocks in an executor thread, a worker that died without a last message raises
+    while True:
+        try:
+            return messages.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            if process.is_alive():
+                continue
+        # the worker may have exited right after its last message
+        try:
+            return messages.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            raise RuntimeError(f"planner worker exited with code {process.exitcode} without a result") from None
+
+
+def reap(process, *shared) -> None:
+    # joins a cancelled worker, the shared token and queue stay referenced until
+    # it exited, a spawned worker may still be unpickling them
+    process.join()
+
+
+def worker(solve, args, cancel, messages) -> None:
+    # entry point of the worker process, the result or the error is the last message
+    try:
+        messages.put(("done", solve(*args, cancel, messages)))
+    except Exception:
+        messages.put(("error", traceback.format_exc()))
+
+
+async def run_in_worker(solve, args: tuple, progress: Optional[asyncio.Queue],
+                        cancel: Optional[CancelToken]) -> Any:
+    """
+    Runs a solve function in a fresh process and relays its messages until it
+    finishes. Cancelling the awaiting task also cancels the plan, a worker that
+    dies without a result raises a RuntimeError.
+    """
+    loop = asyncio.get_event_loop()
+    cancel = cancel or CancelToken()
+    messages = CONTEXT.Queue()
+    process = CONTEXT.Process(target=worker, args=(solve, args, cancel.event, messages), daemon=True)
+    started = time.time()
+    process.start()
+
+    try:
+        while True:
+            message = await loop.run_in_executor(None, next_message, messages, process)
+            if message[0] == "progress":
+                if progress is not None:
+                    progress.put_nowait(Progress(*message[1:], time.time() - started))
+            else:
+                break
+    except asyncio.CancelledError:
+        # the worker stops at its next iteration and exits on its own
+        cancel.cancel()
+        loop.run_in_executor(None, reap, process, cancel, messages)
+        raise
+
+    await loop.run_in_executor(None, process.join)
+    if message[0] == "error":
+        raise RuntimeError(f"planner worker failed:\n{message[1]}")
+    return message[1]
+
+
+async def plan_leg(start: Point, goal: Point, boundary: Polygon, obstacles: list,
+                   progress: Optional[asyncio.Queue] = None, cancel: Optional[CancelToken] = None,
+                   **planner_args: Any) -> Optional[List[Point]]:
+    """
+    Plans a single leg with rrt.RRT_star in a worker process
+
+    Parameters
+    ----------
+    start: Point
+        start of the leg in utm coordinates
+    goal: Point
+        goal of the leg in utm coordinates
+    boundary: Polygon
+        fly zone
+    obstacles: list
+        obstacle rings
+    progress: asyncio.Queue
+        receives a Progress report every rrt.PROGRESS_INTERVAL iterations
+    cancel: CancelToken
+        stops the planner, the best path found until then is returned
+    **planner_args:
+        further keyword arguments of rrt.RRT_star
+
+    Returns
+    -------
+    Optional[List[Point]]
+        the relaxed path, None if no path was found
+    """
+    path = await run_in_worker(solve_leg, ((start.x, start.y), (goal.x, goal.y), boundary, obstacles,
+                                           planner_args), progress, cancel)
+    return None if path is None else [Point(p) for p in path]
+
+
+async def plan_mission(obstacles: List[Dict[str, float]], waypoints: List[Dict[str, float]],
+                       boundary: List[Dict[str, float]], progress: Optional[asyncio.Queue] = None,
+                       cancel: Optional[CancelToken] = None, **planner_args: Any) -> List[Tuple[float, float]]:
+    """
+    Plans a whole mission with rrt_flight_test in a worker process
+
+    Parameters
+    ----------
+    obstacles: List[Dict[str, float]]
+        stationary obstacles in lat/lon with radius in feet
+    waypoints: List[Dict[str, float]]
+        mission waypoints in lat/lon
+    boundary: List[Dict[str, float]]
+        fly zone boundary points in lat/lon
+    progress: asyncio.Queue
+        receives a Progress report every rrt.PROGRESS_INTERVAL iterations
+    cancel: CancelToken
+        stops the planner, the legs solved until then are returned
+    **planner_args:
+        further keyword arguments of rrt_flight_test.rrt_flight_legs
+
+    Returns
+    -------
+    List[Tuple[float, float]]
+        the route as (latitude, longitude) pairs
+    """
+    return await run_in_worker(solve_mission, (obstacles, waypoints, boundary, planner_args), progress, cancel)
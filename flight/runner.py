@@ -0,0 +1,468 @@
+"""
+One mission runner for all flight scripts. A mission is a source of route
+legs and an executor that flies them, the runner owns everything in between:
+connecting, the telemetry hub, arming, the home position, takeoff and the
+return to launch. The scripts only pick a source and an executor, so a fix
+to any of these steps applies to every script at once.
+
+Sources:
+    WaypointList    hardcoded (latitude, longitude) points
+    JsonWaypoints   the waypoints of a mission json file, flown directly
+    PlannedRoute    the waypoints of a mission json file with obstacle avoidance,
+                    planned in the background while the drone connects
+    KmlWaypoints    the point placemarks of a kml file
+    MappingGrid     the survey grid of mapping.map_functions
+
+Executors:
+    GotoExecutor     goto_location per point with distance based arrival
+    MissionExecutor  every leg uploaded as one autopilot mission
+    OffboardExecutor pure pursuit velocity setpoints along every leg
+"""
+
+import abc
+import asyncio
+import json
+import logging
+import sys
+import xml.etree.ElementTree as ElementTree
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from mavsdk import System
+
+from flight import arrival
+from flight import mission_upload
+from flight import offboard
+from flight.actions import fly_route
+from flight.context import MissionContext
+from flight.pipeline import Leg, LegStream
+from flight.telemetry import TelemetryHub
+from mapping import map_functions
+
+
+SIMULATOR_ADDRESS = "udp://:14540"
+SERIAL_ADDRESS = "serial:///dev/ttyUSB0:921600"
+ALTITUDE = 100  # feet, flight altitude of planned and kml routes
+TAKEOFF_MARGIN = 0.5  # meters below the takeoff altitude at which the takeoff counts as done
+TAKEOFF_TIMEOUT = 30.0  # seconds the takeoff may take before the mission goes on regardless
+KML_NAMESPACE = "{http://www.opengis.net/kml/2.2}"
+
+
+def load_mission(filename: str) -> Dict[str, Any]:
+    """
+    Reads a mission json file as sent by the interop server
+
+    Parameters
+    ----------
+    filename: str
+        name of the json file
+
+    Returns
+    -------
+    Dict[str, Any]
+        the mission with its waypoints, stationaryObstacles and boundaryPoints
+    """
+    with open(filename) as f:
+        return json.load(f)
+
+
+def waypoint_parsing(filename: str) -> List[Dict[str, float]]:
+    """
+    Parses the json file for all mission-critical waypoints
+
+    Parameters
+    ----------
+    filename: str
+        name of the json file
+
+    Returns
+    -------
+    List[Dict[str, float]]
+        list of dictionaries containing latitude, longitude and altitude of the waypoints
+    """
+    return list(load_mission(filename)["waypoints"])
+
+
+def boundary_parsing(filename: str) -> List[Dict[str, float]]:
+    """
+    Parses the json file for the fly zone boundary
+
+    Parameters
+    ----------
+    filename: str
+        name of the json file
+
+    Returns
+    -------
+    List[Dict[str, float]]
+        list of dictionaries containing latitude and longitude of the boundary points
+    """
+    return list(load_mission(filename)["boundaryPoints"])
+
+
+def stationary_obstacle_parsing(filename: str) -> List[Dict[str, float]]:
+    """
+    Parses the json file for the stationary obstacles
+
+    Parameters
+    ----------
+    filename: str
+        name of the json file
+
+    Returns
+    -------
+    List[Dict[str, float]]
+        list of dictionaries containing latitude, longitude, radius, and height of obstacles
+    """
+    return list(load_mission(filename)["stationaryObstacles"])
+
+
+def kml_points(filename: str) -> List[Tuple[float, float]]:
+    """
+    Parses the point placemarks of a kml file in document order
+
+    Parameters
+    ----------
+    filename: str
+        name of the kml file
+
+    Returns
+    -------
+    List[Tuple[float, float]]
+        (latitude, longitude) of every point, the ground elevation of the file is dropped
+    """
+    root = ElementTree.parse(filename).getroot()
+    points: List[Tuple[float, float]] = []
+    for placemark in root.iter(f"{KML_NAMESPACE}Placemark"):
+        coordinates = placemark.find(f"{KML_NAMESPACE}Point/{KML_NAMESPACE}coordinates")
+        if coordinates is None:
+            continue
+        longitude, latitude = coordinates.text.strip().split(",")[:2]
+        points.append((float(latitude), float(longitude)))
+    return points
+
+
+class MissionSource(abc.ABC):
+    """
+    Route legs of a mission with their altitudes in feet. start is called
+    before connecting, so a source can prepare its route meanwhile.
+    """
+
+    def start(self) -> "MissionSource":
+        return self
+
+    @abc.abstractmethod
+    async def legs(self) -> AsyncIterator[Tuple[Leg, List[float]]]:
+        raise NotImplementedError
+        yield
+
+
+class WaypointList(MissionSource):
+    """
+    A fixed list of waypoints flown as one leg
+
+    Parameters
+    ----------
+    route: Sequence[Tuple[float, float]]
+        (latitude, longitude) points in flight order
+    altitudes: float or Sequence[float]
+        altitude relative to home in feet, one for the route or one per point
+    """
+
+    def __init__(self, route: Sequence[Tuple[float, float]], altitudes: Union[float, Sequence[float]]) -> None:
+        self.route = list(route)
+        if isinstance(altitudes, (int, float)):
+            altitudes = [altitudes] * len(self.route)
+        self.altitudes = list(altitudes)
+
+    async def legs(self) -> AsyncIterator[Tuple[Leg, List[float]]]:
+        yield self.route, self.altitudes
+
+
+class JsonWaypoints(WaypointList):
+    """
+    The waypoints of a mission json file at their own altitudes, obstacles are ignored
+
+    Parameters
+    ----------
+    filename: str
+        name of the json file
+    """
+
+    def __init__(self, filename: str) -> None:
+        waypoints = waypoint_parsing(filename)
+        super().__init__([(w["latitude"], w["longitude"]) for w in waypoints], [w["altitude"] for w in waypoints])
+
+
+class KmlWaypoints(WaypointList):
+    """
+    The point placemarks of a kml file, e.g. drawn in Google Earth
+
+    Parameters
+    ----------
+    filename: str
+        name of the kml file
+    altitude: float
+        altitude relative to home in feet for every point
+    """
+
+    def __init__(self, filename: str, altitude: float = ALTITUDE) -> None:
+        super().__init__(kml_points(filename), altitude)
+
+
+class MappingGrid(WaypointList):
+    """
+    The lawnmower survey path of mapping.map_functions over a square area
+
+    Parameters
+    ----------
+    center: Tuple[float, float]
+        (latitude, longitude) of the center of the area
+    height: float
+        side length of the area in feet
+    altitude: float
+        altitude relative to home in feet, sets the image footprint as well
+    focal_length: float
+        focal length of the camera in mm
+    """
+
+    def __init__(self, center: Tuple[float, float], height: float, altitude: float, focal_length: float) -> None:
+        super().__init__(map_functions.map((center, height), altitude, focal_length), altitude)
+
+
+class PlannedRoute(MissionSource):
+    """
+    Obstacle free route through the waypoints of a mission json file, planned
+    leg by leg in the background. The first leg is flown as soon as it is solved.
+
+    Parameters
+    ----------
+    filename: str
+        name of the json file
+    altitude: float
+        altitude relative to home in feet for the whole route
+    **planner_args:
+        further keyword arguments of rrt_flight_test.rrt_flight_legs
+    """
+
+    def __init__(self, filename: str, altitude: float = ALTITUDE, **planner_args: Any) -> None:
+        mission = load_mission(filename)
+        self.altitude = altitude
+        self.stream = LegStream(mission["stationaryObstacles"], mission["waypoints"], mission["boundaryPoints"],
+                                **planner_args)
+
+    def start(self) -> "PlannedRoute":
+        self.stream.start()
+        return self
+
+    async def legs(self) -> AsyncIterator[Tuple[Leg, List[float]]]:
+        async for leg in self.stream:
+            yield leg, [self.altitude] * len(leg)
+
+
+class Executor(abc.ABC):
+    """
+    Flies route legs. takeoff is called once after arming, fly once per leg.
+    Every executor takes off and hovers before the first leg, the autopilot
+    disarms a vehicle left armed on the ground while a leg is still planned.
+    """
+
+    async def takeoff(self, drone: System, context: MissionContext) -> None:
+        logging.info("-- Taking off")
+        await drone.action.takeoff()
+        altitude = await drone.action.get_takeoff_altitude()
+        try:
+            await context.hub.wait_for("position",
+                                       lambda position: position.relative_altitude_m >= altitude - TAKEOFF_MARGIN,
+                                       TAKEOFF_TIMEOUT)
+        except asyncio.TimeoutError:
+            logging.warning(f"takeoff altitude of {altitude:.1f} m not reached after {TAKEOFF_TIMEOUT:.0f} s, "
+                            f"going on at {context.hub.position.relative_altitude_m:.1f} m")
+
+    @abc.abstractmethod
+    async def fly(self, drone: System, context: MissionContext, route: Leg, altitudes: List[float]) -> None:
+        raise NotImplementedError
+
+
+class GotoExecutor(Executor):
+    """
+    Sends every point with goto_location and waits for its arrival
+
+    Parameters
+    ----------
+    fast_mode: bool
+        if true, the wider fast mode radius is used and the altitude is ignored
+    **arrival_args:
+        horizontal_radius, vertical_radius and dwell of flight.actions.goto_point
+    """
+
+    def __init__(self, fast_mode: bool = False, **arrival_args: Any) -> None:
+        self.fast_mode = fast_mode
+        self.arrival_args = arrival_args
+
+    async def fly(self, drone: System, context: MissionContext, route: Leg, altitudes: List[float]) -> None:
+        await fly_route(drone, context, route, altitudes, self.fast_mode, **self.arrival_args)
+
+
+class MissionExecutor(Executor):
+    """
+    Uploads every leg as an autopilot mission
+
+    Parameters
+    ----------
+    speed: float
+        cruise speed of the mission items in m/s
+    acceptance_radius: float
+        radius in meters at which the autopilot counts an item as reached
+    """
+
+    def __init__(self, speed: float = mission_upload.MISSION_SPEED,
+                 acceptance_radius: float = arrival.HORIZONTAL_RADIUS) -> None:
+        self.speed = speed
+        self.acceptance_radius = acceptance_radius
+
+    async def fly(self, drone: System, context: MissionContext, route: Leg, altitudes: List[float]) -> None:
+        plan = mission_upload.mission_plan(route, altitudes, self.speed, self.acceptance_radius)
+        await mission_upload.fly_mission(drone, plan, return_to_launch=False)
+
+
+class OffboardExecutor(Executor):
+    """
+    Follows every leg with velocity setpoints at the altitude of its first point
+
+    Parameters
+    ----------
+    **follow_args:
+        rate, cruise_speed, lookahead, goal_radius and timeout of flight.offboard.follow_path,
+        the clock comes from the mission context
+    """
+
+    def __init__(self, **follow_args: Any) -> None:
+        self.follow_args = follow_args
+
+    async def fly(self, drone: System, context: MissionContext, route: Leg, altitudes: List[float]) -> None:
+        follow_args = dict(now=context.now, sleep=context.sleep, **self.follow_args)
+        await offboard.follow_path(drone, context, route, altitudes[0], **follow_args)
+
+
+class MissionRunner:
+    """
+    Connects, arms, takes off, flies every leg of the source with the executor
+    and returns to launch
+
+    Parameters
+    ----------
+    source: MissionSource
+        where the route legs come from
+    executor: Executor
+        how the legs are flown
+    system_address: str
+        mavsdk connection string of the drone
+    max_speed: float
+        maximum speed of the drone in m/s, None keeps the autopilot setting
+    drone: System
+        an already created drone object, e.g. a flight.sim.SimulatedSystem
+    now: Callable[[], float]
+        clock of the mission, see MissionContext, e.g. lambda: drone.time
+    sleep: Callable[[float], Awaitable[None]]
+        sleep matching the clock, e.g. SimulatedSystem.sleep
+    """
+
+    def __init__(self, source: MissionSource, executor: Executor, system_address: str = SIMULATOR_ADDRESS,
+                 max_speed: Optional[float] = None, drone: Optional[System] = None,
+                 now: Optional[Callable[[], float]] = None,
+                 sleep: Callable[[float], Awaitable[None]] = asyncio.sleep) -> None:
+        self.source = source
+        self.executor = executor
+        self.system_address = system_address
+        self.max_speed = max_speed
+        self.drone = drone if drone is not None else System()
+        self.now = now
+        self.sleep = sleep
+        self.context: Optional[MissionContext] = None
+
+    async def connect(self) -> TelemetryHub:
+        drone = self.drone
+        await drone.connect(system_address=self.system_address)
+        if self.max_speed is not None:
+            await drone.action.set_maximum_speed(self.max_speed)
+
+        logging.info("Waiting for drone to connect...")
+        async for state in drone.core.connection_state():
+            if state.is_connected:
+                logging.info("Drone discovered!")
+                break
+
+        logging.info("Waiting for drone to have a global position estimate...")
+        hub: TelemetryHub = await TelemetryHub(drone).start()
+        await hub.wait_for("health", lambda health: health.is_global_position_ok)
+        logging.info("Global position estimate ok")
+        return hub
+
+    async def run(self, stay_connected: bool = True) -> None:
+        """
+        Flies the mission
+
+        Parameters
+        ----------
+        stay_connected: bool
+            if true, keeps the connection open after the return to launch until interrupted
+
+        Returns
+        -------
+        None
+        """
+        # the source prepares its route while connecting
+        self.source.start()
+        hub = await self.connect()
+        drone = self.drone
+
+        logging.info("-- Arming")
+        await drone.action.arm()
+        self.context = await MissionContext(drone, hub, self.now, self.sleep).capture_home()
+        await self.executor.takeoff(drone, self.context)
+
+        try:
+            async for route, altitudes in self.source.legs():
+                await self.executor.fly(drone, self.context, route, altitudes)
+        except Exception:
+            logging.exception("Flying the mission failed, returning to home")
+            await drone.action.return_to_launch()
+            raise
+        logging.info("Last waypoint reached")
+
+        logging.info("Returning to home")
+        await drone.action.return_to_launch()
+        if not stay_connected:
+            await hub.stop()
+            return
+        logging.info("Staying connected, press Ctrl-C to exit")
+        while True:
+            await asyncio.sleep(1)
+
+
+def main(runner: MissionRunner, log_file: Optional[str] = None) -> None:
+    """
+    Runs a mission until interrupted, for the __main__ block of the flight scripts
+
+    Parameters
+    ----------
+    runner: MissionRunner
+        the mission to fly
+    log_file: str
+        file the log is written to in addition to stdout
+
+    Returns
+    -------
+    None
+    """
+    handlers: List[logging.Handler] = [logging.StreamHandler(sys.stdout)]
+    if log_file is not None:
+        handlers.append(logging.FileHandler(log_file))
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s", handlers=handlers)
+
+    try:
+        loop = asyncio.get_event_loop()
+        loop.run_until_complete(runner.run())
+    except KeyboardInterrupt:
+        print("Program ended")
+        sys.exit(0)
@@ -0,0 +1,412 @@
+"""
+In-process stand-in for a MAVSDK System, for running flight logic without a
+PX4 SITL install or hardware. SimulatedSystem implements the part of the
+MAVSDK API the flight scripts use on top of a kinematic point mass model
+and keeps its own clock, which can run faster than real time:
+
+- core.connection_state
+- telemetry.position, home, health, battery, in_air
+- action.arm, takeoff, land, goto_location, set_maximum_speed, return_to_launch
+- mission.upload_mission, start_mission, mission_progress,
+  set_return_to_launch_after_mission
+- offboard.set_velocity_ned, start, stop
+
+Telemetry values are plain objects carrying the attribute names of their
+MAVSDK counterparts, mission items are read through MissionItem attributes.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+from typing import Any, AsyncIterator, Callable, List, Optional
+
+import numpy as np
+
+from flight import arrival
+
+
+HOME = (37.9481747, -91.7833502, 300.0)  # latitude, longitude and amsl altitude of the default home
+STEP = 0.05  # simulated seconds per physics step
+TIME_FACTOR = 1.0  # simulated seconds per real second, None runs as fast as possible
+CONNECT_TIME = 1.0  # simulated seconds until the vehicle is discovered
+GPS_FIX_TIME = 3.0  # simulated seconds until the global position estimate is ok
+MAX_SPEED = 12.0  # m/s, default horizontal speed limit
+MAX_ACCEL = 3.0  # m/s^2
+MAX_CLIMB_RATE = 3.0  # m/s
+LAND_SPEED = 0.7  # m/s
+TAKEOFF_ALTITUDE = 2.5  # meters above home, the PX4 default
+RTL_ALTITUDE = 30.0  # meters above home the vehicle climbs to before returning
+ACCEPTANCE_RADIUS = 2.0  # meters, used for mission items without their own radius
+POSITION_RATE = 10.0  # position updates per simulated second
+STATUS_RATE = 1.0  # updates per simulated second of the other streams
+IN_AIR_ALTITUDE = 0.3  # meters above ground at which the vehicle counts as flying
+
+
+class Telemetry:
+    """Plain record with the attribute names of the matching MAVSDK type"""
+
+    def __init__(self, **fields: Any) -> None:
+        self.__dict__.update(fields)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Telemetry) and self.__dict__ == other.__dict__
+
+    def __repr__(self) -> str:
+        return f"Telemetry({', '.join(f'{k}={v!r}' for k, v in self.__dict__.items())})"
+
+
+class PointMass:
+    """
+    Kinematic vehicle model: the velocity follows the command within an
+    acceleration and a speed limit, used to test followers without a vehicle
+
+    Args:
+        position: initial position in local meters, any dimension
+        max_speed (float): speed limit in m/s
+        max_accel (float): acceleration limit in m/s^2
+    """
+
+    def __init__(self, position, max_speed: float = MAX_SPEED, max_accel: float = MAX_ACCEL) -> None:
+        self.position = np.array(position, dtype=float)
+        self.velocity = np.zeros_like(self.position)
+        self.max_speed = max_speed
+        self.max_accel = max_accel
+
+    def step(self, command, dt: float) -> np.ndarray:
+        change = np.asarray(command, dtype=float) - self.velocity
+        limit = self.max_accel * dt
+        norm = float(np.linalg.norm(change))
+        if norm > limit:
+            change *= limit / norm
+        self.velocity += change
+        speed = float(np.linalg.norm(self.velocity))
+        if speed > self.max_speed:
+            self.velocity *= self.max_speed / speed
+        self.position += self.velocity * dt
+        return self.position
+
+
+class Plugin:
+    def __init__(self, system: "SimulatedSystem") -> None:
+        self.system = system
+
+
+class Core(Plugin):
+    async def connection_state(self) -> AsyncIterator[Telemetry]:
+        await self.system.sleep(CONNECT_TIME)
+        async for connected in self.system.stream(STATUS_RATE, lambda: True):
+            yield Telemetry(uuid=1, is_connected=connected)
+
+
+class TelemetryPlugin(Plugin):
+    async def position(self) -> AsyncIterator[Telemetry]:
+        async for position in self.system.stream(POSITION_RATE, self.system.position):
+            yield position
+
+    async def home(self) -> AsyncIterator[Telemetry]:
+        async for home in self.system.stream(STATUS_RATE, self.system.home):
+            yield home
+
+    async def health(self) -> AsyncIterator[Telemetry]:
+        async for health in self.system.stream(STATUS_RATE, self.system.health):
+            yield health
+
+    async def battery(self) -> AsyncIterator[Telemetry]:
+        battery = Telemetry(voltage_v=16.2, remaining_percent=0.9)
+        async for value in self.system.stream(STATUS_RATE, lambda: battery):
+            yield value
+
+    async def in_air(self) -> AsyncIterator[bool]:
+        async for in_air in self.system.stream(STATUS_RATE, lambda: self.system.in_air):
+            yield in_air
+
+
+class Action(Plugin):
+    async def arm(self) -> None:
+        self.system.armed = True
+
+    async def disarm(self) -> None:
+        if self.system.in_air:
+            raise RuntimeError("can not disarm in the air")
+        self.system.armed = False
+
+    async def set_maximum_speed(self, speed: float) -> None:
+        self.system.model.max_speed = speed
+
+    async def get_takeoff_altitude(self) -> float:
+        return TAKEOFF_ALTITUDE
+
+    async def takeoff(self) -> None:
+        self.system.require_armed()
+        east, north, _ = self.system.model.position
+        self.system.fly_to("takeoff", np.array((east, north, TAKEOFF_ALTITUDE)))
+
+    async def land(self) -> None:
+        self.system.mode = "land"
+
+    async def goto_location(self, latitude_deg: float, longitude_deg: float, absolute_altitude_m: float,
+                            yaw_deg: float) -> None:
+        self.system.require_armed()
+        self.system.fly_to("goto", self.system.local(latitude_deg, longitude_deg, absolute_altitude_m))
+
+    async def return_to_launch(self) -> None:
+        self.system.return_to_launch()
+
+
+class Mission(Plugin):
+    def __init__(self, system: "SimulatedSystem") -> None:
+        super().__init__(system)
+        self.items: List[Any] = []
+        self.current = 0
+        self.return_after = False
+
+    async def set_return_to_launch_after_mission(self, enable: bool) -> None:
+        self.return_after = enable
+
+    async def upload_mission(self, plan: Any) -> None:
+        self.items = list(plan.mission_items)
+        self.current = 0
+
+    async def start_mission(self) -> None:
+        self.system.require_armed()
+        if not self.items:
+            raise RuntimeError("no mission uploaded")
+        self.system.mode = "mission"
+
+    async def mission_progress(self) -> AsyncIterator[Telemetry]:
+        async for progress in self.system.stream(POSITION_RATE, lambda: (self.current, len(self.items)),
+                                                 changes_only=True):
+            yield Telemetry(current=progress[0], total=progress[1])
+
+    def target(self) -> Optional[np.ndarray]:
+        if self.current >= len(self.items):
+            return None
+        item = self.items[self.current]
+        return self.system.local(item.latitude_deg, item.longitude_deg,
+                                 self.system.home_altitude + item.relative_altitude_m)
+
+    def step(self) -> Optional[np.ndarray]:
+        """
+        Advances past reached items and returns the commanded velocity, None
+        once the mission is done
+        """
+        while self.current < len(self.items):
+            item = self.items[self.current]
+            radius = getattr(item, "acceptance_radius_m", ACCEPTANCE_RADIUS)
+            if radius is None or math.isnan(radius):
+                radius = ACCEPTANCE_RADIUS
+            target = self.target()
+            if np.linalg.norm(target - self.system.model.position) > radius:
+                speed = getattr(item, "speed_m_s", None)
+                if speed is None or math.isnan(speed):
+                    speed = self.system.model.max_speed
+                return self.system.approach(target, speed, brake=not item.is_fly_through)
+            self.current += 1
+        return None
+
+
+class Offboard(Plugin):
+    def __init__(self, system: "SimulatedSystem") -> None:
+        super().__init__(system)
+        self.velocity: Optional[np.ndarray] = None
+
+    async def set_velocity_ned(self, velocity: Any) -> None:
+        self.velocity = np.array((velocity.east_m_s, velocity.north_m_s, -velocity.down_m_s))
+
+    async def start(self) -> None:
+        self.system.require_armed()
+        if self.velocity is None:
+            raise RuntimeError("a setpoint has to be set before starting offboard mode")
+        self.system.mode = "offboard"
+
+    async def stop(self) -> None:
+        self.system.mode = "hold"
+        self.system.target = self.system.model.position.copy()
+
+
+class SimulatedSystem:
+    """
+    Simulated vehicle with the MAVSDK System interface used by the flight scripts
+
+    Args:
+        home (Tuple[float, float, float]): latitude, longitude and amsl altitude of home
+        time_factor (Optional[float]): simulated seconds per real second, None
+            runs the simulation as fast as the event loop allows
+        max_speed (float): horizontal speed limit in m/s
+        max_accel (float): acceleration limit in m/s^2
+        step (float): simulated seconds per physics step
+
+    Attributes:
+        time (float): simulated seconds since connect
+        mode (str): flight mode, "idle", "takeoff", "goto", "hold", "mission",
+            "offboard", "rtl" or "land"
+    """
+
+    def __init__(self, home=HOME, time_factor: Optional[float] = TIME_FACTOR, max_speed: float = MAX_SPEED,
+                 max_accel: float = MAX_ACCEL, step: float = STEP) -> None:
+        self.home_latitude, self.home_longitude, self.home_altitude = home
+        self.time_factor = time_factor
+        self.dt = step
+        self.model = PointMass(np.zeros(3), max_speed, max_accel)
+        self.time = 0.0
+        self.armed = False
+        self.in_air = False
+        self.mode = "idle"
+        self.target: Optional[np.ndarray] = None
+        self.brake = True
+        self.rtl_stage = None
+        self.waiters: List[tuple] = []
+        self.sequence = itertools.count()
+        self.task: Optional[asyncio.Task] = None
+
+        self.core = Core(self)
+        self.telemetry = TelemetryPlugin(self)
+        self.action = Action(self)
+        self.mission = Mission(self)
+        self.offboard = Offboard(self)
+
+    async def connect(self, system_address: Optional[str] = None) -> None:
+        if self.task is None:
+            self.task = asyncio.ensure_future(self.run())
+
+    async def close(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    # clock
+
+    async def sleep(self, seconds: float) -> None:
+        """
+        Sleeps for simulated seconds
+        """
+        future = asyncio.get_event_loop().create_future()
+        heapq.heappush(self.waiters, (self.time + seconds, next(self.sequence), future))
+        await future
+
+    async def stream(self, rate: float, value: Callable[[], Any], changes_only: bool = False) -> AsyncIterator[Any]:
+        last = None
+        while True:
+            current = value()
+            if not changes_only or current != last:
+                yield current
+                last = current
+            await self.sleep(1.0 / rate)
+
+    async def run(self) -> None:
+        loop = asyncio.get_event_loop()
+        started = loop.time() - self.time / (self.time_factor or math.inf)
+        while True:
+            self.step(self.dt)
+            while self.waiters and self.waiters[0][0] <= self.time:
+                _, _, future = heapq.heappop(self.waiters)
+                if not future.done():
+                    future.set_result(None)
+            # keep pace with the real clock against the start, so sleep overhead does not add up
+            delay = 0.0
+            if self.time_factor is not None:
+                delay = max(0.0, started + self.time / self.time_factor - loop.time())
+            await asyncio.sleep(delay)
+
+    # telemetry values
+
+    def position(self) -> Telemetry:
+        east, north, up = self.model.position
+        lat, lon = arrival.enu_to_latlon(east, north, self.home_latitude, self.home_longitude)
+        return Telemetry(latitude_deg=float(lat), longitude_deg=float(lon),
+                         absolute_altitude_m=self.home_altitude + float(up), relative_altitude_m=float(up))
+
+    def home(self) -> Telemetry:
+        return Telemetry(latitude_deg=self.home_latitude, longitude_deg=self.home_longitude,
+                         absolute_altitude_m=self.home_altitude, relative_altitude_m=0.0)
+
+    def health(self) -> Telemetry:
+        fixed = self.time >= GPS_FIX_TIME
+        return Telemetry(is_gyrometer_calibration_ok=True, is_accelerometer_calibration_ok=True,
+                         is_magnetometer_calibration_ok=True, is_local_position_ok=fixed,
+                         is_global_position_ok=fixed, is_home_position_ok=fixed, is_armable=fixed)
+
+    # flight modes
+
+    def local(self, latitude: float, longitude: float, absolute_altitude: float) -> np.ndarray:
+        east, north, up = arrival.enu_offsets(latitude, longitude, absolute_altitude,
+                                              self.home_latitude, self.home_longitude, self.home_altitude)
+        return np.array((float(east), float(north), float(up)))
+
+    def require_armed(self) -> None:
+        if not self.armed:
+            raise RuntimeError("vehicle is not armed")
+
+    def fly_to(self, mode: str, target: np.ndarray, brake: bool = True) -> None:
+        self.mode = mode
+        self.target = target
+        self.brake = brake
+
+    def return_to_launch(self) -> None:
+        east, north, up = self.model.position
+        self.rtl_stage = "climb"
+        self.fly_to("rtl", np.array((east, north, max(up, RTL_ALTITUDE))))
+
+    def approach(self, target: np.ndarray, speed: float, brake: bool = True) -> np.ndarray:
+        """
+        Velocity towards a target, slowing down to stop on it unless brake is false
+        """
+        offset = target - self.model.position
+        distance = float(np.linalg.norm(offset))
+        if distance < 1e-6:
+            return np.zeros(3)
+        if brake:
+            speed = min(speed, math.sqrt(2 * self.model.max_accel * distance))
+        velocity = offset / distance * speed
+        velocity[2] = np.clip(velocity[2], -MAX_CLIMB_RATE, MAX_CLIMB_RATE)
+        return velocity
+
+    def command(self) -> np.ndarray:
+        if not self.armed or self.mode == "idle":
+            return np.zeros(3)
+        if self.mode == "offboard":
+            return self.offboard.velocity
+        if self.mode == "land":
+            return np.array((0.0, 0.0, -LAND_SPEED))
+        if self.mode == "mission":
+            if not self.in_air and self.model.position[2] < TAKEOFF_ALTITUDE:
+                # PX4 climbs straight up before heading to the first item
+                target = self.mission.target()
+                east, north, _ = self.model.position
+                return self.approach(np.array((east, north, max(target[2], TAKEOFF_ALTITUDE))),
+                                     self.model.max_speed)
+            velocity = self.mission.step()
+            if velocity is not None:
+                return velocity
+            if self.mission.return_after:
+                self.return_to_launch()
+            else:
+                self.fly_to("hold", self.model.position.copy())
+            return np.zeros(3)
+        if self.mode == "rtl" and np.linalg.norm(self.target - self.model.position) < 0.5:
+            if self.rtl_stage == "climb":
+                self.rtl_stage = "return"
+                self.target = np.array((0.0, 0.0, self.target[2]))
+            else:
+                self.mode = "land"
+                return np.array((0.0, 0.0, -LAND_SPEED))
+        return self.approach(self.target, self.model.max_speed, self.brake)
+
+    def step(self, dt: float) -> None:
+        self.time += dt
+        self.model.step(self.command(), dt)
+        position = self.model.position
+        if position[2] <= 0.0:
+            position[2] = 0.0
+            self.model.velocity[2] = max(self.model.velocity[2], 0.0)
+            if self.in_air:
+                # touched down
+                self.in_air = False
+                if self.mode == "land":
+                    self.armed = False
+                    self.mode = "idle"
+                    self.model.velocity[:] = 0.0
+        elif position[2] > IN_AIR_ALTITUDE:
+            self.in_air = True
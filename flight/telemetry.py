@@ -0,0 +1,131 @@
+"""
+Single long lived telemetry subscription per vehicle. Opening a fresh
+telemetry stream for every check re-subscribes each time and the fixed sleeps
+between checks add up to a second of latency per waypoint. TelemetryHub
+subscribes once to every stream the flight scripts use, keeps the latest
+values and wakes up waiting coroutines as soon as an update satisfies their
+condition.
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from mavsdk import System
+
+
+STREAMS = ("position", "home", "health", "battery", "in_air")
+
+
+class TelemetryHub:
+    """
+    Latest telemetry of a vehicle, kept up to date by one task per stream
+
+    Parameters
+    ----------
+    drone: System
+        the connected vehicle
+    streams: Tuple[str, ...]
+        names of the drone.telemetry streams to follow
+
+    Attributes
+    ----------
+    position, home, health, battery, in_air:
+        latest value of every stream, None until the first update arrives
+    """
+
+    def __init__(self, drone: System, streams: Tuple[str, ...] = STREAMS) -> None:
+        self.drone = drone
+        self.streams = streams
+        for name in streams:
+            setattr(self, name, None)
+        self.updates: Dict[str, int] = {name: 0 for name in streams}
+        self.waiters: Dict[str, List[Tuple[Callable[[Any], bool], asyncio.Future]]] = {
+            name: [] for name in streams
+        }
+        self.tasks: List[asyncio.Task] = []
+
+    async def start(self) -> "TelemetryHub":
+        """
+        Subscribes to every stream, once
+        """
+        if not self.tasks:
+            self.tasks = [asyncio.ensure_future(self.follow(name)) for name in self.streams]
+        return self
+
+    async def stop(self) -> None:
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        for waiters in self.waiters.values():
+            for _, future in waiters:
+                future.cancel()
+            waiters.clear()
+
+    async def __aenter__(self) -> "TelemetryHub":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    async def follow(self, name: str) -> None:
+        try:
+            async for value in getattr(self.drone.telemetry, name)():
+                self.update(name, value)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logging.exception(f"telemetry stream {name} failed")
+
+    def update(self, name: str, value: Any) -> None:
+        """
+        Stores a new value and resolves every waiter whose condition it satisfies
+        """
+        setattr(self, name, value)
+        self.updates[name] += 1
+
+        pending = []
+        for predicate, future in self.waiters[name]:
+            if future.done():
+                continue
+            try:
+                satisfied = predicate(value)
+            except Exception as error:
+                future.set_exception(error)
+                continue
+            if satisfied:
+                future.set_result(value)
+            else:
+                pending.append((predicate, future))
+        self.waiters[name] = pending
+
+    async def wait_for(self, name: str, predicate: Optional[Callable[[Any], bool]] = None,
+                       timeout: Optional[float] = None) -> Any:
+        """
+        Waits until a value of a stream satisfies a condition, without polling
+
+        Parameters
+        ----------
+        name: str
+            stream to watch
+        predicate: Callable[[Any], bool]
+            condition on the stream value, None waits for any value
+        timeout: float
+            seconds to wait before raising asyncio.TimeoutError, None waits forever
+
+        Returns
+        -------
+        Any
+            the value that satisfied the condition
+        """
+        if predicate is None:
+            predicate = lambda value: True
+
+        current = getattr(self, name)
+        if current is not None and predicate(current):
+            return current
+
+        future = asyncio.get_event_loop().create_future()
+        self.waiters[name].append((predicate, future))
+        return await asyncio.wait_for(future, timeout)
@@ -0,0 +1,60 @@
+import copy
+
+import numpy as np
+import utm
+from shapely.geometry import Point, Polygon
+
+from avoidance import rrt_flight_test
+from avoidance import samplers
+from avoidance import stats as planner_stats
+from benchmarks import mission_generator
+from benchmarks import planner
+
+
+FEET_TO_METERS = 0.3048
+SAFETY_MARGIN = 5.0  # meters, keeps the planned route clear of the polygon approximation of the obstacles
+
+
+def local_geometry(mission):
+    # fence, obstacle circles and waypoints of a mission in utm meters
+    _, _, zone_num, zone_char = utm.from_latlon(*mission_generator.ORIGIN)
+
+    def to_utm(coord):
+        return utm.from_latlon(coord["latitude"], coord["longitude"], zone_num, zone_char)[:2]
+
+    fence = Polygon([to_utm(p) for p in mission["boundaryPoints"]])
+    obstacles = [Point(to_utm(o)).buffer(o["radius"] * FEET_TO_METERS) for o in mission["stationaryObstacles"]]
+    waypoints = [Point(to_utm(w)) for w in mission["waypoints"]]
+    return fence, obstacles, waypoints
+
+
+def test_same_seed_same_mission():
+    first = mission_generator.generate_mission(seed=7, obstacles=50, waypoints=4)
+    second = mission_generator.generate_mission(seed=7, obstacles=50, waypoints=4)
+    assert first == second
+    assert first != mission_generator.generate_mission(seed=8, obstacles=50, waypoints=4)
+
+
+def test_waypoints_in_free_space():
+    mission = mission_generator.generate_mission(seed=3, obstacles=200, waypoints=8)
+    fence, obstacles, waypoints = local_geometry(mission)
+    assert len(obstacles) > 0
+    assert len(waypoints) == 8
+    for waypoint in waypoints:
+        assert fence.contains(waypoint)
+        assert not any(obstacle.contains(waypoint) for obstacle in obstacles)
+
+
+def test_small_mission_plans():
+    mission = mission_generator.generate_mission(seed=1, obstacles=10, waypoints=3)
+    mission_stats = planner_stats.MissionStats()
+    planned = copy.deepcopy(mission)  # the planner converts the dictionaries in place
+    route = rrt_flight_test.rrt_flight_test(
+        planned["stationaryObstacles"], planned["waypoints"], planned["boundaryPoints"],
+        batch_size=64, sampler=samplers.Sampler(1), stats=mission_stats, safety_margin=SAFETY_MARGIN,
+    )
+    assert len(mission_stats.legs) == 2
+    assert all(leg.success for leg in mission_stats.legs)
+    ends = [(w["latitude"], w["longitude"]) for w in (mission["waypoints"][0], mission["waypoints"][-1])]
+    np.testing.assert_allclose([route[0], route[-1]], ends, atol=1e-6)
+    assert planner.route_metrics(route, mission)["min_obstacle_clearance"] > 0
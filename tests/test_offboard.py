@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+from shapely.geometry import LineString, Point
+
+pytest.importorskip("mavsdk")
+
+from flight import offboard
+from flight.sim import PointMass
+
+
+def test_pure_pursuit_follows_polyline():
+    path = [(0, 0), (100, 0), (100, 80), (20, 120)]
+    follower = offboard.PurePursuit(path)
+    trajectory, duration = offboard.simulate_follow(follower, PointMass(path[0]))
+    assert duration < np.inf
+    assert np.linalg.norm(trajectory[-1] - path[-1]) <= follower.goal_radius
+
+    # corners are cut by less than the lookahead
+    line = LineString(path)
+    cross_track = max(line.distance(Point(p)) for p in trajectory)
+    assert cross_track < follower.lookahead
@@ -0,0 +1,38 @@
+import random
+
+import numpy as np
+from shapely.geometry import LineString, Point, Polygon
+
+from avoidance import replan
+from avoidance import rrt
+from avoidance import samplers
+
+
+BOUNDARY = Polygon([(0, 0), (1000, 0), (1000, 1000), (0, 1000)])
+START = Point(100, 500)
+GOAL = Point(900, 500)
+
+
+def collision_free(path, obstacles):
+    return all(not rrt.intersects_obstacle(LineString([p, q]), obstacles) for p, q in zip(path, path[1:]))
+
+
+def test_replan_reuses_graph_after_new_obstacle():
+    random.seed(0)
+    np.random.seed(0)
+    planner = replan.IncrementalPlanner(BOUNDARY, [Point(300, 700).buffer(60).boundary],
+                                        sampler=samplers.Sampler(0))
+    path = planner.plan(START, GOAL)
+    assert path is not None
+    G = planner.G
+    vertices = len(G.vertices)
+
+    # the new obstacle sits on the straight line the first path took
+    planner.add_obstacle((500, 500), 50)
+    assert not collision_free(path, planner.obstacle_list())
+    repaired = planner.replan(START)
+
+    assert planner.G is G
+    assert len(G.vertices) <= vertices + 1
+    assert repaired[0].equals(START) and repaired[-1].equals(GOAL)
+    assert collision_free(repaired, planner.obstacle_list())
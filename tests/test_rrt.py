@@ -0,0 +1,74 @@
+import copy
+import json
+import os
+import random
+
+import numpy as np
+from shapely.geometry import LineString, Point
+
+from avoidance import rrt
+from avoidance import rrt_flight_test
+from avoidance import samplers
+from avoidance import stats as planner_stats
+from benchmarks import planner
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAFETY_MARGIN = 2.0  # meters, keeps the planned route clear of the polygon approximation of the obstacles
+
+
+def detour_graph():
+    # the only path to the goal detours over (50, 40), a dead end chain along
+    # the straight line has a lower bound than every vertex of that path
+    G = rrt.Graph(Point(0, 0), Point(100, 0))
+    previous = 0
+    for x in range(1, 31):
+        idx = G.add_vex(Point(x, 0))
+        G.add_edge(previous, idx, 1.0)
+        previous = idx
+    detour = G.add_vex(Point(50, 40))
+    G.add_edge(0, detour, Point(0, 0).distance(Point(50, 40)))
+    goal = G.add_vex(G.endpos)
+    G.add_edge(detour, goal, Point(50, 40).distance(G.endpos))
+    G.success = True
+    return G
+
+
+def test_prune_cap_keeps_best_path():
+    G = detour_graph()
+    G.prune(max_vertices=10)
+    assert G.success
+    assert len(G.vertices) <= 10
+    path = rrt.dijkstra(G)
+    assert [(p.x, p.y) for p in path] == [(0, 0), (50, 40), (100, 0)]
+
+
+def test_segments_intersect_obstacles_matches_shapely():
+    rng = np.random.default_rng(0)
+    centers = rng.uniform(0, 1000, (20, 2))
+    radii = rng.uniform(10, 80, 20)
+    obstacles = [Point(c).buffer(r).boundary for c, r in zip(centers, radii)]
+    starts = rng.uniform(0, 1000, (5000, 2))
+    ends = starts + rng.uniform(-100, 100, (5000, 2))
+
+    hits = rrt.segments_intersect_obstacles(starts, ends, centers, radii)
+    expected = np.array([rrt.intersects_obstacle(LineString([s, e]), obstacles) for s, e in zip(starts, ends)])
+    assert expected.sum() > 500
+    # the rings are polygons inscribed in the circles, segments grazing a ring may differ
+    assert np.count_nonzero(hits != expected) <= 10
+
+
+def test_batched_planner_on_test_data():
+    with open(os.path.join(ROOT, "test_data.json")) as f:
+        mission = json.load(f)
+    random.seed(0)
+    np.random.seed(0)
+    mission_stats = planner_stats.MissionStats()
+    planned = copy.deepcopy(mission)  # the planner converts the dictionaries in place
+    route = rrt_flight_test.rrt_flight_test(
+        planned["stationaryObstacles"], planned["waypoints"], planned["boundaryPoints"],
+        batch_size=rrt.BATCH_SIZE, sampler=samplers.Sampler(0), stats=mission_stats, safety_margin=SAFETY_MARGIN,
+    )
+    assert len(mission_stats.legs) == len(mission["waypoints"]) - 1
+    assert all(leg.success for leg in mission_stats.legs)
+    assert planner.route_metrics(route, mission)["min_obstacle_clearance"] > 0
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from shapely.geometry import Point, Polygon
+
+from avoidance import samplers
+
+
+# L shaped region, a third of its bounding box lies outside
+REGION = Polygon([(0, 0), (300, 0), (300, 100), (100, 100), (100, 300), (0, 300)])
+
+
+@pytest.mark.parametrize("name", sorted(samplers.SAMPLERS))
+def test_samples_lie_in_region(name):
+    points = samplers.get_sampler(name, seed=1).sample_batch(REGION, 500)
+    assert points.shape == (500, 2)
+    assert all(REGION.contains(Point(p)) for p in points)
+    assert REGION.contains(samplers.get_sampler(name, seed=1).sample(REGION))
+
+
+@pytest.mark.parametrize("name", sorted(samplers.SAMPLERS))
+def test_samples_are_reproducible(name):
+    first = samplers.get_sampler(name, seed=3).sample_batch(REGION, 200)
+    second = samplers.get_sampler(name, seed=3).sample_batch(REGION, 200)
+    np.testing.assert_array_equal(first, second)
+
+
+def test_unknown_sampler():
+    with pytest.raises(ValueError):
+        samplers.get_sampler("random")
+
+
+CENTERS = np.array([(50.0, 150.0), (200.0, 50.0)])
+RADII = np.array([30.0, 40.0])
+GOAL = Point(50, 250)
+
+
+def test_strategy_mixture():
+    strategy = samplers.SamplingStrategy(goal_bias=0.2, gaussian=0.3, bridge=0.2, sigma=20.0, seed=0)
+    counts = {}
+    points = strategy.sample_batch(samplers.Sampler(0), REGION, 1000, GOAL, CENTERS, RADII, counts)
+    assert points.shape == (1000, 2)
+    assert sum(counts.values()) == 1000
+    assert counts["goal"] == np.count_nonzero(np.all(points == (GOAL.x, GOAL.y), axis=1))
+    assert 100 < counts["goal"] < 300
+    assert counts["gaussian"] > 0 and counts["bridge"] > 0
+    assert not samplers.in_collision(points, REGION, np.empty((0, 2)), np.empty(0)).any()
+
+
+def test_strategy_is_reproducible():
+    def draw():
+        strategy = samplers.SamplingStrategy(goal_bias=0.1, gaussian=0.3, bridge=0.3, seed=5)
+        return strategy.sample_batch(samplers.Sampler(5), REGION, 300, GOAL, CENTERS, RADII)
+
+    np.testing.assert_array_equal(draw(), draw())
+
+
+def test_obstacle_samples_are_free():
+    strategy = samplers.SamplingStrategy(sigma=20.0, seed=0)
+    gaussian = strategy.gaussian_points(samplers.Sampler(0), REGION, 200, CENTERS, RADII)
+    bridge = strategy.bridge_points(samplers.Sampler(0), REGION, 200, CENTERS, RADII)
+    assert len(gaussian) > 0 and len(bridge) > 0
+    assert not samplers.in_collision(gaussian, REGION, CENTERS, RADII).any()
+    assert not samplers.in_collision(bridge, REGION, CENTERS, RADII).any()
+    # gaussian samples hug the obstacle edges
+    distances = np.linalg.norm(gaussian[:, None, :] - CENTERS[None, :, :], axis=2) - RADII
+    assert np.median(distances.min(axis=1)) < 3 * strategy.sigma
+
+
+def test_strategy_probabilities():
+    with pytest.raises(ValueError):
+        samplers.SamplingStrategy(goal_bias=0.5, gaussian=0.3, bridge=0.3)
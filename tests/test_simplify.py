@@ -0,0 +1,36 @@
+import numpy as np
+from shapely.geometry import LineString, Point, Polygon
+
+from avoidance import rrt
+from avoidance import simplify
+
+
+OBSTACLE = Point(50, 0).buffer(20).boundary
+
+
+def detour():
+    # dense arc over the obstacle from (0, 0) to (100, 0)
+    angles = np.linspace(np.pi, 0, 40)
+    return [Point(0, 0)] + [Point(50 + 35 * np.cos(a), 35 * np.sin(a)) for a in angles] + [Point(100, 0)]
+
+
+def test_merges_nearly_collinear_points():
+    path = [Point(x, 1.0 if x % 20 else -1.0) for x in range(0, 110, 10)]
+    simplified = simplify.simplify_path(path, [])
+    assert simplified == [path[0], path[-1]]
+
+
+def test_keeps_endpoints_and_path_collision_free():
+    path = detour()
+    simplified = simplify.simplify_path(path, [OBSTACLE], tolerance=100.0)
+    assert simplified[0] == path[0] and simplified[-1] == path[-1]
+    assert 2 < len(simplified) < len(path)
+    for p, q in zip(simplified, simplified[1:]):
+        assert not rrt.intersects_obstacle(LineString([p, q]), [OBSTACLE])
+
+
+def test_shortcuts_stay_in_fence():
+    fence = Polygon([(0, 0), (100, 0), (100, 20), (20, 20), (20, 100), (0, 100)])
+    path = [Point(90, 10), Point(50, 10), Point(10, 10), Point(10, 50), Point(10, 90)]
+    simplified = simplify.simplify_path(path, [], fence, tolerance=100.0)
+    assert simplified == [Point(90, 10), Point(10, 10), Point(10, 90)]
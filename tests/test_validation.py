@@ -0,0 +1,34 @@
+from shapely.geometry import Point, Polygon
+
+from avoidance import validation
+
+
+# a corridor 100 m wide, cut in two by an obstacle wider than the corridor
+CORRIDOR = Polygon([(0, 0), (1000, 0), (1000, 100), (0, 100)])
+WALL = Point(500, 50).buffer(120).boundary
+SMALL = Point(200, 50).buffer(20).boundary
+
+
+def test_feasible_legs():
+    waypoints = [Point(50, 50), Point(350, 20), Point(360, 80)]
+    assert validation.validate_mission(waypoints, CORRIDOR, [WALL, SMALL]) == [None, None]
+
+
+def test_disconnected_leg():
+    waypoints = [Point(50, 50), Point(300, 50), Point(900, 50), Point(950, 20)]
+    reasons = validation.validate_mission(waypoints, CORRIDOR, [WALL, SMALL])
+    assert reasons[0] is None
+    assert reasons[1] == "waypoints 1 and 2 are not connected through free space"
+    assert reasons[2] is None
+
+
+def test_waypoint_inside_obstacle():
+    waypoints = [Point(50, 50), Point(200, 55), Point(300, 50)]
+    reasons = validation.validate_mission(waypoints, CORRIDOR, [WALL, SMALL])
+    assert reasons == ["waypoint 1 is inside obstacle 1", "waypoint 1 is inside obstacle 1"]
+
+
+def test_waypoint_outside_fence():
+    waypoints = [Point(50, 50), Point(300, 50), Point(300, 150)]
+    reasons = validation.validate_mission(waypoints, CORRIDOR, [WALL, SMALL])
+    assert reasons == [None, "waypoint 2 is outside of the fence"]